@@ -3,9 +3,21 @@ import json
 import base64
 import time
 import random
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, Iterator, Optional
 from pathlib import Path
 import logging
+import asyncio
+from contextlib import contextmanager
+
+import httpx
+
+from http_pool import get_session, get_async_client
+from streaming import StreamTimer, consume_ndjson_stream, aconsume_ndjson_stream
+from models import GenerationStats
+from image_prep import ImagePreparer
+from request_body import Base64ImageBody
+
+PULL_TIMEOUT_SECONDS = 3600 # A pull request stays open until the whole model is downloaded
 
 # --- Localized Default Prompts ---
 LOCALIZED_DEFAULTS = {
@@ -31,10 +43,58 @@ def get_localized_default_prompt(key: str, language: str = "en", **kwargs) -> st
     
     return strings.get(key, LOCALIZED_DEFAULTS["en"].get(key, f"MISSING_DEFAULT_PROMPT({key})")).format(**kwargs)
 
+def _backoff_delay(retry_delay: float, attempt: int) -> float:
+    """Exponential backoff with up to one second of jitter."""
+    return retry_delay * (2 ** attempt) + random.uniform(0, 1)
+
+def _build_generate_payload(model: str, prompt: str, image_base64: Optional[str] = None, stream: bool = False) -> Dict:
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": stream,
+    }
+    if image_base64:
+        payload["images"] = [image_base64]
+    return payload
+
+def _encode_image(image_path: str, image_preparer: Optional[ImagePreparer] = None) -> str:
+    if image_preparer is not None:
+        return base64.b64encode(image_preparer.prepare(image_path)).decode("utf-8")
+    with open(image_path, "rb") as f:
+        return base64.b64encode(f.read()).decode("utf-8")
+
+def _simulated_gemini_response(image_path: Optional[str]) -> Dict:
+    return {
+        "response": f"Simulated Gemini description: This {'image' if image_path else 'prompt'} contains various elements related to the prompt. Powered by Gemini.",
+        "confidence": round(random.uniform(0.7, 0.95), 2),
+        "source": "Gemini"
+    }
+
+def _ollama_description_result(ollama_response: Dict) -> Dict:
+    full_response_content = ollama_response.get("response", "").strip()
+    confidence = min(0.5 + len(full_response_content) / 1000, 0.99)
+    return {
+        "description": full_response_content,
+        "confidence": confidence,
+        "raw_response": ollama_response,
+        "stats": GenerationStats.from_ollama(ollama_response),
+        "source": "Ollama"
+    }
+
+def _gemini_description_result(gemini_response: Dict) -> Dict:
+    return {
+        "description": gemini_response["response"],
+        "confidence": gemini_response["confidence"],
+        "raw_response": gemini_response, # Store raw Gemini response
+        "stats": GenerationStats(), # Gemini reports no Ollama timing fields
+        "source": "Gemini"
+    }
+
 class OllamaClient:
     def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3.2-vision", 
                  timeout: int = 60, retries: int = 3, retry_delay: float = 1.0,
-                 use_gemini_fallback: bool = False, gemini_api_key: str = ""):
+                 use_gemini_fallback: bool = False, gemini_api_key: str = "",
+                 image_preparer: Optional[ImagePreparer] = None):
         self.base_url = base_url
         self.model = model
         self.timeout = timeout
@@ -42,42 +102,63 @@ class OllamaClient:
         self.retry_delay = retry_delay
         self.use_gemini_fallback = use_gemini_fallback
         self.gemini_api_key = gemini_api_key
+        # Downscales and re-encodes images before upload when configured
+        self.image_preparer = image_preparer
         # Add a logger for debugging
         self.logger = logging.getLogger("OllamaClient")
-
-
+        # Shared keep-alive session; clients for the same base_url reuse one connection pool
+        self.session = get_session(base_url)
 
     def _encode_image_to_base64(self, image_path: str) -> str:
-        with open(image_path, "rb") as f:
-            return base64.b64encode(f.read()).decode("utf-8")
+        return _encode_image(image_path, self.image_preparer)
     
-    def _call_ollama_api(self, prompt: str, image_base64: Optional[str] = None, model_override: Optional[str] = None) -> Optional[Dict]:
+    @contextmanager
+    def _image_file(self, image_path: Optional[str], content_hash: Optional[str] = None) -> Iterator[Optional[Path]]:
+        """
+        File whose bytes are sent for `image_path` (the prepared copy when image prep is enabled),
+        kept out of cache eviction until the block exits so every retry can re-read it. A caller
+        that already hashed the image passes `content_hash` so it is not read twice.
+        """
+        if not image_path:
+            yield None
+        elif self.image_preparer is not None:
+            with self.image_preparer.pinned(image_path, content_hash) as path:
+                yield path
+        else:
+            yield Path(image_path)
+
+    def _call_ollama_api(self, prompt: str, image_base64: Optional[str] = None, model_override: Optional[str] = None,
+                         image_path: Optional[str] = None) -> Optional[Dict]:
+        """
+        `image_path` streams the image into the request body from a memory-mapped
+        file; `image_base64` embeds an already encoded image.
+        """
         url = f"{self.base_url}/api/generate"
-        payload = {
-            "model": model_override if model_override else self.model,
-            "prompt": prompt,
-            "stream": False,
-        }
-        if image_base64:
-            payload["images"] = [image_base64]
+        payload = _build_generate_payload(model_override if model_override else self.model, prompt, image_base64)
+        # The streamed body is re-iterable, so every retry re-reads the file instead of holding a copy
+        body = Base64ImageBody(payload, image_path) if image_path else json.dumps(payload)
 
         headers = {"Content-Type": "application/json"}
 
         for i in range(self.retries + 1):
             try:
                 self.logger.info(f"Attempt {i+1}/{self.retries+1} to call Ollama API for model {payload['model']}.")
-                response = requests.post(url, headers=headers, data=json.dumps(payload), timeout=self.timeout)
+                response = self.session.post(url, headers=headers, data=body, timeout=self.timeout)
                 response.raise_for_status()
                 return response.json()
             except requests.exceptions.RequestException as e:
                 self.logger.warning(f"Ollama API request failed (attempt {i+1}): {e}")
                 if i < self.retries:
-                    sleep_time = self.retry_delay * (2 ** i) + random.uniform(0, 1)
+                    sleep_time = _backoff_delay(self.retry_delay, i)
                     self.logger.info(f"Retrying in {sleep_time:.2f} seconds...")
                     time.sleep(sleep_time)
                 else:
                     self.logger.error(f"All {self.retries+1} Ollama API attempts failed.")
                     return None
+            except OSError as e:
+                # The image itself is unreadable; retrying the request will not bring it back
+                self.logger.error(f"Could not read the image for the Ollama request: {e}")
+                return None
         return None
 
     def _call_gemini_api(self, image_path: Optional[str], prompt: str) -> Optional[Dict]:
@@ -90,47 +171,31 @@ class OllamaClient:
         
         # Simulate success
         time.sleep(2 + random.uniform(0, 1)) # Simulate network delay
-        return {
-            "response": f"Simulated Gemini description: This {'image' if image_path else 'prompt'} contains various elements related to the prompt. Powered by Gemini.",
-            "confidence": round(random.uniform(0.7, 0.95), 2),
-            "source": "Gemini"
-        }
+        return _simulated_gemini_response(image_path)
 
-    def generate_description(self, image_path: Optional[str] = None, prompt: str = "", model: Optional[str] = None, language: str = "en") -> Optional[Dict]:
+    def generate_description(self, image_path: Optional[str] = None, prompt: str = "", model: Optional[str] = None, language: str = "en",
+                             content_hash: Optional[str] = None) -> Optional[Dict]:
         """
         Calls Ollama API to generate a description for the given image using a vision model,
-        with retry logic and optional Gemini fallback.
+        with retry logic and optional Gemini fallback. `content_hash`, when known, keys the
+        prepared-image cache without hashing the file again.
         """
-        image_base64 = None
-        if image_path:
-            image_base64 = self._encode_image_to_base64(image_path)
-        
         # Use localized default prompt if none is provided
         final_prompt = prompt if prompt else get_localized_default_prompt("image_description_prompt", language)
 
-        ollama_response = self._call_ollama_api(final_prompt, image_base64, model_override=model)
+        with self._image_file(image_path, content_hash) as image_file:
+            ollama_response = self._call_ollama_api(final_prompt, model_override=model,
+                                                    image_path=str(image_file) if image_file else None)
 
         if ollama_response:
             self.logger.info("Ollama API call successful.")
-            full_response_content = ollama_response.get("response", "").strip()
-            confidence = min(0.5 + len(full_response_content) / 1000, 0.99)
-            return {
-                "description": full_response_content,
-                "confidence": confidence,
-                "raw_response": ollama_response,
-                "source": "Ollama"
-            }
+            return _ollama_description_result(ollama_response)
         elif self.use_gemini_fallback:
             self.logger.warning("Ollama failed, attempting Gemini fallback.")
             gemini_response = self._call_gemini_api(image_path, prompt)
             if gemini_response:
                 self.logger.info("Gemini fallback successful.")
-                return {
-                    "description": gemini_response["response"],
-                    "confidence": gemini_response["confidence"],
-                    "raw_response": gemini_response, # Store raw Gemini response
-                    "source": "Gemini"
-                }
+                return _gemini_description_result(gemini_response)
             else:
                 self.logger.error("Gemini fallback also failed.")
                 return None
@@ -138,10 +203,47 @@ class OllamaClient:
             self.logger.error("Ollama failed and Gemini fallback is not enabled.")
             return None
 
+    def stream_generate(self, image_path: Optional[str] = None, prompt: str = "", model: Optional[str] = None, language: str = "en") -> Iterator[Dict]:
+        """
+        Streams a generation token by token. Yields `token` events and a final `done`
+        event carrying the full response and a latency summary (time-to-first-token,
+        inter-token latency, total duration). Connection failures are retried until
+        the first chunk arrives; errors are reported as a final `error` event.
+        """
+        final_prompt = prompt if prompt else get_localized_default_prompt("image_description_prompt", language)
+        url = f"{self.base_url}/api/generate"
+        payload = _build_generate_payload(model if model else self.model, final_prompt, stream=True)
+        with self._image_file(image_path) as image_file: # Pinned until the stream is closed
+            body = Base64ImageBody(payload, image_file) if image_file else json.dumps(payload)
+
+            for i in range(self.retries + 1):
+                timer = StreamTimer()
+                try:
+                    self.logger.info(f"Attempt {i+1}/{self.retries+1} to stream from Ollama API for model {payload['model']}.")
+                    with self.session.post(url, headers={"Content-Type": "application/json"}, data=body,
+                                           timeout=self.timeout, stream=True) as response:
+                        response.raise_for_status()
+                        for event in consume_ndjson_stream(response.iter_lines(), timer):
+                            yield event
+                    return
+                except requests.exceptions.RequestException as e:
+                    self.logger.warning(f"Ollama streaming request failed (attempt {i+1}): {e}")
+                    if timer.first_token_at is None and i < self.retries:
+                        sleep_time = _backoff_delay(self.retry_delay, i)
+                        self.logger.info(f"Retrying in {sleep_time:.2f} seconds...")
+                        time.sleep(sleep_time)
+                        continue
+                    yield {"type": "error", "error": str(e)}
+                    return
+                except RuntimeError as e:
+                    self.logger.error(str(e))
+                    yield {"type": "error", "error": str(e)}
+                    return
+
     def check_health(self) -> bool:
         """Checks if Ollama is running."""
         try:
-            response = requests.get(self.base_url, timeout=5) # Shorter timeout for health check
+            response = self.session.get(self.base_url, timeout=5) # Shorter timeout for health check
             return response.status_code == 200
         except requests.exceptions.RequestException:
             return False
@@ -149,7 +251,7 @@ class OllamaClient:
     def get_ollama_models(self) -> list:
         """Fetches the list of available models from Ollama."""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
             response.raise_for_status()
             return response.json().get("models", [])
         except requests.exceptions.RequestException as e:
@@ -165,7 +267,7 @@ class OllamaClient:
         for i in range(self.retries + 1):
             try:
                 self.logger.info(f"Attempt {i+1}/{self.retries+1} to pull model '{model_name}' from Ollama.")
-                response = requests.post(url, headers=headers, data=json.dumps(payload), timeout=self.timeout)
+                response = self.session.post(url, headers=headers, data=json.dumps(payload), timeout=self.timeout)
                 response.raise_for_status()
                 # Ollama's pull API streams output, so we just check for success status
                 self.logger.info(f"Model '{model_name}' pull initiated successfully.")
@@ -173,7 +275,7 @@ class OllamaClient:
             except requests.exceptions.RequestException as e:
                 self.logger.warning(f"Ollama API pull request failed (attempt {i+1}): {e}")
                 if i < self.retries:
-                    sleep_time = self.retry_delay * (2 ** i) + random.uniform(0, 1)
+                    sleep_time = _backoff_delay(self.retry_delay, i)
                     self.logger.info(f"Retrying in {sleep_time:.2f} seconds...")
                     time.sleep(sleep_time)
                 else:
@@ -190,17 +292,206 @@ class OllamaClient:
         for i in range(self.retries + 1):
             try:
                 self.logger.info(f"Attempt {i+1}/{self.retries+1} to delete model '{model_name}' from Ollama.")
-                response = requests.delete(url, headers=headers, data=json.dumps(payload), timeout=self.timeout)
+                response = self.session.delete(url, headers=headers, data=json.dumps(payload), timeout=self.timeout)
                 response.raise_for_status()
                 self.logger.info(f"Model '{model_name}' deleted successfully.")
                 return True
             except requests.exceptions.RequestException as e:
                 self.logger.warning(f"Ollama API delete request failed (attempt {i+1}): {e}")
                 if i < self.retries:
-                    sleep_time = self.retry_delay * (2 ** i) + random.uniform(0, 1)
+                    sleep_time = _backoff_delay(self.retry_delay, i)
                     self.logger.info(f"Retrying in {sleep_time:.2f} seconds...")
                     time.sleep(sleep_time)
                 else:
                     self.logger.error(f"All {self.retries+1} Ollama API delete attempts failed for model '{model_name}'.")
                     return False
-        return False
\ No newline at end of file
+        return False
+
+class AsyncOllamaClient:
+    """
+    asyncio counterpart of OllamaClient for the FastAPI routes. Same surface and
+    retry/fallback behaviour, but every network wait yields to the event loop.
+    """
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3.2-vision",
+                 timeout: int = 60, retries: int = 3, retry_delay: float = 1.0,
+                 use_gemini_fallback: bool = False, gemini_api_key: str = "",
+                 image_preparer: Optional[ImagePreparer] = None):
+        self.base_url = base_url
+        self.model = model
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.use_gemini_fallback = use_gemini_fallback
+        self.gemini_api_key = gemini_api_key
+        self.image_preparer = image_preparer
+        self.logger = logging.getLogger("AsyncOllamaClient")
+
+    @classmethod
+    def from_client(cls, client: OllamaClient, model: Optional[str] = None) -> "AsyncOllamaClient":
+        """Builds an async client with the same settings as an existing OllamaClient."""
+        return cls(
+            base_url=client.base_url,
+            model=model if model else client.model,
+            timeout=client.timeout,
+            retries=client.retries,
+            retry_delay=client.retry_delay,
+            use_gemini_fallback=client.use_gemini_fallback,
+            gemini_api_key=client.gemini_api_key,
+            image_preparer=client.image_preparer
+        )
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        # Resolved per call: the pooled client is bound to the running event loop
+        return get_async_client(self.base_url)
+
+    def _encode_image_to_base64(self, image_path: str) -> str:
+        return _encode_image(image_path, self.image_preparer)
+
+    async def _call_ollama_api(self, prompt: str, image_base64: Optional[str] = None, model_override: Optional[str] = None) -> Optional[Dict]:
+        url = f"{self.base_url}/api/generate"
+        payload = _build_generate_payload(model_override if model_override else self.model, prompt, image_base64)
+
+        for i in range(self.retries + 1):
+            try:
+                self.logger.info(f"Attempt {i+1}/{self.retries+1} to call Ollama API for model {payload['model']}.")
+                response = await self.http.post(url, json=payload, timeout=self.timeout)
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPError as e:
+                self.logger.warning(f"Ollama API request failed (attempt {i+1}): {e}")
+                if i < self.retries:
+                    sleep_time = _backoff_delay(self.retry_delay, i)
+                    self.logger.info(f"Retrying in {sleep_time:.2f} seconds...")
+                    await asyncio.sleep(sleep_time)
+                else:
+                    self.logger.error(f"All {self.retries+1} Ollama API attempts failed.")
+                    return None
+        return None
+
+    async def _call_gemini_api(self, image_path: Optional[str], prompt: str) -> Optional[Dict]:
+        # Simulated Gemini fallback, mirroring OllamaClient._call_gemini_api.
+        self.logger.info(f"Simulating Gemini API call for {'image: ' + image_path if image_path else 'prompt only'}")
+        if not self.gemini_api_key:
+            self.logger.warning("Gemini API key not provided, cannot truly fallback to Gemini.")
+            return None
+
+        await asyncio.sleep(2 + random.uniform(0, 1)) # Simulate network delay
+        return _simulated_gemini_response(image_path)
+
+    async def generate_description(self, image_path: Optional[str] = None, prompt: str = "", model: Optional[str] = None, language: str = "en") -> Optional[Dict]:
+        """
+        Async version of OllamaClient.generate_description.
+        """
+        image_base64 = None
+        if image_path:
+            # File read and base64 encoding are CPU/disk bound; keep them off the event loop
+            image_base64 = await asyncio.to_thread(self._encode_image_to_base64, image_path)
+
+        final_prompt = prompt if prompt else get_localized_default_prompt("image_description_prompt", language)
+
+        ollama_response = await self._call_ollama_api(final_prompt, image_base64, model_override=model)
+
+        if ollama_response:
+            self.logger.info("Ollama API call successful.")
+            return _ollama_description_result(ollama_response)
+        elif self.use_gemini_fallback:
+            self.logger.warning("Ollama failed, attempting Gemini fallback.")
+            gemini_response = await self._call_gemini_api(image_path, prompt)
+            if gemini_response:
+                self.logger.info("Gemini fallback successful.")
+                return _gemini_description_result(gemini_response)
+            else:
+                self.logger.error("Gemini fallback also failed.")
+                return None
+        else:
+            self.logger.error("Ollama failed and Gemini fallback is not enabled.")
+            return None
+
+    async def stream_generate(self, image_path: Optional[str] = None, prompt: str = "", model: Optional[str] = None, language: str = "en") -> AsyncIterator[Dict]:
+        """
+        Async version of OllamaClient.stream_generate.
+        """
+        image_base64 = None
+        if image_path:
+            image_base64 = await asyncio.to_thread(self._encode_image_to_base64, image_path)
+        final_prompt = prompt if prompt else get_localized_default_prompt("image_description_prompt", language)
+        url = f"{self.base_url}/api/generate"
+        payload = _build_generate_payload(model if model else self.model, final_prompt, image_base64, stream=True)
+
+        for i in range(self.retries + 1):
+            timer = StreamTimer()
+            try:
+                self.logger.info(f"Attempt {i+1}/{self.retries+1} to stream from Ollama API for model {payload['model']}.")
+                async with self.http.stream("POST", url, json=payload, timeout=self.timeout) as response:
+                    response.raise_for_status()
+                    async for event in aconsume_ndjson_stream(response.aiter_lines(), timer):
+                        yield event
+                return
+            except httpx.HTTPError as e:
+                self.logger.warning(f"Ollama streaming request failed (attempt {i+1}): {e}")
+                if timer.first_token_at is None and i < self.retries:
+                    sleep_time = _backoff_delay(self.retry_delay, i)
+                    self.logger.info(f"Retrying in {sleep_time:.2f} seconds...")
+                    await asyncio.sleep(sleep_time)
+                    continue
+                yield {"type": "error", "error": str(e)}
+                return
+            except RuntimeError as e:
+                self.logger.error(str(e))
+                yield {"type": "error", "error": str(e)}
+                return
+
+    async def check_health(self) -> bool:
+        """Checks if Ollama is running."""
+        try:
+            response = await self.http.get(self.base_url, timeout=5)
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    async def get_ollama_models(self) -> list:
+        """Fetches the list of available models from Ollama."""
+        try:
+            response = await self.http.get(f"{self.base_url}/api/tags", timeout=5)
+            response.raise_for_status()
+            return response.json().get("models", [])
+        except httpx.HTTPError as e:
+            self.logger.error(f"Failed to list Ollama models: {e}")
+            return []
+
+    async def _request_with_retries(self, method: str, path: str, payload: Dict, action: str, model_name: str,
+                                    timeout: Optional[float] = None) -> bool:
+        url = f"{self.base_url}{path}"
+        for i in range(self.retries + 1):
+            try:
+                self.logger.info(f"Attempt {i+1}/{self.retries+1} to {action} model '{model_name}' from Ollama.")
+                response = await self.http.request(method, url, json=payload, timeout=timeout or self.timeout)
+                response.raise_for_status()
+                return True
+            except httpx.HTTPError as e:
+                self.logger.warning(f"Ollama API {action} request failed (attempt {i+1}): {e}")
+                if i < self.retries:
+                    sleep_time = _backoff_delay(self.retry_delay, i)
+                    self.logger.info(f"Retrying in {sleep_time:.2f} seconds...")
+                    await asyncio.sleep(sleep_time)
+                else:
+                    self.logger.error(f"All {self.retries+1} Ollama API {action} attempts failed for model '{model_name}'.")
+                    return False
+        return False
+
+    async def pull_model(self, model_name: str) -> bool:
+        """Pulls a model from Ollama and returns once the download has finished."""
+        # Without streaming, Ollama answers only when the pull has completed or failed
+        success = await self._request_with_retries("POST", "/api/pull", {"name": model_name, "stream": False}, "pull",
+                                                   model_name, timeout=PULL_TIMEOUT_SECONDS)
+        if success:
+            self.logger.info(f"Model '{model_name}' pulled successfully.")
+        return success
+
+    async def delete_model(self, model_name: str) -> bool:
+        """Deletes a model from Ollama."""
+        success = await self._request_with_retries("DELETE", "/api/delete", {"name": model_name}, "delete", model_name)
+        if success:
+            self.logger.info(f"Model '{model_name}' deleted successfully.")
+        return success
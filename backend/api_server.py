@@ -9,7 +9,9 @@ from pathlib import Path
 # Add backend directory to sys.path
 sys.path.append(str(Path(__file__).parent))
 
+import dependencies
 from dependencies import get_pipeline
+import http_pool
 from routers import (
     pipeline_routes,
     benchmark_routes,
@@ -32,6 +34,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Pagination cursor of /pipeline/items
 )
 
 # --- Setup logging ---
@@ -57,6 +60,15 @@ async def startup_event():
     get_pipeline()
     logger.info("ImagePipeline instance initialized.")
 
+# --- Shutdown Event ---
+@app.on_event("shutdown")
+async def shutdown_event():
+    dependencies.shutdown()
+    logger.info("Daemon stopped and pending database writes committed.")
+    await http_pool.aclose_async_clients()
+    http_pool.close_all()
+    logger.info("HTTP connection pools closed.")
+
 # --- Main entry point ---
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
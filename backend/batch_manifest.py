@@ -0,0 +1,177 @@
+import json
+import uuid
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import db_pool
+from init_db import migrate_database
+
+logger = logging.getLogger("BatchManifest")
+
+ITEM_PENDING = "pending"
+ITEM_GENERATED = "generated"
+ITEM_JUDGED = "judged"
+
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
+RUN_INCOMPLETE = "incomplete"
+
+
+class BatchManifest:
+    """
+    Persists a batch benchmark as model x category work items in SQLite so an
+    interrupted batch can be resumed with only the unfinished items re-run.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            migrate_database(conn)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return db_pool.get_connection(self.db_path)
+
+    def _execute(self, sql: str, params: tuple = ()):
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(sql, params)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row # Per cursor: the connection is shared with the pipeline
+            return cursor.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def create_run(self, models: List[str], categories: List[str], language: str, schedule: str,
+                   stream: bool = False, prompt_names: Optional[Dict[str, str]] = None) -> str:
+        """Registers a new batch and one pending work item per model and category."""
+        run_id = str(uuid.uuid4())
+        prompt_names = prompt_names or {}
+        items = [
+            (run_id, position, model, category, prompt_names.get(category))
+            for position, (model, category) in enumerate((m, c) for m in models for c in categories)
+        ]
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("""
+                    INSERT INTO benchmark_batch_runs (run_id, schedule, language, stream, models_json, status)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (run_id, schedule, language, int(stream), json.dumps(models), RUN_RUNNING))
+                conn.executemany("""
+                    INSERT INTO benchmark_batch_items (run_id, position, model, category, prompt_name)
+                    VALUES (?, ?, ?, ?, ?)
+                """, items)
+                conn.commit()
+            finally:
+                conn.close()
+        logger.info(f"Created batch run {run_id} with {len(items)} items")
+        return run_id
+
+    def get_run(self, run_id: str) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM benchmark_batch_runs WHERE run_id = ?", (run_id,))
+        if not rows:
+            return None
+        run = dict(rows[0])
+        run['models'] = json.loads(run.pop('models_json'))
+        run['stream'] = bool(run['stream'])
+        run['load_report'] = json.loads(run.pop('load_report_json')) if run['load_report_json'] else None
+        return run
+
+    def items(self, run_id: str, status: Optional[str] = None, model: Optional[str] = None) -> List[Dict]:
+        """Work items in creation order, with stored candidates and results decoded."""
+        sql = "SELECT * FROM benchmark_batch_items WHERE run_id = ?"
+        params = [run_id]
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+        if model:
+            sql += " AND model = ?"
+            params.append(model)
+        sql += " ORDER BY position"
+
+        items = []
+        for row in self._query(sql, tuple(params)):
+            item = dict(row)
+            item['candidate'] = json.loads(item.pop('candidate_json')) if item['candidate_json'] else None
+            item['result'] = json.loads(item.pop('result_json')) if item['result_json'] else None
+            items.append(item)
+        return items
+
+    def save_candidate(self, run_id: str, model: str, category: str, candidate: Dict):
+        self._execute("""
+            UPDATE benchmark_batch_items
+            SET status = ?, candidate_json = ?, error = NULL, attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE run_id = ? AND model = ? AND category = ?
+        """, (ITEM_GENERATED, json.dumps(candidate, ensure_ascii=False), run_id, model, category))
+
+    def save_result(self, run_id: str, model: str, category: str, result: Dict):
+        self._execute("""
+            UPDATE benchmark_batch_items
+            SET status = ?, result_json = ?, error = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE run_id = ? AND model = ? AND category = ?
+        """, (ITEM_JUDGED, json.dumps(result, ensure_ascii=False), run_id, model, category))
+
+    def record_error(self, run_id: str, model: str, category: str, error: str):
+        """Keeps the item at its current status so a resume retries the failed stage."""
+        self._execute("""
+            UPDATE benchmark_batch_items
+            SET error = ?, attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE run_id = ? AND model = ? AND category = ?
+        """, (error, run_id, model, category))
+
+    def progress(self, run_id: str) -> Dict[str, int]:
+        counts = {ITEM_PENDING: 0, ITEM_GENERATED: 0, ITEM_JUDGED: 0}
+        for row in self._query("""
+            SELECT status, COUNT(*) AS count FROM benchmark_batch_items WHERE run_id = ? GROUP BY status
+        """, (run_id,)):
+            counts[row['status']] = row['count']
+        return counts
+
+    def finish_run(self, run_id: str, load_report: Optional[Dict] = None) -> str:
+        """Marks the run completed when every item is judged, otherwise incomplete."""
+        progress = self.progress(run_id)
+        status = RUN_COMPLETED if progress[ITEM_PENDING] == progress[ITEM_GENERATED] == 0 else RUN_INCOMPLETE
+        self._execute("""
+            UPDATE benchmark_batch_runs SET status = ?, load_report_json = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE run_id = ?
+        """, (status, json.dumps(load_report) if load_report is not None else None, run_id))
+        return status
+
+    def results(self, run_id: str) -> Dict[str, List[Dict]]:
+        """Judged results grouped per model, in category order."""
+        grouped: Dict[str, List[Dict]] = {model: [] for model in self.get_run(run_id)['models']}
+        for item in self.items(run_id, status=ITEM_JUDGED):
+            grouped[item['model']].append(item['result'])
+        return grouped
+
+
+class IncrementalResultWriter:
+    """Appends one JSON line per finished item so partial reports are readable mid-run."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+                f.flush()
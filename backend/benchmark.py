@@ -13,6 +13,14 @@ from prompt_loader import PromptLoader # Import PromptLoader
 from standard_loader import StandardLoader # Import StandardLoader
 import logging # Import logging
 import re # Import re for regex
+from concurrent.futures import ThreadPoolExecutor, as_completed # Concurrent category execution
+from http_pool import get_session # Shared keep-alive sessions per Ollama host
+from streaming import StreamTimer, consume_ndjson_stream # Token stream consumption with latency marks
+from models import GenerationStats, BenchmarkPrompt # Typed Ollama timing fields and prompts
+from judge_cache import JudgeCache, get_judge_cache # Content-addressed judge verdicts
+from response_cache import get_response_cache, is_deterministic # On-disk cache of deterministic generations
+from trial_stats import summarize_trials, should_stop # Bootstrap intervals for repeat trials
+from embedding_benchmark import evaluate_embeddings # Retrieval/similarity scoring for embedding models
 
 logger = logging.getLogger(__name__) # Initialize logger
 
@@ -41,7 +49,10 @@ LOCALIZED_STRINGS = {
         "benchmark_score": "⭐ Score: {score}/5",
         "benchmark_complete_full": "🚀 Starting full benchmark: {model_name}",
         "benchmark_complete": "✅ Test complete! Results saved: {output_file}",
-        "benchmark_average_score": "📊 Average score: {avg_score}/5"
+        "benchmark_average_score": "📊 Average score: {avg_score}/5",
+        "benchmark_average_ttft": "⚡ Average time to first token: {ttft_ms} ms",
+        "benchmark_judge_cache": "🗄️  Judge cache: {hits} hits / {misses} misses",
+        "embedding_summary": "Recall@{k} {recall}, MRR {mrr}, similarity Spearman {spearman}, neighbour purity {purity}, {rate} embeddings/sec"
     },
     "zh_TW": {
         "category_name_reasoning": "推理能力",
@@ -60,7 +71,10 @@ LOCALIZED_STRINGS = {
         "benchmark_score": "⭐ 評分: {score}/5",
         "benchmark_complete_full": "🚀 開始完整基準測試: {model_name}",
         "benchmark_complete": "✅ 測試完成！結果已儲存: {output_file}",
-        "benchmark_average_score": "📊 平均分數: {avg_score}/5"
+        "benchmark_average_score": "📊 平均分數: {avg_score}/5",
+        "benchmark_average_ttft": "⚡ 平均首字延遲: {ttft_ms} ms",
+        "benchmark_judge_cache": "🗄️  評審快取: 命中 {hits} 次 / 未命中 {misses} 次",
+        "embedding_summary": "Recall@{k} {recall}，MRR {mrr}，相似度 Spearman {spearman}，近鄰純度 {purity}，每秒 {rate} 個嵌入"
     }
 }
 
@@ -85,24 +99,116 @@ CATEGORIES = {
     'embedding': {}
 }
 
+GEMINI_JUDGE_MODEL = 'gemini-2.0-flash-exp' # Used when gemini.model is not configured
+
+class GenerationError(Exception):
+    """受測模型呼叫失敗 (訊息為在地化的錯誤字串)"""
+
+def _generation_failed(message: str, raise_on_error: bool) -> str:
+    """raise_on_error 時拋出 GenerationError，否則沿用舊行為以錯誤字串作為回應"""
+    if raise_on_error:
+        raise GenerationError(message)
+    return message
+
 def call_ollama(model: str, prompt: str, config: dict, language: str = "en") -> str:
     """呼叫 Ollama 模型"""
+    return call_ollama_with_stats(model, prompt, config, language)[0]
+
+def _generate_payload(model: str, prompt: str, config: dict, stream: bool) -> dict:
+    payload = {"model": model, "prompt": prompt, "stream": stream}
+    # keep_alive pins the model in memory between calls (set by the batch scheduler)
+    if config['ollama'].get('keep_alive') is not None:
+        payload["keep_alive"] = config['ollama']['keep_alive']
+    if config['ollama'].get('options'):
+        payload["options"] = config['ollama']['options']
+    return payload
+
+def call_ollama_with_stats(model: str, prompt: str, config: dict, language: str = "en", raise_on_error: bool = False) -> tuple:
+    """呼叫 Ollama 模型，回傳 (回應文字, GenerationStats)；raise_on_error 時失敗拋出 GenerationError"""
     if not config['ollama']['enabled']:
         print(get_localized_string("ollama_not_enabled", language))
-        return get_localized_string("ollama_not_enabled", language)
+        return _generation_failed(get_localized_string("ollama_not_enabled", language), raise_on_error), GenerationStats()
     
+    # 確定性生成 (temperature 0 或固定 seed) 可重播快取的回應
+    options = config['ollama'].get('options')
+    cache = get_response_cache(config) if is_deterministic(options) else None
+    if cache:
+        cached = cache.get(model, prompt, options=options)
+        if cached is not None:
+            logger.info(f"Response cache hit for {model}")
+            # No generation ran, so there are no timing fields to report
+            return cached.get('response', ''), GenerationStats()
+
     try:
-        response = requests.post(
+        response = get_session(config['ollama']['url']).post(
             f"{config['ollama']['url']}/api/generate",
-            json={"model": model, "prompt": prompt, "stream": False},
+            json=_generate_payload(model, prompt, config, stream=False),
             timeout=config['ollama']['timeout_seconds']
         )
         if response.status_code == 200:
-            return response.json().get('response', '')
-        print(get_localized_string("ollama_api_error", language, status_code=response.status_code, text=response.text[:50]))
-        return get_localized_string("ollama_api_error", language, status_code=response.status_code, text=response.text[:50])
+            data = response.json()
+        else:
+            print(get_localized_string("ollama_api_error", language, status_code=response.status_code, text=response.text[:50]))
+            message = get_localized_string("ollama_api_error", language, status_code=response.status_code, text=response.text[:50])
+            return _generation_failed(message, raise_on_error), GenerationStats()
+    except Exception as e:
+        message = get_localized_string("ollama_connection_fail", language, error=e)
+        return _generation_failed(message, raise_on_error), GenerationStats()
+
+    if cache:
+        try:
+            cache.put(model, prompt, {k: v for k, v in data.items() if k != 'context'}, options=options)
+        except Exception as e:
+            # The generation itself succeeded; a cache write failure must not turn it into one
+            logger.warning(f"Could not cache the response of {model}: {e}")
+    return data.get('response', ''), GenerationStats.from_ollama(data)
+
+def call_ollama_stream(model: str, prompt: str, config: dict, language: str = "en", raise_on_error: bool = False) -> tuple:
+    """以串流模式呼叫 Ollama 模型，回傳 (回應文字, 延遲統計, GenerationStats)；raise_on_error 時失敗拋出 GenerationError"""
+    if not config['ollama']['enabled']:
+        print(get_localized_string("ollama_not_enabled", language))
+        return _generation_failed(get_localized_string("ollama_not_enabled", language), raise_on_error), None, GenerationStats()
+
+    timer = StreamTimer()
+    try:
+        with get_session(config['ollama']['url']).post(
+            f"{config['ollama']['url']}/api/generate",
+            json=_generate_payload(model, prompt, config, stream=True),
+            timeout=config['ollama']['timeout_seconds'],
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                print(get_localized_string("ollama_api_error", language, status_code=response.status_code, text=response.text[:50]))
+                message = get_localized_string("ollama_api_error", language, status_code=response.status_code, text=response.text[:50])
+                return _generation_failed(message, raise_on_error), None, GenerationStats()
+            for event in consume_ndjson_stream(response.iter_lines(), timer):
+                if event['type'] == 'done':
+                    # The final chunk carries the same timing fields as a non-streamed response
+                    return event['response'], event['latency'], GenerationStats.from_ollama(event['raw_response'])
     except Exception as e:
-        return get_localized_string("ollama_connection_fail", language, error=e)
+        return _generation_failed(get_localized_string("ollama_connection_fail", language, error=e), raise_on_error), None, GenerationStats()
+    return "", timer.summary(), GenerationStats()
+
+def unload_model(model: str, config: dict) -> bool:
+    """請 Ollama 立即卸載模型 (keep_alive=0)，釋放記憶體給下一個模型"""
+    try:
+        response = get_session(config['ollama']['url']).post(
+            f"{config['ollama']['url']}/api/generate",
+            json={"model": model, "keep_alive": 0},
+            timeout=config['ollama']['timeout_seconds']
+        )
+        return response.status_code == 200
+    except Exception as e:
+        logger.warning(f"Failed to unload model {model}: {e}")
+        return False
+
+def get_judge_backend(config: dict) -> str:
+    """回傳 call_llm_judge 會使用的評審後端: 'gemini'、'ollama' 或 'simple'"""
+    if config.get('gemini', {}).get('enabled', False) and config['gemini'].get('api_key'):
+        return 'gemini'
+    if config.get('ollama_judge', {}).get('enabled', False):
+        return 'ollama'
+    return 'simple'
 
 def _call_ollama_judge(model_output: str, category: str, config: dict, language: str = "en") -> dict:
     """使用 Ollama 作為評審 (Helper function for Ollama judging)"""
@@ -114,8 +220,9 @@ def _call_ollama_judge(model_output: str, category: str, config: dict, language:
     judge_prompt_template = standard.ollama_judge_prompt_template or standard.judge_prompt_template
     judge_prompt = judge_prompt_template.replace("{model_output_placeholder}", model_output)
 
+    judge_stats = GenerationStats()
     try:
-        response_text = call_ollama(ollama_judge_model, judge_prompt, config, language)
+        response_text, judge_stats = call_ollama_with_stats(ollama_judge_model, judge_prompt, config, language)
         
         # Extract JSON from markdown code block if present
         json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
@@ -137,71 +244,80 @@ def _call_ollama_judge(model_output: str, category: str, config: dict, language:
         return {
             'score': float(main_score),
             'reasoning': reasoning,
-            'breakdown': {m: float(breakdown_scores.get(m, 0)) for m in standard.metrics}
+            'breakdown': {m: float(breakdown_scores.get(m, 0)) for m in standard.metrics},
+            'judge_stats': judge_stats.to_dict()
         }
     except json.JSONDecodeError as e:
         logger.error(f"Ollama Judge response not valid JSON: {response_text[:200]} Error: {e}")
-        return {'score': 0, 'reasoning': get_localized_string("score_judge_fail", language, error=f"JSON parsing error: {e}"), 'breakdown': {m: 0 for m in standard.metrics}}
+        return {'score': 0, 'reasoning': get_localized_string("score_judge_fail", language, error=f"JSON parsing error: {e}"), 'breakdown': {m: 0 for m in standard.metrics}, 'judge_stats': judge_stats.to_dict(), 'judge_error': str(e)}
     except Exception as e:
         logger.error(f"Error during Ollama judging: {e}")
-        return {'score': 0, 'reasoning': get_localized_string("score_judge_fail", language, error=e), 'breakdown': {m: 0 for m in standard.metrics}}
+        return {'score': 0, 'reasoning': get_localized_string("score_judge_fail", language, error=e), 'breakdown': {m: 0 for m in standard.metrics}, 'judge_stats': judge_stats.to_dict(), 'judge_error': str(e)}
+
+def _call_gemini_judge(model_output: str, standard, config: dict, language: str = "en") -> dict:
+    """使用 Gemini 作為評審 (Helper function for Gemini judging)"""
+    try:
+        import google.generativeai as genai
+        genai.configure(api_key=config['gemini']['api_key'])
+        judge = genai.GenerativeModel(config['gemini'].get('model', GEMINI_JUDGE_MODEL))
+        
+        judge_prompt = standard.judge_prompt_template.replace("{model_output_placeholder}", model_output)
+        
+        response = judge.generate_content(judge_prompt)
+        text = response.text
+        
+        main_score = 0
+        breakdown_scores = {}
+        
+        try:
+            parsed_response = json.loads(text)
+            main_score = parsed_response.get('score', 0)
+            reasoning = parsed_response.get('reasoning', text[:200])
+            breakdown_from_judge = parsed_response.get('breakdown', {})
+            
+            for metric in standard.metrics:
+                breakdown_scores[metric] = breakdown_from_judge.get(metric, main_score)
+            
+        except json.JSONDecodeError:
+            logger.warning(f"Gemini Judge response not valid JSON: {text[:200]}")
+            match = re.search(r'"score"\s*:\s*(\d)', text)
+            main_score = int(match.group(1)) if match else 3
+            reasoning = text[:200]
+            for metric in standard.metrics:
+                breakdown_scores[metric] = main_score
+        
+        return {
+            'score': float(main_score),
+            'reasoning': reasoning,
+            'breakdown': {m: float(breakdown_scores.get(m, 0)) for m in standard.metrics}
+        }
+    except Exception as e:
+        logger.error(f"Error during Gemini judging: {e}")
+        return {'score': 0, 'reasoning': get_localized_string("score_judge_fail", language, error=e), 'breakdown': {m: 0 for m in standard.metrics}, 'judge_error': str(e)}
 
-def call_llm_judge(model_output: str, category: str, config: dict, language: str = "en") -> dict:
-    """使用 LLM 作為評審 (Generic LLM judging function)"""
+def _judge_cache_key(model_output: str, standard, backend: str, config: dict) -> tuple:
+    """回傳 (快取鍵, 評審模型)"""
+    if backend == 'gemini':
+        judge_model = config['gemini'].get('model', GEMINI_JUDGE_MODEL)
+        template = standard.judge_prompt_template
+    else:
+        judge_model = config['ollama_judge']['model']
+        template = standard.ollama_judge_prompt_template or standard.judge_prompt_template
+    return JudgeCache.make_key(model_output, standard.name, backend, judge_model, template), judge_model
+
+def call_llm_judge(model_output: str, category: str, config: dict, language: str = "en", bypass_cache: bool = False) -> dict:
+    """
+    使用 LLM 作為評審 (Generic LLM judging function)
+    啟用 benchmark.judge_cache 時，相同輸出/標準/評審的結果直接取自快取；
+    bypass_cache=True 會略過查詢並以新的評審結果覆寫快取。
+    """
     
     standard = standard_loader.get_standard(category, language)
     if not standard:
         raise ValueError(f"Scoring standard not found for category '{category}' and language '{language}'")
 
-    category_name = get_localized_string(f"category_name_{category}", language)
-    
-    gemini_key = config['gemini'].get('api_key')
-    gemini_enabled = config['gemini'].get('enabled', False)
-    ollama_judge_enabled = config['ollama_judge'].get('enabled', False)
-
-    if gemini_enabled and gemini_key:
-        try:
-            import google.generativeai as genai
-            genai.configure(api_key=gemini_key)
-            judge = genai.GenerativeModel('gemini-2.0-flash-exp') # Use configured Gemini model if available from standard
-            
-            judge_prompt = standard.judge_prompt_template.replace("{model_output_placeholder}", model_output)
-            
-            response = judge.generate_content(judge_prompt)
-            text = response.text
-            
-            main_score = 0
-            breakdown_scores = {}
-            
-            try:
-                parsed_response = json.loads(text)
-                main_score = parsed_response.get('score', 0)
-                reasoning = parsed_response.get('reasoning', text[:200])
-                breakdown_from_judge = parsed_response.get('breakdown', {})
-                
-                for metric in standard.metrics:
-                    breakdown_scores[metric] = breakdown_from_judge.get(metric, main_score)
-                
-            except json.JSONDecodeError:
-                logger.warning(f"Gemini Judge response not valid JSON: {text[:200]}")
-                import re
-                match = re.search(r'"score"\s*:\s*(\d)', text)
-                main_score = int(match.group(1)) if match else 3
-                reasoning = text[:200]
-                for metric in standard.metrics:
-                    breakdown_scores[metric] = main_score
-            
-            return {
-                'score': float(main_score),
-                'reasoning': reasoning,
-                'breakdown': {m: float(breakdown_scores.get(m, 0)) for m in standard.metrics}
-            }
-        except Exception as e:
-            logger.error(f"Error during Gemini judging: {e}")
-            return {'score': 0, 'reasoning': get_localized_string("score_judge_fail", language, error=e), 'breakdown': {m: 0 for m in standard.metrics}}
-    elif ollama_judge_enabled:
-        return _call_ollama_judge(model_output, category, config, language)
-    else:
+    backend = get_judge_backend(config)
+    if backend == 'simple':
         # Final fallback to simple scoring
         if "錯誤" in model_output or "失敗" in model_output or "未啟用" in model_output:
             return {'score': 0, 'reasoning': get_localized_string("score_model_fail", language), 'breakdown': {}}
@@ -213,48 +329,213 @@ def call_llm_judge(model_output: str, category: str, config: dict, language: str
             'breakdown': {m: score for m in standard.metrics}
         }
 
-def run_benchmark(model_name: str, category: str, config: dict, language: str = "en") -> dict:
-    """執行單項基準測試"""
-    
+    cache = get_judge_cache(config)
+    if cache:
+        cache_key, judge_model = _judge_cache_key(model_output, standard, backend, config)
+        if not bypass_cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return {**cached, 'judge_stats': None, 'cached': True}
+
+    if backend == 'gemini':
+        result = _call_gemini_judge(model_output, standard, config, language)
+    else:
+        result = _call_ollama_judge(model_output, category, config, language)
+
+    # Failed judgements are retried next time instead of being cached
+    if cache and 'judge_error' not in result:
+        verdict = {k: v for k, v in result.items() if k != 'judge_stats'}
+        cache.put(cache_key, verdict, standard.name, backend, judge_model)
+    return result
+
+def generate_candidate(model_name: str, category: str, config: dict, language: str = "en", stream: bool = False,
+                       prompt_obj: Optional[BenchmarkPrompt] = None) -> dict:
+    """第一階段：呼叫受測模型產生回應 (Stage 1: candidate generation)；prompt_obj 指定資料集中的題目"""
     category_name_display = get_localized_string(f"category_name_{category}", language)
     print(get_localized_string("benchmark_test_category", language, model_name=model_name, category_name=category_name_display))
+
+    if category == 'embedding':
+        # 嵌入模型以檢索/相似度任務直接量測，而非生成文字交由 LLM 評審
+        return _generate_embedding_candidate(model_name, config, language)
     
     # 呼叫模型
-    prompt_obj = prompt_loader.get_prompt(category, language)
+    prompt_obj = prompt_obj or prompt_loader.get_prompt(category, language)
     if not prompt_obj:
         raise ValueError(f"Prompt not found for category '{category}' and language '{language}'")
     prompt = prompt_obj.text
-    model_output = call_ollama(model_name, prompt, config, language)
-    
+    latency = None
+    generation_error = None
+    try:
+        if stream:
+            model_output, latency, stats = call_ollama_stream(model_name, prompt, config, language, raise_on_error=True)
+        else:
+            model_output, stats = call_ollama_with_stats(model_name, prompt, config, language, raise_on_error=True)
+    except GenerationError as e:
+        # 錯誤訊息仍作為回應交給評審 (單項測試的舊行為)，批次排程則依 generation_error 重試
+        model_output, stats, generation_error = str(e), GenerationStats(), str(e)
+
     print(get_localized_string("benchmark_model_response", language, response_snippet=model_output[:100]))
-    
-    # LLM 評分
-    result = call_llm_judge(model_output, category, config, language)
-    
-    print(get_localized_string("benchmark_score", language, score=result['score']))
-    
+
     return {
         'model': model_name,
         'category': category,
+        'prompt_name': prompt_obj.name,
         'prompt': prompt,
         'output': model_output,
+        'latency': latency,
+        'stats': stats.to_dict(),
+        'generation_error': generation_error,
+    }
+
+def _generate_embedding_candidate(model_name: str, config: dict, language: str = "en") -> dict:
+    """以 embedding_benchmark 量測嵌入模型，結果放在 candidate['embedding']"""
+    try:
+        evaluation = evaluate_embeddings(model_name, config, language)
+        metrics = evaluation['metrics']
+        top_k = config.get('benchmark', {}).get('embedding', {}).get('top_k', 5)
+        output = get_localized_string(
+            "embedding_summary", language, recall=f"{metrics[f'recall_at_{top_k}']:.2f}", k=top_k,
+            mrr=f"{metrics['mrr']:.2f}", spearman=f"{metrics['spearman'] or 0:.2f}",
+            purity=f"{metrics['neighbour_purity']:.2f}", rate=metrics['embeddings_per_sec']
+        )
+    except Exception as e:
+        logger.error(f"Embedding benchmark failed for {model_name}: {e}")
+        evaluation = {'error': str(e)}
+        output = get_localized_string("ollama_connection_fail", language, error=e)
+    generation_error = evaluation.get('error')
+
+    print(get_localized_string("benchmark_model_response", language, response_snippet=output[:100]))
+    return {
+        'model': model_name,
+        'category': 'embedding',
+        'prompt_name': evaluation.get('task'),
+        'prompt': None,
+        'output': output,
+        'latency': None,
+        'stats': GenerationStats().to_dict(),
+        'embedding': evaluation,
+        'generation_error': generation_error,
+    }
+
+def _score_embedding_candidate(candidate: dict, language: str = "en") -> dict:
+    evaluation = candidate['embedding']
+    if 'error' in evaluation:
+        return {'score': 0, 'reasoning': get_localized_string("score_model_fail", language), 'breakdown': {}}
+    return {'score': evaluation['score'], 'reasoning': candidate['output'], 'breakdown': evaluation['breakdown']}
+
+def judge_candidate(candidate: dict, config: dict, language: str = "en", bypass_judge_cache: bool = False) -> dict:
+    """第二階段：由評審模型評分 (Stage 2: judging a generated candidate)"""
+    if 'embedding' in candidate:
+        # 嵌入任務已有客觀指標，不需要 LLM 評審
+        result = _score_embedding_candidate(candidate, language)
+    else:
+        # LLM 評分
+        result = call_llm_judge(candidate['output'], candidate['category'], config, language, bypass_cache=bypass_judge_cache)
+    
+    print(get_localized_string("benchmark_score", language, score=result['score']))
+    
+    return {
+        'model': candidate['model'],
+        'category': candidate['category'],
+        'prompt_name': candidate.get('prompt_name'),
+        'prompt': candidate['prompt'],
+        'output': candidate['output'],
         'score': result['score'],
         'reasoning': result['reasoning'],
         'breakdown': result.get('breakdown', {}),
+        'latency': candidate['latency'],
+        'stats': candidate['stats'],
+        'judge_stats': result.get('judge_stats'),
+        'judge_cached': result.get('cached', False),
+        'embedding_metrics': candidate.get('embedding', {}).get('metrics'),
+        'judge_error': result.get('judge_error'),
         'timestamp': datetime.now().isoformat()
     }
 
-def run_full_benchmark(model_name: str, language: str = "en") -> List[dict]:
-    """執行完整基準測試"""
-    with open("./config/jade_config.yaml", 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+def run_benchmark(model_name: str, category: str, config: dict, language: str = "en", stream: bool = False,
+                  bypass_judge_cache: bool = False) -> dict:
+    """執行單項基準測試 (stream=True 時額外記錄首字延遲等回應速度指標)"""
+    candidate = generate_candidate(model_name, category, config, language, stream=stream)
+    return judge_candidate(candidate, config, language, bypass_judge_cache)
+
+def run_repeat_trials(model_name: str, category: str, config: dict, language: str = "en", max_trials: int = 10,
+                      min_trials: int = 3, target_ci_width: float = 0.5, confidence: float = 0.95,
+                      prompt_obj: Optional[BenchmarkPrompt] = None, on_trial=None) -> dict:
+    """
+    重複評測同一題目，直到 bootstrap 信賴區間寬度不超過 target_ci_width
+    或達到 max_trials；on_trial(index, result) 可用於逐筆保存每次結果。
+    """
+    results = []
+    scores = []
+    for index in range(max_trials):
+        candidate = generate_candidate(model_name, category, config, language, prompt_obj=prompt_obj)
+        result = judge_candidate(candidate, config, language)
+        results.append(result)
+        scores.append(float(result['score']))
+        if on_trial:
+            on_trial(index, result)
+        if should_stop(scores, min_trials, target_ci_width, confidence):
+            break
+
+    return {
+        'model': model_name,
+        'category': category,
+        'prompt_name': results[0].get('prompt_name') if results else None,
+        **summarize_trials(scores, confidence),
+        'stopped_early': len(scores) < max_trials,
+        'scores': scores,
+        'results': results,
+    }
+
+def run_categories_concurrently(model_name: str, categories: List[str], config: dict, language: str = "en",
+                                stream: bool = False, parallelism: int = 2, bypass_judge_cache: bool = False) -> List[dict]:
+    """
+    兩階段生產者/消費者管線：受測模型的生成與前一類別的評審重疊執行。
+    結果依 categories 順序回傳，與序列執行相同。
+    """
+    results: List[Optional[dict]] = [None] * len(categories)
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="bench-gen") as gen_pool, \
+         ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="bench-judge") as judge_pool:
+        gen_futures = {
+            gen_pool.submit(generate_candidate, model_name, category, config, language, stream): index
+            for index, category in enumerate(categories)
+        }
+        judge_futures = {}
+        # Hand each candidate to the judge stage as soon as its generation finishes
+        for future in as_completed(gen_futures):
+            judge_futures[judge_pool.submit(judge_candidate, future.result(), config, language, bypass_judge_cache)] = gen_futures[future]
+        for future, index in judge_futures.items():
+            results[index] = future.result()
+    return results
+
+def load_benchmark_config(config_path: str = "./config/jade_config.yaml") -> dict:
+    """載入基準測試設定"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+def run_full_benchmark(model_name: str, language: str = "en", stream: bool = False,
+                       parallelism: Optional[int] = None, serial: Optional[bool] = None,
+                       bypass_judge_cache: bool = False) -> List[dict]:
+    """執行完整基準測試 (預設依 benchmark.parallelism 並行；serial=True 時逐一執行)"""
+    config = load_benchmark_config()
+
+    bench_conf = config.get('benchmark', {})
+    if parallelism is None:
+        parallelism = bench_conf.get('parallelism', 2)
+    if serial is None:
+        # Hosts that can only hold one model in memory should run serially to avoid reload thrashing
+        serial = bench_conf.get('serial', False)
     
     print(get_localized_string("benchmark_complete_full", language, model_name=model_name))
     
-    results = []
-    for category in CATEGORIES.keys():
-        result = run_benchmark(model_name, category, config, language)
-        results.append(result)
+    categories = list(CATEGORIES.keys())
+    if serial or parallelism <= 1:
+        results = []
+        for category in categories:
+            result = run_benchmark(model_name, category, config, language, stream=stream, bypass_judge_cache=bypass_judge_cache)
+            results.append(result)
+    else:
+        results = run_categories_concurrently(model_name, categories, config, language, stream, parallelism, bypass_judge_cache)
     
     # 儲存結果
     output_file = f"./output/benchmark_{model_name.replace(':', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
@@ -266,11 +547,26 @@ def run_full_benchmark(model_name: str, language: str = "en") -> List[dict]:
     # 顯示摘要
     avg_score = sum(r['score'] for r in results) / len(results)
     print(get_localized_string("benchmark_average_score", language, avg_score=f"{avg_score:.1f}"))
+    ttfts = [r['latency']['ttft_ms'] for r in results if r.get('latency') and r['latency'].get('ttft_ms') is not None]
+    if ttfts:
+        print(get_localized_string("benchmark_average_ttft", language, ttft_ms=f"{sum(ttfts) / len(ttfts):.0f}"))
+    judge_cache = get_judge_cache(config)
+    if judge_cache:
+        cache_stats = judge_cache.stats()
+        print(get_localized_string("benchmark_judge_cache", language, hits=cache_stats['hits'], misses=cache_stats['misses']))
     
     return results
 
 if __name__ == "__main__":
-    import sys
-    model = sys.argv[1] if len(sys.argv) > 1 else "llama3.2:latest"
-    lang = sys.argv[2] if len(sys.argv) > 2 else "en"
-    run_full_benchmark(model, lang)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="執行完整基準測試")
+    parser.add_argument("model", nargs="?", default="llama3.2:latest", help="受測模型")
+    parser.add_argument("language", nargs="?", default="en", help="提示語言 (en, zh_TW)")
+    parser.add_argument("--stream", action="store_true", help="以串流模式記錄首字延遲")
+    parser.add_argument("--parallelism", type=int, default=None, help="並行數 (預設讀取 benchmark.parallelism)")
+    parser.add_argument("--serial", action="store_true", default=None, help="逐一執行 (Ollama 僅能載入單一模型時使用)")
+    parser.add_argument("--fresh-judge", action="store_true", help="略過評審快取，重新評分")
+    args = parser.parse_args()
+    run_full_benchmark(args.model, args.language, stream=args.stream, parallelism=args.parallelism, serial=args.serial,
+                       bypass_judge_cache=args.fresh_judge)
@@ -4,8 +4,17 @@
 測試多個模型並生成比較報告
 """
 import json
-from benchmark import run_full_benchmark
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmark import (
+    CATEGORIES, prompt_loader, load_benchmark_config, generate_candidate,
+    judge_candidate, unload_model, get_judge_backend
+)
+from batch_manifest import (
+    BatchManifest, IncrementalResultWriter, ITEM_PENDING, ITEM_GENERATED, ITEM_JUDGED, RUN_COMPLETED
+)
 
 # 從 my_ollama_llms.txt 推薦的模型
 RECOMMENDED_MODELS = {
@@ -16,29 +25,213 @@ RECOMMENDED_MODELS = {
     'embedding': 'nomic-embed-text:v1.5'
 }
 
-def run_batch_benchmark():
-    """批次測試推薦模型"""
-    print("🚀 批次基準測試開始\n")
-    
-    all_results = {}
-    
-    for category, model in RECOMMENDED_MODELS.items():
+# 模型在區塊內保持載入的時間 (Ollama keep_alive)
+DEFAULT_PIN_KEEP_ALIVE = "30m"
+
+def _pinned_config(config: dict, keep_alive: str) -> dict:
+    """複製設定並加上 keep_alive，讓目前區塊的模型常駐記憶體"""
+    return {**config, 'ollama': {**config['ollama'], 'keep_alive': keep_alive}}
+
+def _load_ms(stats: Optional[dict]) -> float:
+    if not stats or stats.get('load_duration') is None:
+        return 0.0
+    return stats['load_duration'] / 1e6
+
+def build_load_report(candidates: Dict[str, List[dict]], results: Dict[str, List[dict]], judge_backend: str) -> dict:
+    """
+    比較分組排程與逐類別交替排程的模型載入成本。
+    交替排程下每個項目都會換入受測模型再換入評審模型；其載入時間以
+    本次各模型區塊中觀察到的最長 (冷啟動) 載入時間估算。
+    """
+    ollama_judge = judge_backend == 'ollama'
+    cold_load_ms = {model: max((_load_ms(c['stats']) for c in cs), default=0.0) for model, cs in candidates.items()}
+    judge_loads = [_load_ms(r.get('judge_stats')) for rs in results.values() for r in rs]
+    judge_cold_load_ms = max(judge_loads, default=0.0)
+
+    actual_load_ms = sum(_load_ms(c['stats']) for cs in candidates.values() for c in cs) + sum(judge_loads)
+    if ollama_judge:
+        naive_model_loads = sum(2 * len(cs) for cs in candidates.values())
+        estimated_naive_ms = sum(len(cs) * (cold_load_ms[model] + judge_cold_load_ms) for model, cs in candidates.items())
+    else:
+        # 沒有 Ollama 評審時，受測模型在兩種排程下都只載入一次
+        naive_model_loads = len(candidates)
+        estimated_naive_ms = sum(cold_load_ms.values())
+
+    return {
+        'judge_backend': judge_backend,
+        'model_loads': len(candidates) + (1 if ollama_judge and judge_loads else 0),
+        'naive_model_loads': naive_model_loads,
+        'load_time_ms': round(actual_load_ms, 1),
+        'estimated_naive_load_time_ms': round(estimated_naive_ms, 1),
+        'saved_ms': round(max(estimated_naive_ms - actual_load_ms, 0.0), 1),
+    }
+
+def _generate_item(manifest: BatchManifest, run_id: str, item: dict, config: dict, language: str,
+                   stream: bool) -> Optional[dict]:
+    """生成單一項目並寫入 manifest；失敗時記錄錯誤，下次續跑會重試"""
+    try:
+        candidate = generate_candidate(item['model'], item['category'], config, language, stream=stream)
+    except Exception as e:
+        print(f"❌ 生成失敗 {item['model']} / {item['category']}: {e}")
+        manifest.record_error(run_id, item['model'], item['category'], str(e))
+        return None
+    if candidate.get('generation_error'):
+        # 呼叫失敗時回應只是錯誤字串，不送評審；項目維持 pending
+        print(f"❌ 生成失敗 {item['model']} / {item['category']}: {candidate['generation_error']}")
+        manifest.record_error(run_id, item['model'], item['category'], candidate['generation_error'])
+        return None
+    manifest.save_candidate(run_id, item['model'], item['category'], candidate)
+    return candidate
+
+def _judge_item(manifest: BatchManifest, run_id: str, candidate: dict, config: dict, language: str,
+                writer: Optional[IncrementalResultWriter], bypass_judge_cache: bool = False) -> Optional[dict]:
+    """評分單一項目，寫入 manifest 並附加到增量報告"""
+    try:
+        result = judge_candidate(candidate, config, language, bypass_judge_cache)
+    except Exception as e:
+        print(f"❌ 評審失敗 {candidate['model']} / {candidate['category']}: {e}")
+        manifest.record_error(run_id, candidate['model'], candidate['category'], str(e))
+        return None
+    if result.get('judge_error'):
+        # 評審失敗的 0 分不是成績；項目維持 generated，續跑時重新評分
+        print(f"❌ 評審失敗 {candidate['model']} / {candidate['category']}: {result['judge_error']}")
+        manifest.record_error(run_id, candidate['model'], candidate['category'], result['judge_error'])
+        return None
+    manifest.save_result(run_id, candidate['model'], candidate['category'], result)
+    if writer:
+        writer.append({'run_id': run_id, **result})
+    return result
+
+def run_grouped_schedule(manifest: BatchManifest, run_id: str, config: dict, language: str = "en", stream: bool = False,
+                         keep_alive: str = DEFAULT_PIN_KEEP_ALIVE,
+                         writer: Optional[IncrementalResultWriter] = None, bypass_judge_cache: bool = False) -> dict:
+    """
+    模型切換感知排程：先依模型分組完成所有受測生成，再以評審模型一次完成所有評分，
+    避免 Ollama 在受測模型與評審模型之間反覆卸載/載入權重。
+    只處理 manifest 中尚未完成的項目；回傳本次執行的模型載入報告。
+    """
+    parallelism = max(config.get('benchmark', {}).get('parallelism', 2), 1)
+    pinned = _pinned_config(config, keep_alive)
+
+    # 階段一：每個模型一個區塊，區塊內的請求共用已載入的權重
+    candidates: Dict[str, List[dict]] = {}
+    for model in manifest.get_run(run_id)['models']:
+        pending = manifest.items(run_id, status=ITEM_PENDING, model=model)
+        if not pending:
+            continue
         print(f"\n{'='*60}")
-        print(f"測試類別: {category} | 模型: {model}")
+        print(f"生成區塊 | 模型: {model} ({len(pending)} 項)")
         print('='*60)
-        
         try:
-            results = run_full_benchmark(model)
-            all_results[model] = results
-        except Exception as e:
-            print(f"❌ 測試失敗: {e}")
-    
+            with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="batch-gen") as pool:
+                generated = pool.map(lambda item: _generate_item(manifest, run_id, item, pinned, language, stream), pending)
+                candidates[model] = [c for c in generated if c is not None]
+        finally:
+            unload_model(model, config)
+
+    # 階段二：評審區塊，評審模型只載入一次 (包含先前中斷時已生成但未評分的項目)
+    to_judge = manifest.items(run_id, status=ITEM_GENERATED)
+    judge_backend = get_judge_backend(config)
+    results: Dict[str, List[dict]] = {}
+    if to_judge:
+        print(f"\n{'='*60}")
+        print(f"評審區塊 | 後端: {judge_backend} ({len(to_judge)} 項)")
+        print('='*60)
+        with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="batch-judge") as pool:
+            judged = pool.map(lambda item: _judge_item(manifest, run_id, item['candidate'], pinned, language, writer, bypass_judge_cache), to_judge)
+            for result in judged:
+                if result is not None:
+                    results.setdefault(result['model'], []).append(result)
+        if judge_backend == 'ollama':
+            unload_model(config['ollama_judge']['model'], config)
+
+    return build_load_report(candidates, results, judge_backend)
+
+def run_naive_schedule(manifest: BatchManifest, run_id: str, config: dict, language: str = "en", stream: bool = False,
+                       writer: Optional[IncrementalResultWriter] = None, bypass_judge_cache: bool = False):
+    """逐模型逐類別交替生成與評分 (原始排程)，每個項目完成即寫入 manifest"""
+    for item in manifest.items(run_id):
+        if item['status'] == ITEM_JUDGED:
+            continue
+        candidate = item['candidate']
+        if item['status'] == ITEM_PENDING:
+            candidate = _generate_item(manifest, run_id, item, config, language, stream)
+        if candidate is not None:
+            _judge_item(manifest, run_id, candidate, config, language, writer, bypass_judge_cache)
+
+def run_batch_benchmark(models: Optional[List[str]] = None, language: str = "en", stream: bool = False,
+                        schedule: str = "grouped", resume: Optional[str] = None, bypass_judge_cache: bool = False):
+    """
+    批次測試推薦模型。每個項目的進度記錄在資料庫中的 batch manifest，
+    中斷後可用 resume=<run_id> 只重跑未完成的項目。
+    """
+    print("🚀 批次基準測試開始\n")
+    config = load_benchmark_config()
+    manifest = BatchManifest(Path(__file__).parent / config['database']['path'])
+
+    if resume:
+        run = manifest.get_run(resume)
+        if not run:
+            print(f"❌ 找不到批次: {resume}")
+            return None
+        run_id, language, stream, schedule = resume, run['language'], run['stream'], run['schedule']
+        print(f"🔄 續跑批次 {run_id}: {manifest.progress(run_id)}")
+    else:
+        models = models or list(dict.fromkeys(RECOMMENDED_MODELS.values()))
+        categories = list(CATEGORIES.keys())
+        prompt_names = {}
+        for category in categories:
+            prompt_obj = prompt_loader.get_prompt(category, language)
+            if prompt_obj:
+                prompt_names[category] = prompt_obj.name
+        run_id = manifest.create_run(models, categories, language, schedule, stream, prompt_names)
+        print(f"🆔 批次編號: {run_id}")
+
+    writer = IncrementalResultWriter(f"./output/benchmark_report_{run_id}.partial.jsonl")
+    print(f"📝 增量結果: {writer.path}")
+
+    load_report = None
+    if schedule == "grouped":
+        keep_alive = config.get('benchmark', {}).get('keep_alive', DEFAULT_PIN_KEEP_ALIVE)
+        load_report = run_grouped_schedule(manifest, run_id, config, language, stream, keep_alive, writer, bypass_judge_cache)
+        print(f"\n🔁 模型載入: {load_report['model_loads']} 次 (交替排程約 {load_report['naive_model_loads']} 次)")
+        print(f"⏱️  載入時間: {load_report['load_time_ms']:.0f} ms，估計節省 {load_report['saved_ms']:.0f} ms")
+    else:
+        run_naive_schedule(manifest, run_id, config, language, stream, writer, bypass_judge_cache)
+
+    status = manifest.finish_run(run_id, load_report)
+    report = {
+        'run_id': run_id,
+        'schedule': schedule,
+        'language': language,
+        'status': status,
+        'progress': manifest.progress(run_id),
+        'results': manifest.results(run_id),
+        'load_report': load_report,
+    }
+
     # 生成比較報告
-    report_file = f"./output/benchmark_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    report_file = f"./output/benchmark_report_{run_id}.json"
     with open(report_file, 'w', encoding='utf-8') as f:
-        json.dump(all_results, f, ensure_ascii=False, indent=2)
-    
-    print(f"\n✅ 批次測試完成！報告: {report_file}")
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if status == RUN_COMPLETED:
+        print(f"\n✅ 批次測試完成！報告: {report_file}")
+    else:
+        print(f"\n⚠️  批次未完成 ({report['progress']})，報告: {report_file}")
+        print(f"   續跑: python benchmark_batch.py --resume {run_id}")
+    return report
 
 if __name__ == "__main__":
-    run_batch_benchmark()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="批次基準測試")
+    parser.add_argument("--models", nargs="+", default=None, help="受測模型 (預設為推薦模型)")
+    parser.add_argument("--language", default="en", help="提示語言 (en, zh_TW)")
+    parser.add_argument("--stream", action="store_true", help="以串流模式記錄首字延遲")
+    parser.add_argument("--schedule", choices=["grouped", "naive"], default="grouped",
+                        help="grouped: 依模型分組並集中評審；naive: 逐模型逐類別交替")
+    parser.add_argument("--resume", default=None, metavar="RUN_ID", help="續跑中斷的批次 (只執行未完成的項目)")
+    parser.add_argument("--fresh-judge", action="store_true", help="略過評審快取，重新評分")
+    args = parser.parse_args()
+    run_batch_benchmark(args.models, args.language, args.stream, args.schedule, args.resume, args.fresh_judge)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+資料集基準測試 (Dataset Benchmarking)
+以多題資料集評測模型，依分層抽樣控制題數，並回報每個類別的平均分數與信賴區間
+"""
+import json
+import math
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from benchmark import CATEGORIES, prompt_loader, load_benchmark_config, generate_candidate, judge_candidate
+from models import BenchmarkPrompt
+
+# 95% 常態近似信賴區間的 z 值
+Z_95 = 1.96
+
+def summarize_scores(results: List[dict]) -> Dict[str, dict]:
+    """計算每個類別的題數、平均、標準差與 95% 信賴區間 (略過失敗的題目)"""
+    by_category: Dict[str, List[float]] = {}
+    for result in results:
+        if result.get('score') is not None:
+            by_category.setdefault(result['category'], []).append(float(result['score']))
+
+    summary = {}
+    for category, scores in by_category.items():
+        mean = statistics.fmean(scores)
+        stdev = statistics.stdev(scores) if len(scores) > 1 else 0.0
+        half_width = Z_95 * stdev / math.sqrt(len(scores)) if len(scores) > 1 else None
+        summary[category] = {
+            'n': len(scores),
+            'mean': round(mean, 3),
+            'stdev': round(stdev, 3),
+            'ci95_low': round(mean - half_width, 3) if half_width is not None else None,
+            'ci95_high': round(mean + half_width, 3) if half_width is not None else None,
+        }
+    return summary
+
+def _evaluate_prompt(model_name: str, prompt: BenchmarkPrompt, config: dict, language: str, stream: bool) -> dict:
+    """生成並評分單一題目；失敗時回傳帶有 error 的結果，不中斷整個資料集"""
+    try:
+        candidate = generate_candidate(model_name, prompt.category, config, language, stream=stream, prompt_obj=prompt)
+        return judge_candidate(candidate, config, language)
+    except Exception as e:
+        print(f"❌ 題目失敗 {prompt.name}: {e}")
+        return {'model': model_name, 'category': prompt.category, 'prompt_name': prompt.name,
+                'score': None, 'error': str(e)}
+
+def run_dataset_benchmark(model_name: str, categories: Optional[List[str]] = None, language: str = "en",
+                          sample_per_stratum: Optional[int] = None, concurrency: Optional[int] = None,
+                          stratify_by: Optional[str] = None, seed: Optional[int] = None,
+                          stream: bool = False) -> dict:
+    """
+    以資料集評測模型。未指定的參數讀取 benchmark.dataset 設定；
+    sample_per_stratum 越小越快，但信賴區間越寬。
+    """
+    config = load_benchmark_config()
+    dataset_conf = config.get('benchmark', {}).get('dataset', {})
+    categories = categories or list(CATEGORIES.keys())
+    if sample_per_stratum is None:
+        sample_per_stratum = dataset_conf.get('sample_per_stratum')
+    if concurrency is None:
+        concurrency = dataset_conf.get('concurrency', 4)
+    if stratify_by is None:
+        stratify_by = dataset_conf.get('stratify_by')
+    if seed is None:
+        seed = dataset_conf.get('seed')
+
+    prompts = prompt_loader.sample_dataset(categories, language, sample_per_stratum, stratify_by, seed)
+    print(f"🚀 資料集測試: {model_name} | {len(prompts)} 題 | 並行數 {concurrency}")
+
+    # 有界並行：同時最多 concurrency 題在生成或評審中，結果依抽樣順序回傳
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="dataset") as pool:
+        results = list(pool.map(lambda prompt: _evaluate_prompt(model_name, prompt, config, language, stream), prompts))
+
+    summary = summarize_scores(results)
+    report = {
+        'model': model_name,
+        'language': language,
+        'sampling': {'sample_per_stratum': sample_per_stratum, 'stratify_by': stratify_by, 'seed': seed},
+        'summary': summary,
+        'failed': sum(1 for r in results if r.get('score') is None),
+        'results': results,
+    }
+
+    output_file = f"./output/dataset_benchmark_{model_name.replace(':', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for category, stats in summary.items():
+        ci = f" (95% CI {stats['ci95_low']:.2f}–{stats['ci95_high']:.2f})" if stats['ci95_low'] is not None else ""
+        print(f"📊 {category}: {stats['mean']:.2f}/5, n={stats['n']}{ci}")
+    print(f"✅ 測試完成！結果: {output_file}")
+    return report
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="資料集基準測試")
+    parser.add_argument("model", help="受測模型")
+    parser.add_argument("--language", default="en", help="提示語言 (en, zh_TW)")
+    parser.add_argument("--categories", nargs="+", default=None, help="測試類別 (預設全部)")
+    parser.add_argument("--sample", type=int, default=None, help="每個分層抽樣的題數 (預設讀取 benchmark.dataset)")
+    parser.add_argument("--concurrency", type=int, default=None, help="同時評測的題數")
+    parser.add_argument("--stratify-by", default=None, help="分層欄位，例如 difficulty")
+    parser.add_argument("--seed", type=int, default=None, help="抽樣亂數種子")
+    parser.add_argument("--stream", action="store_true", help="以串流模式記錄首字延遲")
+    args = parser.parse_args()
+    run_dataset_benchmark(args.model, args.categories, args.language, args.sample, args.concurrency,
+                          args.stratify_by, args.seed, args.stream)
@@ -0,0 +1,18 @@
+import hashlib
+from pathlib import Path
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """SHA-256 of a file, streamed through one reusable buffer so large images are never read whole."""
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb") as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
@@ -11,6 +11,9 @@ import yaml
 sys.path.append(str(Path(__file__).parent))
 
 from pipeline import ImagePipeline
+from ingest_queue import IngestQueue, DEFAULT_MAX_SIZE
+from file_debouncer import FileDebouncer, DEFAULT_MAX_EMPTY_CHECKS
+from dir_poller import DirectoryPoller
 
 # Setup Logging
 logging.basicConfig(
@@ -24,40 +27,107 @@ logging.basicConfig(
 logger = logging.getLogger("OllamaDaemon")
 
 class PipelineEventHandler(FileSystemEventHandler):
-    def __init__(self, pipeline: ImagePipeline):
+    def __init__(self, pipeline: ImagePipeline, debouncer: FileDebouncer):
         self.pipeline = pipeline
         self.config = pipeline.config
-        self.lock = threading.Lock() # To prevent multiple threads processing same file
+        self.debouncer = debouncer
+
+    def _is_supported(self, file_path: Path) -> bool:
+        allowed_exts = set(self.config['security']['allowed_extensions'])
+        return file_path.suffix.lower() in allowed_exts
 
     def on_created(self, event):
         if not event.is_directory:
             file_path = Path(event.src_path)
             # Check if file has a supported extension
-            allowed_exts = set(self.config['security']['allowed_extensions'])
-            if file_path.suffix.lower() in allowed_exts:
+            if self._is_supported(file_path):
                 logger.info(f"Detected new file: {file_path}")
-                # Use a lock to prevent race conditions if multiple files are created quickly
-                with self.lock:
-                    self.pipeline.process_image(file_path)
+                # Wait for the write to finish before handing off to the ingest workers
+                self.debouncer.touch(file_path)
             else:
                 logger.info(f"Ignored file (unsupported extension): {file_path}")
 
+    def on_modified(self, event):
+        if not event.is_directory and self._is_supported(Path(event.src_path)):
+            self.debouncer.touch(Path(event.src_path))
+
+    def on_moved(self, event):
+        if event.is_directory:
+            return
+        self.debouncer.discard(Path(event.src_path))
+        dest_path = Path(event.dest_path)
+        # Copy tools often write to a temporary name and rename when done
+        if dest_path.parent.resolve() == self.pipeline.input_dir.resolve() and self._is_supported(dest_path):
+            logger.info(f"Detected moved file: {dest_path}")
+            self.debouncer.touch(dest_path)
+
 class Daemon:
     def __init__(self, config_path: str = None):
         self.pipeline = ImagePipeline(config_path=config_path)
-        self.observer = Observer()
-        self.event_handler = PipelineEventHandler(self.pipeline)
+        proc_conf = self.pipeline.config.get('processing', {})
+        self.watch_interval = proc_conf.get('watch_interval_seconds', 5)
+        self.watch_mode = proc_conf.get('watch_mode', 'events')
+        self.queue = IngestQueue(
+            self.pipeline.process_image,
+            workers=proc_conf.get('max_concurrent_jobs', 1),
+            max_size=proc_conf.get('ingest_queue_size', DEFAULT_MAX_SIZE),
+        )
+        self.debouncer = FileDebouncer(self._enqueue, interval=self.watch_interval,
+                                       max_empty_checks=proc_conf.get('max_empty_checks', DEFAULT_MAX_EMPTY_CHECKS))
+        self.observer = None
+        self.poller = DirectoryPoller(
+            self.pipeline.input_dir,
+            self.pipeline.config['security']['allowed_extensions'],
+            self.debouncer.touch,
+            interval=self.watch_interval,
+        )
+        self.event_handler = PipelineEventHandler(self.pipeline, self.debouncer)
         self.watch_path = self.pipeline.input_dir
         self._running = False
+        self._stop_catch_up = threading.Event()
+        self._catch_up_thread = None
+        self.catch_up_found = 0
+        self.deferred = 0 # Settled files handed back because the ingest queue was full
+
+    def _enqueue(self, path: Path):
+        if self.queue.submit(path) or self.queue.contains(path):
+            return
+        # Rejected by a full queue. Watchdog reports a file only once, so hand it back to
+        # the debouncer, which offers it again after another interval
+        self.deferred += 1
+        self.debouncer.touch(path)
+
+    def _catch_up(self):
+        """Feeds files already in the input directory to the debouncer without overrunning the queue."""
+        images = self.pipeline.scan_input()
+        self.catch_up_found = len(images)
+        for image_path in images:
+            while (self.queue.metrics()["depth"] + self.debouncer.pending() >= self.queue.max_size
+                   and not self._stop_catch_up.is_set()):
+                self._stop_catch_up.wait(self.watch_interval)
+            if self._stop_catch_up.is_set():
+                return
+            self.debouncer.touch(image_path)
+        if images:
+            logger.info(f"Catch-up scan queued {len(images)} existing files")
 
     def start(self):
         if self._running:
             logger.info("Daemon is already running.")
             return
 
-        logger.info(f"Starting daemon, watching directory: {self.watch_path}")
-        self.observer.schedule(self.event_handler, self.watch_path, recursive=False)
-        self.observer.start()
+        logger.info(f"Starting daemon, watching directory: {self.watch_path} ({self.watch_mode} mode)")
+        self.queue.start()
+        self.debouncer.start()
+        if self.watch_mode == 'polling':
+            self.poller.start()
+        else:
+            self.observer = Observer()
+            self.observer.schedule(self.event_handler, self.watch_path, recursive=False)
+            self.observer.start()
+        self._stop_catch_up.clear()
+        self._catch_up_thread = threading.Thread(target=self._catch_up, name="daemon-catch-up", daemon=True)
+        self._catch_up_thread.start()
         self._running = True
         logger.info("Daemon started successfully.")
 
@@ -67,14 +137,35 @@ class Daemon:
             return
 
         logger.info("Stopping daemon...")
-        self.observer.stop()
-        self.observer.join()
+        self._stop_catch_up.set()
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+        self.poller.stop()
+        if self._catch_up_thread:
+            self._catch_up_thread.join(5)
+        self.debouncer.stop()
+        self.queue.stop()
+        self.pipeline.writes.flush()
+        if self.pipeline.thumbnails:
+            self.pipeline.thumbnails.shutdown()
         self._running = False
         logger.info("Daemon stopped.")
 
     def is_running(self) -> bool:
         return self._running
 
+    def queue_metrics(self) -> dict:
+        """Backpressure figures of the ingest queue (depth, oldest item age, counters)."""
+        metrics = self.queue.metrics()
+        metrics["settling"] = self.debouncer.pending()
+        metrics["dropped_empty"] = self.debouncer.dropped_empty
+        metrics["watch_mode"] = self.watch_mode
+        metrics["catch_up_found"] = self.catch_up_found
+        metrics["deferred"] = self.deferred
+        return metrics
+
 if __name__ == "__main__":
     # Example usage:
     # This will run as a standalone daemon in the background.
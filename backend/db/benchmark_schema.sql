@@ -8,9 +8,88 @@ CREATE TABLE IF NOT EXISTS benchmark_results (
     score REAL NOT NULL,
     breakdown_json TEXT, -- Store breakdown as JSON
     reasoning TEXT,
-    run_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    run_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Ollama timing fields (durations in nanoseconds)
+    eval_count INTEGER,
+    eval_duration INTEGER,
+    prompt_eval_count INTEGER,
+    prompt_eval_duration INTEGER,
+    load_duration INTEGER,
+    total_duration INTEGER
 );
 
 CREATE INDEX IF NOT EXISTS idx_benchmark_category ON benchmark_results(category);
 CREATE INDEX IF NOT EXISTS idx_benchmark_model ON benchmark_results(model);
-CREATE INDEX IF NOT EXISTS idx_benchmark_timestamp ON benchmark_results(run_timestamp);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_benchmark_timestamp ON benchmark_results(run_timestamp);
+-- History/export by category in time order without a sort pass
+CREATE INDEX IF NOT EXISTS idx_benchmark_category_timestamp ON benchmark_results(category, run_timestamp);
+
+-- Resumable batch benchmark runs (one row per batch, one item per model x category prompt)
+CREATE TABLE IF NOT EXISTS benchmark_batch_runs (
+    run_id TEXT PRIMARY KEY,
+    schedule TEXT NOT NULL,
+    language TEXT NOT NULL,
+    stream INTEGER NOT NULL DEFAULT 0,
+    models_json TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running', -- running, completed, incomplete
+    load_report_json TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS benchmark_batch_items (
+    run_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    category TEXT NOT NULL,
+    prompt_name TEXT,
+    status TEXT NOT NULL DEFAULT 'pending', -- pending, generated, judged
+    candidate_json TEXT,
+    result_json TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, model, category),
+    FOREIGN KEY (run_id) REFERENCES benchmark_batch_runs(run_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_batch_items_status ON benchmark_batch_items(run_id, status);
+
+
+-- Cached judge verdicts keyed on sha256(output, standard, judge backend, judge model, prompt template)
+CREATE TABLE IF NOT EXISTS judge_cache (
+    cache_key TEXT PRIMARY KEY,
+    standard_name TEXT,
+    judge_backend TEXT,
+    judge_model TEXT,
+    result_json TEXT NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL, -- Unix epoch seconds
+    last_accessed_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_judge_cache_accessed ON judge_cache(last_accessed_at);
+
+
+-- Individual trials of repeat-run benchmarks (one trial set per /benchmark/repeat call)
+CREATE TABLE IF NOT EXISTS benchmark_trials (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trial_set_id TEXT NOT NULL,
+    trial_index INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_name TEXT,
+    score REAL NOT NULL,
+    breakdown_json TEXT,
+    run_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Ollama timing fields (durations in nanoseconds)
+    eval_count INTEGER,
+    eval_duration INTEGER,
+    prompt_eval_count INTEGER,
+    prompt_eval_duration INTEGER,
+    load_duration INTEGER,
+    total_duration INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_trials_set ON benchmark_trials(trial_set_id);
+CREATE INDEX IF NOT EXISTS idx_trials_model_category ON benchmark_trials(model, category);
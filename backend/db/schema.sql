@@ -15,7 +15,18 @@ CREATE TABLE IF NOT EXISTS pipeline_items (
     description TEXT,
     metadata_json TEXT,
     detection_raw_json TEXT,
-    error_message TEXT
+    error_message TEXT,
+    model TEXT,
+    -- Ollama timing fields (durations in nanoseconds)
+    eval_count INTEGER,
+    eval_duration INTEGER,
+    prompt_eval_count INTEGER,
+    prompt_eval_duration INTEGER,
+    load_duration INTEGER,
+    total_duration INTEGER,
+    -- Deduplication: SHA-256 of the image bytes, and the item whose description was reused
+    content_hash TEXT,
+    duplicate_of TEXT
 );
 
 -- 審核歷史表 (Approval History)
@@ -46,17 +57,19 @@ CREATE TABLE IF NOT EXISTS config_snapshots (
 );
 
 -- 索引優化 (Indexes)
-CREATE INDEX IF NOT EXISTS idx_items_status ON pipeline_items(status);
-CREATE INDEX IF NOT EXISTS idx_items_created ON pipeline_items(created_at);
+-- 列表分頁 (Keyset pagination on (created_at, id), optionally filtered by status or source)
+DROP INDEX IF EXISTS idx_items_status;
+DROP INDEX IF EXISTS idx_items_created;
+CREATE INDEX IF NOT EXISTS idx_items_created_id ON pipeline_items(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_items_status_created ON pipeline_items(status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_items_source_created ON pipeline_items(source, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_items_content_hash ON pipeline_items(content_hash);
 CREATE INDEX IF NOT EXISTS idx_history_item ON approval_history(item_id);
 CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON system_logs(timestamp);
 
--- 觸發器：自動更新 updated_at (Trigger: Auto-update timestamp)
-CREATE TRIGGER IF NOT EXISTS update_timestamp 
-AFTER UPDATE ON pipeline_items
-BEGIN
-    UPDATE pipeline_items SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-END;
+-- updated_at 由 UPDATE 語句直接設定；移除舊版的自我更新觸發器
+-- (updated_at is set by each UPDATE statement; drop the old self-updating trigger, which cost a second write per update)
+DROP TRIGGER IF EXISTS update_timestamp;
 
 -- 告警表 (Alerts)
 CREATE TABLE IF NOT EXISTS alerts (
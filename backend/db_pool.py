@@ -0,0 +1,152 @@
+import time
+import sqlite3
+import logging
+import threading
+import weakref
+from pathlib import Path
+from typing import Dict
+
+logger = logging.getLogger("DbPool")
+
+# --- Connection Defaults (overridable via the `database` config section) ---
+DEFAULT_DB_SETTINGS = {
+    "journal_mode": "WAL",    # Readers no longer block the writer (and vice versa)
+    "synchronous": "NORMAL",  # With WAL, fsync at checkpoints instead of on every commit
+    "cache_size_kb": 16384,   # Page cache per connection
+    "mmap_size_mb": 256,      # Reads served from the OS page cache without copying
+    "busy_timeout_ms": 5000,  # Wait this long for a competing writer before raising "database is locked"
+}
+
+_lock = threading.Lock()
+_settings: Dict = dict(DEFAULT_DB_SETTINGS)
+_pools: Dict[str, "ConnectionPool"] = {}
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Long-lived connection owned by one thread. `close()` only rolls back an
+    unfinished transaction so existing `try/finally: conn.close()` call sites
+    keep working; the connection stays open for the thread's next acquire.
+    """
+
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+    def close_for_real(self):
+        super().close()
+
+
+class ConnectionPool:
+    """One PooledConnection per thread for a database file, with acquire-latency counters."""
+
+    def __init__(self, db_path: str, settings: Dict):
+        self.db_path = db_path
+        self.settings = dict(settings)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Weak, so the connection of a finished thread is closed when its thread-local storage goes away
+        self._connections = weakref.WeakSet()
+        self.acquires = 0
+        self.opened = 0
+        self.acquire_seconds_total = 0.0
+        self.acquire_seconds_max = 0.0
+
+    def _open(self) -> PooledConnection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.settings["busy_timeout_ms"] / 1000,
+            factory=PooledConnection,
+            check_same_thread=False, # Only close_all touches it from another thread
+        )
+        conn.execute(f"PRAGMA journal_mode={self.settings['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous={self.settings['synchronous']}")
+        conn.execute(f"PRAGMA cache_size={-int(self.settings['cache_size_kb'])}")
+        conn.execute(f"PRAGMA mmap_size={int(self.settings['mmap_size_mb']) * 1024 * 1024}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.settings['busy_timeout_ms'])}")
+        with self._lock:
+            self._connections.add(conn)
+            self.opened += 1
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        started = time.perf_counter()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.acquires += 1
+            self.acquire_seconds_total += elapsed
+            self.acquire_seconds_max = max(self.acquire_seconds_max, elapsed)
+        return conn
+
+    def close_all(self):
+        with self._lock:
+            connections = list(self._connections)
+            self._connections = weakref.WeakSet()
+        for conn in connections:
+            conn.close_for_real()
+        self._local = threading.local()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "connections": len(self._connections),
+                "opened": self.opened,
+                "acquires": self.acquires,
+                "acquire_avg_ms": round(self.acquire_seconds_total / self.acquires * 1000, 4) if self.acquires else None,
+                "acquire_max_ms": round(self.acquire_seconds_max * 1000, 4),
+                "journal_mode": self.settings["journal_mode"],
+            }
+
+
+def configure_db(**overrides):
+    """
+    Updates connection settings. Open connections are closed and reopened
+    lazily so the new pragmas apply everywhere.
+    """
+    new_settings = dict(_settings)
+    new_settings.update({k: v for k, v in overrides.items() if k in DEFAULT_DB_SETTINGS and v is not None})
+    with _lock:
+        if new_settings == _settings:
+            return
+        _settings.update(new_settings)
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+    logger.info(f"Database connection settings: {new_settings}")
+
+
+def configure_from_config(config: Dict):
+    """Applies the tuning keys of the `database` section of jade_config.yaml."""
+    db_conf = (config or {}).get("database", {}) or {}
+    configure_db(**{key: db_conf.get(key) for key in DEFAULT_DB_SETTINGS})
+
+
+def get_connection(db_path) -> PooledConnection:
+    """This thread's long-lived connection to `db_path`."""
+    key = str(Path(db_path).resolve())
+    with _lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(key, _settings)
+            _pools[key] = pool
+    return pool.acquire()
+
+
+def get_pool_stats() -> Dict[str, Dict]:
+    """Connection counts and acquire latency per database file."""
+    with _lock:
+        pools = dict(_pools)
+    return {path: pool.stats() for path, pool in pools.items()}
+
+
+def close_all():
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
@@ -22,6 +22,8 @@ def get_pipeline() -> ImagePipeline:
 
 def reload_pipeline():
     global _pipeline_instance
+    if _pipeline_instance is not None:
+        _pipeline_instance.close()
     _pipeline_instance = ImagePipeline()
     logger.info("ImagePipeline instance reloaded.")
 
@@ -31,5 +33,13 @@ def get_daemon() -> Daemon:
         _daemon_instance = Daemon()
     return _daemon_instance
 
+def shutdown():
+    """Stops the daemon and commits the queued writes of every pipeline that was created."""
+    if _daemon_instance is not None:
+        _daemon_instance.stop()
+        _daemon_instance.pipeline.close()
+    if _pipeline_instance is not None:
+        _pipeline_instance.close()
+
 def get_config_path() -> Path:
     return Path(__file__).parent / "config" / "jade_config.yaml"
@@ -0,0 +1,79 @@
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("DirectoryPoller")
+
+
+def snapshot_directory(directory: Path, allowed_exts: Iterable[str]) -> Dict[str, tuple]:
+    """Maps supported file names to (size, mtime_ns) with a single os.scandir pass."""
+    allowed_exts = {ext.lower() for ext in allowed_exts}
+    snapshot = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if os.path.splitext(entry.name)[1].lower() not in allowed_exts:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue # Removed between listing and stat
+            snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+class DirectoryPoller:
+    """
+    Watches a directory without filesystem notifications by diffing
+    successive scandir snapshots, for mounts where inotify never fires.
+    New or changed files are passed to `on_change`.
+    """
+
+    def __init__(self, directory: Path, allowed_exts: Iterable[str], on_change: Callable[[Path], object],
+                 interval: float = 5.0):
+        self.directory = Path(directory)
+        self.allowed_exts = list(allowed_exts)
+        self.on_change = on_change
+        self.interval = interval
+        self._previous: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def poll_once(self) -> List[Path]:
+        current = snapshot_directory(self.directory, self.allowed_exts)
+        with self._lock:
+            changed = [name for name, stat in current.items() if self._previous.get(name) != stat]
+            self._previous = current
+        return [self.directory / name for name in changed]
+
+    def forget(self, path: Path):
+        """Makes `path` count as new on the next poll (used when it could not be queued)."""
+        with self._lock:
+            self._previous.pop(Path(path).name, None)
+
+    def start(self):
+        if self._thread:
+            return
+        self._stop.clear()
+        self.poll_once() # Baseline; files already present are handled by the catch-up scan
+        self._thread = threading.Thread(target=self._run, name="dir-poller", daemon=True)
+        self._thread.start()
+        logger.info(f"Polling {self.directory} every {self.interval}s")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                for path in self.poll_once():
+                    self.on_change(path)
+            except OSError as e:
+                logger.error(f"Polling {self.directory} failed: {e}")
@@ -0,0 +1,173 @@
+import json
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from http_pool import get_session
+from embedding_cache import get_embedding_cache
+
+logger = logging.getLogger("EmbeddingBenchmark")
+
+TASKS_DIR = Path(__file__).parent / "benchmark" / "embedding"
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_TOP_K = 5
+
+
+# --- Ollama embeddings ---
+
+def embed_batch(model: str, texts: Sequence[str], config: dict) -> np.ndarray:
+    """Embeds a batch of texts with a single `/api/embed` call."""
+    url = config['ollama']['url']
+    response = get_session(url).post(
+        f"{url}/api/embed",
+        json={"model": model, "input": list(texts)},
+        timeout=config['ollama']['timeout_seconds']
+    )
+    response.raise_for_status()
+    embeddings = response.json().get("embeddings") or []
+    if len(embeddings) != len(texts):
+        raise RuntimeError(f"Ollama returned {len(embeddings)} embeddings for {len(texts)} inputs")
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def embed_texts(model: str, texts: Sequence[str], config: dict, batch_size: int) -> tuple:
+    """
+    Embeds `texts` through the shared embedding cache when it is enabled, so
+    only texts unseen by this model digest reach Ollama.
+    """
+    if not texts:
+        # Nothing to concatenate; the dimension is unknown without asking the model
+        return np.empty((0, 0), dtype=np.float32), {"cache_hits": 0, "embedded": 0, "embed_seconds": 0.0,
+                                                    "embeddings_per_sec": None}
+
+    cache = get_embedding_cache(config)
+    embed_fn = lambda batch: embed_batch(model, batch, config)
+    if cache is not None:
+        return cache.embed(model, texts, embed_fn, batch_size)
+
+    started = time.perf_counter()
+    vectors = np.concatenate([embed_fn(texts[start:start + batch_size]) for start in range(0, len(texts), batch_size)])
+    elapsed = time.perf_counter() - started
+    return vectors, {
+        "cache_hits": 0,
+        "embedded": len(texts),
+        "embed_seconds": round(elapsed, 4),
+        "embeddings_per_sec": round(len(texts) / elapsed, 2) if elapsed > 0 else None,
+    }
+
+
+# --- Vectorized scoring ---
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def recall_at_k(similarities: np.ndarray, relevant: List[List[int]], k: int) -> float:
+    """Mean fraction of each query's relevant documents found in its top-k."""
+    k = min(k, similarities.shape[1])
+    top_k = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    hits = np.zeros(similarities.shape, dtype=bool)
+    np.put_along_axis(hits, top_k, True, axis=1)
+    relevant_mask = np.zeros(similarities.shape, dtype=bool)
+    for row, docs in enumerate(relevant):
+        relevant_mask[row, docs] = True
+    return float(((hits & relevant_mask).sum(axis=1) / relevant_mask.sum(axis=1)).mean())
+
+
+def mean_reciprocal_rank(similarities: np.ndarray, relevant: List[List[int]]) -> float:
+    order = np.argsort(-similarities, axis=1)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(similarities.shape[1])[None, :].repeat(len(order), axis=0), axis=1)
+    best = np.array([ranks[row, docs].min() for row, docs in enumerate(relevant)])
+    return float((1.0 / (best + 1)).mean())
+
+
+def spearman(x: np.ndarray, y: np.ndarray) -> float:
+    """Spearman rank correlation (ties broken by order, which is sufficient for graded pairs)."""
+    rank_x = np.argsort(np.argsort(x)).astype(float)
+    rank_y = np.argsort(np.argsort(y)).astype(float)
+    if rank_x.std() == 0 or rank_y.std() == 0:
+        return 0.0
+    return float(np.corrcoef(rank_x, rank_y)[0, 1])
+
+
+def neighbour_purity(vectors: np.ndarray, labels: List[str]) -> float:
+    """Share of documents whose nearest other document has the same topic."""
+    similarities = vectors @ vectors.T
+    np.fill_diagonal(similarities, -np.inf)
+    nearest = similarities.argmax(axis=1)
+    labels = np.asarray(labels)
+    return float((labels[nearest] == labels).mean())
+
+
+def _to_stars(value: float) -> float:
+    """Maps a [0, 1] quality value onto the judge's 1-5 scale."""
+    return round(1 + 4 * min(max(value, 0.0), 1.0), 2)
+
+
+# --- Task runner ---
+
+def load_task(language: str = "en") -> Dict:
+    for lang in dict.fromkeys([language, language.split('_')[0], "en"]):
+        path = TASKS_DIR / f"retrieval_{lang}.json"
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+    raise FileNotFoundError(f"No embedding task found in {TASKS_DIR}")
+
+
+def evaluate_embeddings(model: str, config: dict, language: str = "en", task: Optional[Dict] = None) -> Dict:
+    """
+    Runs the retrieval, similarity and clustering checks of an embedding task.
+    All texts are embedded once (or read back from the embedding cache) and
+    every metric is computed on the resulting matrices.
+    """
+    emb_conf = config.get('benchmark', {}).get('embedding', {})
+    batch_size = emb_conf.get('batch_size', DEFAULT_BATCH_SIZE)
+    top_k = emb_conf.get('top_k', DEFAULT_TOP_K)
+    task = task or load_task(language)
+
+    corpus = task['corpus']
+    queries = task['queries']
+    pairs = task.get('pairs', [])
+    texts = [d['text'] for d in corpus] + [q['text'] for q in queries] + [p['a'] for p in pairs] + [p['b'] for p in pairs]
+
+    vectors, embed_stats = embed_texts(model, texts, config, batch_size)
+    vectors = normalize_rows(np.asarray(vectors))
+
+    n_docs, n_queries, n_pairs = len(corpus), len(queries), len(pairs)
+    doc_vectors = vectors[:n_docs]
+    query_vectors = vectors[n_docs:n_docs + n_queries]
+    pair_a = vectors[n_docs + n_queries:n_docs + n_queries + n_pairs]
+    pair_b = vectors[n_docs + n_queries + n_pairs:]
+
+    doc_index = {d['id']: i for i, d in enumerate(corpus)}
+    relevant = [[doc_index[doc_id] for doc_id in q['relevant']] for q in queries]
+    similarities = query_vectors @ doc_vectors.T
+
+    recall = recall_at_k(similarities, relevant, top_k)
+    metrics = {
+        "recall_at_1": recall_at_k(similarities, relevant, 1),
+        f"recall_at_{top_k}": recall,
+        "mrr": mean_reciprocal_rank(similarities, relevant),
+        "spearman": spearman((pair_a * pair_b).sum(axis=1), np.array([p['score'] for p in pairs])) if n_pairs > 1 else None,
+        "neighbour_purity": neighbour_purity(doc_vectors, [d.get('topic', '') for d in corpus]),
+        "dimensions": int(vectors.shape[1]),
+        "texts": len(texts),
+        "cache_hits": embed_stats['cache_hits'],
+        "embeddings_per_sec": embed_stats['embeddings_per_sec'],
+    }
+
+    breakdown = {
+        "semantic_similarity": _to_stars(metrics['spearman'] or 0.0),
+        "clustering": _to_stars(metrics['neighbour_purity']),
+        "retrieval_effectiveness": _to_stars(recall),
+    }
+    score = round(sum(breakdown.values()) / len(breakdown), 2)
+    logger.info(f"Embedding benchmark {model}: score {score}, recall@{top_k} {recall:.2f}, "
+                f"{metrics['embeddings_per_sec']} embeddings/sec")
+    return {"task": task['name'], "score": score, "breakdown": breakdown, "metrics": metrics}
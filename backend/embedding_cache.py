@@ -0,0 +1,375 @@
+import os
+import json
+import atexit
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from model_digests import ModelDigestResolver
+
+logger = logging.getLogger("EmbeddingCache")
+
+DEFAULT_MAX_ENTRIES = 100_000 # Per model digest
+DEFAULT_COMPACT_RATIO = 0.3 # Rewrite the vector file once this share of its rows is dead
+DEFAULT_BATCH_SIZE = 32
+
+_caches: Dict[str, "EmbeddingCache"] = {}
+_caches_lock = threading.Lock()
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _safe_name(model: str) -> str:
+    return model.replace("/", "_").replace(":", "_")
+
+
+class _VectorFile:
+    """
+    Vectors of one model digest: an append-only float32 file read through
+    np.memmap, an `index.json` snapshot mapping text keys to (row, last used)
+    and an append-only `index.log` of the changes made since the snapshot.
+    An append writes one log line, so filling the cache costs O(n) rather
+    than rewriting the whole index every time. The snapshot is rewritten on
+    compaction, on close and once the log outgrows it. A crash mid-append
+    leaves at most a torn last log line and unrecorded vector bytes, and both
+    are dropped on load.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = directory / "index.json"
+        self.log_path = directory / "index.log"
+        self.dim: Optional[int] = None
+        self.rows = 0
+        self.generation = 0
+        self.index: Dict[str, int] = {}
+        self.last_used: Dict[str, float] = {}
+        self._touched: Dict[str, float] = {} # Recency not yet written to the log
+        self._snapshot_bytes = 0
+        self._log_bytes = 0
+        self._mmap: Optional[np.memmap] = None
+        self._load()
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.directory / f"vectors.{self.generation}.f32"
+
+    def _load(self):
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.dim, self.rows, self.generation = meta["dim"], meta["rows"], meta["generation"]
+            self.index = {key: row for key, (row, _) in meta["entries"].items()}
+            self.last_used = {key: used for key, (_, used) in meta["entries"].items()}
+            self._snapshot_bytes = self.index_path.stat().st_size
+        self._replay_log()
+        # Drop a partially appended batch that the index never recorded
+        expected = self.rows * (self.dim or 0) * 4
+        if self.vectors_path.exists() and self.vectors_path.stat().st_size > expected:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(expected)
+
+    def _replay_log(self):
+        if not self.log_path.exists():
+            return
+        valid_bytes = 0
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break # Torn write at the end of the log
+                valid_bytes += len(line)
+                if record.get("gen") != self.generation:
+                    continue # Written before the snapshot of a compaction that replaced it
+                used = record["t"]
+                if "add" in record:
+                    self.dim = record["dim"]
+                    self.rows = record["rows"]
+                    for key, row in record["add"]:
+                        self.index[key] = row
+                        self.last_used[key] = used
+                for key in record.get("used", ()):
+                    if key in self.index:
+                        self.last_used[key] = used
+                for key in record.get("evict", ()):
+                    self.index.pop(key, None)
+                    self.last_used.pop(key, None)
+        if valid_bytes < self.log_path.stat().st_size:
+            with open(self.log_path, "r+b") as f:
+                f.truncate(valid_bytes)
+        self._log_bytes = valid_bytes
+
+    def _log(self, record: Dict):
+        record = {"gen": self.generation, "t": time.time(), **record}
+        if self._touched:
+            record["used"] = list(self._touched)
+            self._touched.clear()
+        line = (json.dumps(record) + "\n").encode("utf-8")
+        with open(self.log_path, "ab") as f:
+            f.write(line)
+        self._log_bytes += len(line)
+
+    def save(self):
+        """Writes a full snapshot and starts a new, empty log."""
+        meta = {
+            "dim": self.dim,
+            "rows": self.rows,
+            "generation": self.generation,
+            "entries": {key: [row, self.last_used.get(key, 0.0)] for key, row in self.index.items()},
+        }
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.index_path)
+        self.log_path.unlink(missing_ok=True)
+        self._snapshot_bytes = self.index_path.stat().st_size
+        self._log_bytes = 0
+        self._touched.clear()
+
+    def flush(self):
+        """Persists recency gathered by lookups since the last write."""
+        if self._touched and self.dim is not None:
+            self._log({})
+
+    def _maybe_checkpoint(self):
+        # Snapshot once replaying the log would cost more than reading a snapshot
+        if self._log_bytes > max(self._snapshot_bytes, 1 << 20):
+            self.save()
+
+    def _vectors(self) -> np.memmap:
+        if self._mmap is None or self._mmap.shape[0] != self.rows:
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self.rows, self.dim))
+        return self._mmap
+
+    def lookup(self, keys: Sequence[str]) -> np.ndarray:
+        """Row of every key, -1 for misses."""
+        now = time.time()
+        rows = np.fromiter((self.index.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+        for key, row in zip(keys, rows):
+            if row >= 0:
+                self.last_used[key] = now
+                self._touched[key] = now
+        return rows
+
+    def read(self, rows: np.ndarray) -> np.ndarray:
+        return np.asarray(self._vectors()[rows])
+
+    def append(self, keys: Sequence[str], vectors: np.ndarray):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension changed from {self.dim} to {vectors.shape[1]}")
+        with open(self.vectors_path, "ab") as f:
+            f.write(vectors.tobytes())
+        now = time.time()
+        added = []
+        for offset, key in enumerate(keys):
+            self.index[key] = self.rows + offset
+            self.last_used[key] = now
+            added.append([key, self.rows + offset])
+        self.rows += len(keys)
+        self._log({"add": added, "rows": self.rows, "dim": self.dim})
+        self._maybe_checkpoint()
+
+    def evict_lru(self, max_entries: int) -> int:
+        overflow = len(self.index) - max_entries
+        if overflow <= 0:
+            return 0
+        evicted = sorted(self.index, key=lambda k: self.last_used.get(k, 0.0))[:overflow]
+        for key in evicted:
+            del self.index[key]
+            self.last_used.pop(key, None)
+            self._touched.pop(key, None)
+        self._log({"evict": evicted})
+        return overflow
+
+    def dead_ratio(self) -> float:
+        return 1 - len(self.index) / self.rows if self.rows else 0.0
+
+    def compact(self):
+        """Copies live rows into a new generation file and drops the old one."""
+        old_path = self.vectors_path
+        keys = sorted(self.index, key=self.index.get)
+        live_rows = np.fromiter((self.index[key] for key in keys), dtype=np.int64, count=len(keys))
+        source = self._vectors()
+        self.generation += 1
+        with open(self.vectors_path, "wb") as f:
+            for start in range(0, len(live_rows), 4096):
+                f.write(np.ascontiguousarray(source[live_rows[start:start + 4096]]).tobytes())
+        self.index = {key: row for row, key in enumerate(keys)}
+        self.rows = len(keys)
+        self._mmap = None
+        self.save()
+        old_path.unlink(missing_ok=True)
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding store keyed by (model digest, text hash).
+    Thousands of texts are resolved with one `lookup` call; misses can be
+    filled through `embed`, which batches the calls to the embedding model.
+    """
+
+    def __init__(self, root, ollama_url: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 compact_ratio: float = DEFAULT_COMPACT_RATIO, timeout: int = 5):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.compact_ratio = compact_ratio
+        self.digests = ModelDigestResolver(ollama_url, timeout)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compactions = 0
+        self._lock = threading.Lock()
+        self._files: Dict[Tuple[str, str], _VectorFile] = {}
+
+    def _file(self, model: str, digest: str) -> _VectorFile:
+        vector_file = self._files.get((model, digest))
+        if vector_file is None:
+            model_dir = self.root / _safe_name(model)
+            # Vectors from older weights can never be hit again
+            if model_dir.exists():
+                for digest_dir in model_dir.iterdir():
+                    if digest_dir.is_dir() and digest_dir.name != digest:
+                        shutil.rmtree(digest_dir, ignore_errors=True)
+            vector_file = _VectorFile(model_dir / digest)
+            self._files[(model, digest)] = vector_file
+        return vector_file
+
+    def lookup(self, model: str, texts: Sequence[str]) -> Tuple[Optional[np.ndarray], List[int]]:
+        """
+        Returns (vectors, missing): a (len(texts), dim) matrix with the cached
+        rows filled in, and the indices of texts that still need embedding.
+        """
+        digest = self.digests.get(model)
+        if not digest:
+            return None, list(range(len(texts)))
+        with self._lock:
+            vector_file = self._file(model, digest)
+            if vector_file.dim is None:
+                self.misses += len(texts)
+                return None, list(range(len(texts)))
+            rows = vector_file.lookup([text_key(text) for text in texts])
+            vector_file.flush() # One log line per lookup keeps LRU order across restarts
+            hit_mask = rows >= 0
+            vectors = np.zeros((len(texts), vector_file.dim), dtype=np.float32)
+            if hit_mask.any():
+                vectors[hit_mask] = vector_file.read(rows[hit_mask])
+            hits = int(hit_mask.sum())
+            self.hits += hits
+            self.misses += len(texts) - hits
+        return vectors, np.flatnonzero(~hit_mask).tolist()
+
+    def put(self, model: str, texts: Sequence[str], vectors: np.ndarray):
+        digest = self.digests.get(model)
+        if not digest:
+            return
+        with self._lock:
+            vector_file = self._file(model, digest)
+            keys, new_rows = [], []
+            for i, key in enumerate(text_key(text) for text in texts):
+                if key not in vector_file.index and key not in keys:
+                    keys.append(key)
+                    new_rows.append(i)
+            if not keys:
+                return
+            vector_file.append(keys, np.asarray(vectors)[new_rows])
+            evicted = vector_file.evict_lru(self.max_entries)
+            if evicted:
+                self.evictions += evicted
+                if vector_file.dead_ratio() >= self.compact_ratio:
+                    vector_file.compact()
+                    self.compactions += 1
+                    logger.info(f"Compacted embedding cache for {model} to {vector_file.rows} rows")
+
+    def embed(self, model: str, texts: Sequence[str], embed_fn: Callable[[List[str]], np.ndarray],
+              batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[np.ndarray, Dict]:
+        """
+        Returns vectors for all `texts`, calling `embed_fn` in batches only for
+        the cache misses. The second value reports hits and miss throughput.
+        """
+        vectors, missing = self.lookup(model, texts)
+        # Embed each distinct missing text once
+        unique_missing = list(dict.fromkeys(texts[i] for i in missing))
+        embedded: Dict[str, np.ndarray] = {}
+        started = time.perf_counter()
+        for start in range(0, len(unique_missing), batch_size):
+            batch = unique_missing[start:start + batch_size]
+            batch_vectors = np.asarray(embed_fn(batch), dtype=np.float32)
+            self.put(model, batch, batch_vectors)
+            embedded.update(zip(batch, batch_vectors))
+        elapsed = time.perf_counter() - started
+
+        if missing:
+            if vectors is None:
+                vectors = np.zeros((len(texts), len(next(iter(embedded.values())))), dtype=np.float32)
+            for i in missing:
+                vectors[i] = embedded[texts[i]]
+        return vectors, {
+            "cache_hits": len(texts) - len(missing),
+            "embedded": len(unique_missing),
+            "embed_seconds": round(elapsed, 4),
+            "embeddings_per_sec": round(len(unique_missing) / elapsed, 2) if unique_missing and elapsed > 0 else None,
+        }
+
+    def close(self):
+        """Writes pending recency and a fresh snapshot for every open vector file."""
+        with self._lock:
+            for vector_file in self._files.values():
+                if vector_file.dim is not None:
+                    vector_file.save()
+
+    def invalidate_model(self, model: str):
+        self.digests.invalidate(model)
+        with self._lock:
+            for key in [k for k in self._files if k[0] == model]:
+                del self._files[key]
+        shutil.rmtree(self.root / _safe_name(model), ignore_errors=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = sum(len(f.index) for f in self._files.values())
+            size_bytes = sum(f.rows * (f.dim or 0) * 4 for f in self._files.values())
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "size_bytes": size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "compactions": self.compactions,
+        }
+
+
+def get_embedding_cache(config: dict) -> Optional[EmbeddingCache]:
+    """Returns the shared cache when `embedding_cache` is enabled, otherwise None."""
+    cache_conf = config.get('embedding_cache', {})
+    if not cache_conf.get('enabled', False):
+        return None
+    root = str(Path(__file__).parent / cache_conf.get('path', './cache/embeddings'))
+    with _caches_lock:
+        cache = _caches.get(root)
+        if cache is None:
+            cache = EmbeddingCache(
+                root,
+                config['ollama']['url'],
+                max_entries=cache_conf.get('max_entries_per_model', DEFAULT_MAX_ENTRIES),
+                compact_ratio=cache_conf.get('compact_ratio', DEFAULT_COMPACT_RATIO),
+            )
+            _caches[root] = cache
+            atexit.register(cache.close)
+            logger.info(f"Embedding cache enabled at {root}")
+        return cache
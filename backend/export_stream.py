@@ -0,0 +1,65 @@
+import io
+import csv
+import json
+import sqlite3
+import logging
+from typing import Iterator, List, Sequence
+
+logger = logging.getLogger("ExportStream")
+
+EXPORT_CHUNK_ROWS = 500
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def iter_row_chunks(db_path, sql: str, params: Sequence = (), chunk_size: int = EXPORT_CHUNK_ROWS) -> Iterator[List[tuple]]:
+    """
+    Runs `sql` on a connection of its own and yields the result `chunk_size`
+    rows at a time. The pooled connections are per thread, while a streaming
+    response resumes this generator on whichever worker thread is free, so
+    the export cannot borrow one of them.
+    """
+    conn = sqlite3.connect(str(db_path), check_same_thread=False)
+    try:
+        cursor = conn.execute(sql, tuple(params))
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        conn.close()
+
+
+def _ndjson_chunks(columns: List[str], chunks: Iterator[List[tuple]]) -> Iterator[bytes]:
+    for rows in chunks:
+        yield "".join(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+def _csv_chunks(columns: List[str], chunks: Iterator[List[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8") # Header of an empty export
+
+
+def stream_export(db_path, sql: str, params: Sequence, columns: List[str], fmt: str,
+                  chunk_size: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """Encodes the rows of `sql` as NDJSON or CSV, one chunk of rows per yielded block."""
+    chunks = iter_row_chunks(db_path, sql, params, chunk_size)
+    encoded = _csv_chunks(columns, chunks) if fmt == "csv" else _ndjson_chunks(columns, chunks)
+    exported = 0
+    try:
+        for block in encoded:
+            exported += 1
+            yield block
+    except Exception as e:
+        # Headers are already sent; all that is left is to end the body early
+        logger.error(f"Export aborted after {exported} chunks: {e}")
+    finally:
+        chunks.close()
@@ -4,13 +4,13 @@
 Phase 3: 錯誤處理與重試
 """
 import time
-import requests
+from http_pool import get_session
 
 def call_ollama_with_retry(url, model, prompt, max_retries=3, timeout=30):
     """帶重試的 Ollama 呼叫"""
     for attempt in range(max_retries):
         try:
-            response = requests.post(
+            response = get_session(url).post(
                 f"{url}/api/generate",
                 json={"model": model, "prompt": prompt, "stream": False},
                 timeout=timeout
@@ -0,0 +1,127 @@
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger("FileDebouncer")
+
+DEFAULT_MAX_EMPTY_CHECKS = 12 # One minute at the default 5 s watch interval
+
+
+class FileDebouncer:
+    """
+    Holds back watched files until they stop changing. Every event for a
+    path is coalesced into one pending entry; the entry is released to
+    `on_ready` once its size and mtime are unchanged across a full
+    `interval` and the file can be opened for reading. A file still empty
+    after `max_empty_checks` intervals is dropped; the write that finally
+    fills it raises a new event.
+    """
+
+    def __init__(self, on_ready: Callable[[Path], object], interval: float = 5.0,
+                 max_empty_checks: int = DEFAULT_MAX_EMPTY_CHECKS):
+        self.on_ready = on_ready
+        self.interval = interval
+        self.max_empty_checks = max(1, max_empty_checks)
+        self._pending: Dict[str, tuple] = {} # key -> (path, (size, mtime), due_at, empty_checks)
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.coalesced = 0
+        self.released = 0
+        self.dropped_empty = 0
+
+    @staticmethod
+    def _snapshot(path: Path) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def start(self):
+        with self._cond:
+            if self._thread:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="file-debouncer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            thread, self._thread = self._thread, None
+            self._pending.clear()
+            self._cond.notify_all()
+        if thread:
+            thread.join(5)
+
+    def touch(self, path: Path):
+        """Registers a created/modified event; repeated events for a pending path are coalesced."""
+        path = Path(path)
+        key = str(path.resolve())
+        with self._cond:
+            if key in self._pending:
+                self.coalesced += 1
+                return
+            self._pending[key] = (path, self._snapshot(path), time.monotonic() + self.interval, 0)
+            self._cond.notify()
+
+    def discard(self, path: Path):
+        """Forgets a pending path (e.g. the temporary name of a file that was renamed)."""
+        with self._cond:
+            self._pending.pop(str(Path(path).resolve()), None)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            ready = []
+            with self._cond:
+                if self._stopping:
+                    return
+                now = time.monotonic()
+                due = [key for key, (_, _, due_at, _) in self._pending.items() if due_at <= now]
+                for key in due:
+                    path, previous, _, empty_checks = self._pending[key]
+                    current = self._snapshot(path)
+                    if current is None:
+                        del self._pending[key] # Deleted or moved away before it settled
+                    elif current[0] == 0:
+                        empty_checks += 1
+                        if empty_checks >= self.max_empty_checks:
+                            # Would otherwise count as settling forever and stall the catch-up throttle
+                            del self._pending[key]
+                            self.dropped_empty += 1
+                            logger.warning(f"Still empty after {empty_checks} checks, ignoring until it changes: {path.name}")
+                        else:
+                            self._pending[key] = (path, current, now + self.interval, empty_checks)
+                    elif current == previous and self._readable(path):
+                        del self._pending[key]
+                        ready.append(path)
+                    else:
+                        self._pending[key] = (path, current, now + self.interval, 0)
+                if not ready:
+                    next_due = min((due_at for _, _, due_at, _ in self._pending.values()), default=None)
+                    self._cond.wait(None if next_due is None else max(next_due - now, 0.01))
+                    continue
+            for path in ready:
+                self.released += 1
+                logger.info(f"File settled, queueing: {path.name}")
+                try:
+                    self.on_ready(path)
+                except Exception as e:
+                    logger.error(f"Failed to hand off settled file {path.name}: {e}")
+
+    @staticmethod
+    def _readable(path: Path) -> bool:
+        # Some platforms keep files locked while a copy is still in progress
+        try:
+            with open(path, "rb"):
+                return True
+        except OSError:
+            return False
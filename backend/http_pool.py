@@ -0,0 +1,189 @@
+import threading
+import logging
+import asyncio
+from typing import Dict, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("HttpPool")
+
+# --- Pool Defaults (overridable via the `ollama.http_pool` config section) ---
+DEFAULT_POOL_SETTINGS = {
+    "pool_connections": 4,  # Number of distinct hosts kept in the urllib3 PoolManager
+    "pool_maxsize": 8,      # Max keep-alive connections per host
+    "pool_block": False,    # Block instead of opening overflow connections when a host is saturated
+}
+
+_lock = threading.Lock()
+_settings: Dict = dict(DEFAULT_POOL_SETTINGS)
+_sessions: Dict[str, requests.Session] = {}
+_session_hits: Dict[str, int] = {}
+_session_misses: Dict[str, int] = {}
+# Async clients are bound to the event loop they were created on
+_async_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+_async_hits: Dict[str, int] = {}
+_async_misses: Dict[str, int] = {}
+
+
+def _normalize_base_url(base_url: str) -> str:
+    return base_url.rstrip("/")
+
+
+def configure_pool(pool_connections: Optional[int] = None, pool_maxsize: Optional[int] = None,
+                   pool_block: Optional[bool] = None):
+    """
+    Updates pool settings. Sessions created before the change are closed and
+    rebuilt lazily so the new limits apply to every host.
+    """
+    new_settings = dict(_settings)
+    if pool_connections is not None:
+        new_settings["pool_connections"] = int(pool_connections)
+    if pool_maxsize is not None:
+        new_settings["pool_maxsize"] = int(pool_maxsize)
+    if pool_block is not None:
+        new_settings["pool_block"] = bool(pool_block)
+
+    with _lock:
+        if new_settings == _settings:
+            return
+        _settings.update(new_settings)
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        # Async clients cannot be closed from here (their loop may not be running);
+        # dropping them makes the next lookup build a client with the new limits.
+        _async_clients.clear()
+    logger.info(f"HTTP pool reconfigured: {new_settings}")
+
+
+def configure_from_config(config: Dict):
+    """Applies the `ollama.http_pool` section of jade_config.yaml."""
+    pool_conf = (config or {}).get("ollama", {}).get("http_pool", {}) or {}
+    configure_pool(
+        pool_connections=pool_conf.get("pool_connections"),
+        pool_maxsize=pool_conf.get("pool_maxsize"),
+        pool_block=pool_conf.get("pool_block"),
+    )
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=_settings["pool_connections"],
+        pool_maxsize=_settings["pool_maxsize"],
+        pool_block=_settings["pool_block"],
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_session(base_url: str) -> requests.Session:
+    """Returns the shared keep-alive session for `base_url`, creating it on first use."""
+    key = _normalize_base_url(base_url)
+    with _lock:
+        session = _sessions.get(key)
+        if session is not None:
+            _session_hits[key] = _session_hits.get(key, 0) + 1
+            return session
+        _session_misses[key] = _session_misses.get(key, 0) + 1
+        session = _build_session()
+        _sessions[key] = session
+        return session
+
+
+def get_async_client(base_url: str) -> httpx.AsyncClient:
+    """
+    Returns the shared httpx.AsyncClient for `base_url` on the running event loop.
+    Must be called from within a coroutine.
+    """
+    key = _normalize_base_url(base_url)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        entry = _async_clients.get(key)
+        if entry is not None and entry[0] is loop and not entry[1].is_closed:
+            _async_hits[key] = _async_hits.get(key, 0) + 1
+            return entry[1]
+        _async_misses[key] = _async_misses.get(key, 0) + 1
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=_settings["pool_maxsize"],
+                max_keepalive_connections=_settings["pool_maxsize"],
+            ),
+            headers={"Connection": "keep-alive"},
+        )
+        _async_clients[key] = (loop, client)
+        return client
+
+
+async def aclose_async_clients():
+    """Closes the async clients owned by the running event loop (FastAPI shutdown)."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        owned = [(key, client) for key, (client_loop, client) in _async_clients.items() if client_loop is loop]
+        for key, _ in owned:
+            del _async_clients[key]
+    for _, client in owned:
+        await client.aclose()
+
+
+def _connection_stats(session: requests.Session) -> Dict[str, int]:
+    """Sums urllib3 connection counters across every host pool of a session."""
+    opened = 0
+    requests_sent = 0
+    for adapter in set(session.adapters.values()):
+        poolmanager = getattr(adapter, "poolmanager", None)
+        if poolmanager is None:
+            continue
+        for pool_key in list(poolmanager.pools.keys()):
+            pool = poolmanager.pools.get(pool_key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            requests_sent += pool.num_requests
+    return {
+        "connections_opened": opened,
+        "requests_sent": requests_sent,
+        "connections_reused": max(requests_sent - opened, 0),
+    }
+
+
+def get_pool_stats() -> Dict:
+    """
+    Returns per-base-URL counters. `session_hits`/`session_misses` count lookups
+    of the shared session; `connections_reused` counts requests served over an
+    already-open keep-alive connection.
+    """
+    with _lock:
+        hosts = {}
+        for key in set(_session_hits) | set(_session_misses) | set(_async_hits) | set(_async_misses):
+            stats = {
+                "session_hits": _session_hits.get(key, 0),
+                "session_misses": _session_misses.get(key, 0),
+                "async_client_hits": _async_hits.get(key, 0),
+                "async_client_misses": _async_misses.get(key, 0),
+                "connections_opened": 0,
+                "requests_sent": 0,
+                "connections_reused": 0,
+            }
+            session = _sessions.get(key)
+            if session is not None:
+                stats.update(_connection_stats(session))
+            hosts[key] = stats
+        return {"settings": dict(_settings), "hosts": hosts}
+
+
+def close_all():
+    """Closes every pooled session and forgets async clients (used on shutdown and in tests)."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _session_hits.clear()
+        _session_misses.clear()
+        _async_clients.clear()
+        _async_hits.clear()
+        _async_misses.clear()
@@ -0,0 +1,191 @@
+import io
+import os
+import uuid
+import shutil
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps
+
+from content_hash import hash_file
+
+logger = logging.getLogger("ImagePrep")
+
+DEFAULT_MAX_DIMENSION = 1536 # Longest side sent to the vision model
+DEFAULT_FORMAT = "JPEG"
+DEFAULT_QUALITY = 85
+DEFAULT_MAX_CACHE_MB = 512
+
+_EXTENSIONS = {"JPEG": "jpg", "WEBP": "webp", "PNG": "png"}
+
+_preparers: Dict[str, "ImagePreparer"] = {}
+_preparers_lock = threading.Lock()
+
+
+class ImagePreparer:
+    """
+    Shrinks images before they are base64-encoded for the vision model:
+    decode, downscale to `max_dimension`, re-encode. Prepared bytes are
+    cached on disk by the source's content hash and the prep settings.
+    Files handed out by `pinned` are not evicted until they are released.
+    """
+
+    def __init__(self, cache_dir, max_dimension: int = DEFAULT_MAX_DIMENSION, image_format: str = DEFAULT_FORMAT,
+                 quality: int = DEFAULT_QUALITY, max_cache_mb: float = DEFAULT_MAX_CACHE_MB):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_dimension = max_dimension
+        self.format = image_format.upper()
+        self.quality = quality
+        self.max_cache_bytes = int(max_cache_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._lock = threading.Lock()
+        self._pins = Counter() # Cached files a request is still reading, by path
+        self._cache_size = sum(f.stat().st_size for f in self.cache_dir.iterdir() if f.is_file() and f.suffix != ".tmp")
+
+    def _cache_path(self, content_hash: str) -> Path:
+        settings = f"{self.max_dimension}_{self.format.lower()}_{self.quality}"
+        return self.cache_dir / f"{content_hash}_{settings}.{_EXTENSIONS.get(self.format, 'bin')}"
+
+    def prepare(self, image_path, content_hash: Optional[str] = None) -> bytes:
+        """Bytes to send for `image_path`; the original bytes when re-encoding would not make them smaller."""
+        with self.pinned(image_path, content_hash) as path:
+            return path.read_bytes()
+
+    def prepare_path(self, image_path, content_hash: Optional[str] = None) -> Path:
+        """Cached file holding the prepared bytes. It may be evicted at any time; readers use `pinned`."""
+        path = self._prepare(image_path, content_hash)
+        self._release(path)
+        return path
+
+    @contextmanager
+    def pinned(self, image_path, content_hash: Optional[str] = None):
+        """Yields the cached file for `image_path` and keeps it out of eviction until the block exits."""
+        path = self._prepare(image_path, content_hash)
+        try:
+            yield path
+        finally:
+            self._release(path)
+
+    def _release(self, cache_path: Path):
+        with self._lock:
+            self._pins[cache_path] -= 1
+            if self._pins[cache_path] <= 0:
+                del self._pins[cache_path]
+
+    def _prepare(self, image_path, content_hash: Optional[str]) -> Path:
+        """Prepares `image_path` if it is not cached yet and returns the cached file, pinned once."""
+        content_hash = content_hash or hash_file(image_path)
+        cache_path = self._cache_path(content_hash)
+        try:
+            with self._lock:
+                os.utime(cache_path) # mtime doubles as the LRU timestamp
+                self._pins[cache_path] += 1
+                self.hits += 1
+            return cache_path
+        except FileNotFoundError:
+            pass
+
+        original_size = os.path.getsize(image_path)
+        try:
+            data = self._encode(image_path)
+        except Exception as e:
+            logger.warning(f"Could not prepare {Path(image_path).name}, sending the original: {e}")
+            data = None
+
+        # Per call, so concurrent misses on the same image never write into each other's file
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{uuid.uuid4().hex}.tmp")
+        if data is None or len(data) >= original_size:
+            shutil.copyfile(image_path, tmp_path)
+            prepared_size = original_size
+        else:
+            tmp_path.write_bytes(data)
+            prepared_size = len(data)
+        with self._lock:
+            replaced = cache_path.stat().st_size if cache_path.exists() else 0 # Another miss got there first
+            os.replace(tmp_path, cache_path)
+            self._pins[cache_path] += 1
+            self.misses += 1
+            self.bytes_in += original_size
+            self.bytes_out += prepared_size
+            self._cache_size += prepared_size - replaced
+        self._evict()
+        logger.info(f"Prepared {Path(image_path).name}: {original_size // 1024} KB -> {prepared_size // 1024} KB")
+        return cache_path
+
+    def _encode(self, image_path) -> Optional[bytes]:
+        with Image.open(image_path) as img:
+            source_format = img.format
+            # Let the JPEG decoder skip detail we are about to throw away
+            img.draft("RGB", (self.max_dimension, self.max_dimension))
+            img = ImageOps.exif_transpose(img)
+            resized = max(img.size) > self.max_dimension
+            if not resized and source_format == self.format:
+                return None # Already small and in the target format
+            if resized:
+                img.thumbnail((self.max_dimension, self.max_dimension), Image.Resampling.LANCZOS)
+            if self.format == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGBA")
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.getchannel("A"))
+                img = background
+            buffer = io.BytesIO()
+            img.save(buffer, format=self.format, quality=self.quality, optimize=True)
+            return buffer.getvalue()
+
+    def _evict(self):
+        """Removes least recently used prepared images until the cache fits in max_cache_bytes."""
+        with self._lock:
+            if self._cache_size <= self.max_cache_bytes:
+                return
+            files = sorted((f for f in self.cache_dir.iterdir() if f.is_file() and f.suffix != ".tmp"),
+                           key=lambda f: f.stat().st_mtime)
+            for f in files:
+                if self._cache_size <= self.max_cache_bytes:
+                    break
+                if self._pins[f] > 0:
+                    continue # Being sent; a retry would re-read it
+                size = f.stat().st_size
+                try:
+                    f.unlink()
+                except OSError:
+                    continue # Still open by an in-flight request (Windows)
+                self._cache_size -= size
+
+    def stats(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "reduction": round(1 - self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+            "cache_bytes": self._cache_size,
+        }
+
+
+def get_image_preparer(config: dict) -> Optional[ImagePreparer]:
+    """Returns the shared preparer when `processing.image_prep` is enabled, otherwise None."""
+    prep_conf = config.get('processing', {}).get('image_prep', {})
+    if not prep_conf.get('enabled', False):
+        return None
+    root = str(Path(__file__).parent / prep_conf.get('cache_path', './cache/prepared'))
+    with _preparers_lock:
+        preparer = _preparers.get(root)
+        if preparer is None:
+            preparer = ImagePreparer(
+                root,
+                max_dimension=prep_conf.get('max_dimension', DEFAULT_MAX_DIMENSION),
+                image_format=prep_conf.get('format', DEFAULT_FORMAT),
+                quality=prep_conf.get('quality', DEFAULT_QUALITY),
+                max_cache_mb=prep_conf.get('max_cache_mb', DEFAULT_MAX_CACHE_MB),
+            )
+            _preparers[root] = preparer
+            logger.info(f"Image preparation enabled (max {preparer.max_dimension}px, {preparer.format})")
+        return preparer
@@ -0,0 +1,136 @@
+import time
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("IngestQueue")
+
+DEFAULT_MAX_SIZE = 256
+
+
+class IngestQueue:
+    """
+    Bounded FIFO of files waiting to be processed, drained by a pool of
+    worker threads. A path that is already queued or in flight is not queued
+    again, and a full queue rejects new paths instead of blocking the caller
+    (the file stays in the input directory).
+    """
+
+    def __init__(self, handler: Callable[[Path], Any], workers: int = 2, max_size: int = DEFAULT_MAX_SIZE):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_size = max_size
+        self._items: deque = deque() # (path, enqueued_at)
+        self._keys: set = set() # Queued and in-flight paths
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return
+            self._stopping = False
+            self._threads = [
+                threading.Thread(target=self._work, name=f"ingest-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Ingest queue started with {self.workers} workers (max {self.max_size} queued)")
+
+    def stop(self, timeout: Optional[float] = 30):
+        """Stops the workers after their current item; queued paths are dropped and stay on disk."""
+        with self._cond:
+            self._stopping = True
+            threads, self._threads = self._threads, []
+            for path, _ in self._items:
+                self._keys.discard(self._key(path))
+            self._items.clear()
+            self._cond.notify_all()
+        for thread in threads:
+            thread.join(timeout)
+
+    def submit(self, path: Path) -> bool:
+        """Queues `path`; returns False when it is a duplicate or the queue is full."""
+        key = self._key(path)
+        with self._cond:
+            if key in self._keys:
+                self.duplicates += 1
+                return False
+            if len(self._items) >= self.max_size:
+                self.rejected += 1
+                logger.warning(f"Ingest queue full ({self.max_size}), leaving {Path(path).name} for a later scan")
+                return False
+            self._items.append((Path(path), time.monotonic()))
+            self._keys.add(key)
+            self.enqueued += 1
+            self._cond.notify()
+        return True
+
+    def contains(self, path: Path) -> bool:
+        """True while `path` is queued or being processed."""
+        with self._cond:
+            return self._key(path) in self._keys
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._items and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                path, _ = self._items.popleft()
+                self._in_flight += 1
+            ok = False
+            try:
+                ok = self.handler(path) is not False
+            except Exception as e:
+                logger.error(f"Ingest worker failed on {path.name}: {e}")
+            with self._cond:
+                self._in_flight -= 1
+                self._keys.discard(self._key(path))
+                if ok:
+                    self.processed += 1
+                else:
+                    self.failed += 1
+                self._cond.notify_all()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Waits until nothing is queued or in flight; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._items or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def metrics(self) -> Dict:
+        with self._cond:
+            oldest = time.monotonic() - self._items[0][1] if self._items else 0.0
+            return {
+                "depth": len(self._items),
+                "in_flight": self._in_flight,
+                "max_size": self.max_size,
+                "workers": self.workers,
+                "oldest_age_seconds": round(oldest, 3),
+                "enqueued": self.enqueued,
+                "processed": self.processed,
+                "failed": self.failed,
+                "duplicates": self.duplicates,
+                "rejected": self.rejected,
+            }
@@ -6,6 +6,55 @@
 import sqlite3
 import os
 from pathlib import Path
+from typing import List
+
+DB_DIR = Path(__file__).parent / "db"
+SCHEMA_FILES = ["schema.sql", "benchmark_schema.sql", "telemetry_schema.sql"]
+
+# 既有資料庫的欄位遷移 (Columns added after the first release of each table)
+SCHEMA_MIGRATIONS = {
+    "benchmark_results": [
+        ("eval_count", "INTEGER"),
+        ("eval_duration", "INTEGER"),
+        ("prompt_eval_count", "INTEGER"),
+        ("prompt_eval_duration", "INTEGER"),
+        ("load_duration", "INTEGER"),
+        ("total_duration", "INTEGER"),
+    ],
+    "pipeline_items": [
+        ("model", "TEXT"),
+        ("eval_count", "INTEGER"),
+        ("eval_duration", "INTEGER"),
+        ("prompt_eval_count", "INTEGER"),
+        ("prompt_eval_duration", "INTEGER"),
+        ("load_duration", "INTEGER"),
+        ("total_duration", "INTEGER"),
+        ("content_hash", "TEXT"),
+        ("duplicate_of", "TEXT"),
+    ],
+}
+
+def migrate_database(conn: sqlite3.Connection) -> List[str]:
+    """補上舊版資料庫缺少的欄位，並建立新增的表格與索引 (Upgrade an existing database in place)"""
+    added = []
+    cursor = conn.cursor()
+    for table, columns in SCHEMA_MIGRATIONS.items():
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        if not existing:
+            continue # Table not created yet; the schema scripts below will create it
+        for name, col_type in columns:
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+                added.append(f"{table}.{name}")
+    conn.commit()
+
+    # Every statement in the schema files is idempotent (IF NOT EXISTS)
+    for schema_file in SCHEMA_FILES:
+        with open(DB_DIR / schema_file, 'r', encoding='utf-8') as f:
+            cursor.executescript(f.read())
+    conn.commit()
+    return added
 
 def init_database(db_path: Path = Path(__file__).parent / "db" / "pipeline.db", 
                     schema_path: Path = Path(__file__).parent / "db" / "schema.sql",
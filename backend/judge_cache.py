@@ -0,0 +1,150 @@
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import db_pool
+from init_db import migrate_database
+
+logger = logging.getLogger("JudgeCache")
+
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_TTL_HOURS = 168
+
+_caches: Dict[str, "JudgeCache"] = {}
+_caches_lock = threading.Lock()
+
+
+class JudgeCache:
+    """
+    Content-addressed store of judge verdicts. An entry is keyed on everything
+    that determines the verdict, so identical outputs judged against the same
+    standard by the same judge are only sent to the judge once.
+    """
+
+    def __init__(self, db_path, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_hours: float = DEFAULT_TTL_HOURS):
+        self.db_path = str(db_path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_hours * 3600
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = db_pool.get_connection(self.db_path)
+        try:
+            migrate_database(conn)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(model_output: str, standard_name: str, judge_backend: str, judge_model: str, prompt_template: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model_output, standard_name, judge_backend, judge_model, prompt_template):
+            encoded = (part or "").encode("utf-8")
+            # Length-prefix each part so field boundaries cannot collide
+            digest.update(len(encoded).to_bytes(8, "big"))
+            digest.update(encoded)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            conn = db_pool.get_connection(self.db_path)
+            try:
+                row = conn.execute("SELECT result_json, created_at FROM judge_cache WHERE cache_key = ?", (key,)).fetchone()
+                if row and now - row[1] > self.ttl_seconds:
+                    conn.execute("DELETE FROM judge_cache WHERE cache_key = ?", (key,))
+                    conn.commit()
+                    self.evictions += 1
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute("""
+                    UPDATE judge_cache SET hit_count = hit_count + 1, last_accessed_at = ? WHERE cache_key = ?
+                """, (now, key))
+                conn.commit()
+                self.hits += 1
+                return json.loads(row[0])
+            finally:
+                conn.close()
+
+    def put(self, key: str, result: Dict, standard_name: str, judge_backend: str, judge_model: str):
+        now = time.time()
+        with self._lock:
+            conn = db_pool.get_connection(self.db_path)
+            try:
+                conn.execute("""
+                    INSERT OR REPLACE INTO judge_cache
+                        (cache_key, standard_name, judge_backend, judge_model, result_json, hit_count, created_at, last_accessed_at)
+                    VALUES (?, ?, ?, ?, ?, 0, ?, ?)
+                """, (key, standard_name, judge_backend, judge_model, json.dumps(result, ensure_ascii=False), now, now))
+                self.evictions += self._evict(conn, now)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        """Drops expired entries, then the least recently used ones beyond max_entries."""
+        expired = conn.execute("DELETE FROM judge_cache WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        overflow = conn.execute("SELECT COUNT(*) FROM judge_cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute("""
+                DELETE FROM judge_cache WHERE cache_key IN (
+                    SELECT cache_key FROM judge_cache ORDER BY last_accessed_at ASC LIMIT ?
+                )
+            """, (overflow,))
+            return expired + overflow
+        return expired
+
+    def clear(self) -> int:
+        with self._lock:
+            conn = db_pool.get_connection(self.db_path)
+            try:
+                removed = conn.execute("DELETE FROM judge_cache").rowcount
+                conn.commit()
+                return removed
+            finally:
+                conn.close()
+
+    def stats(self) -> Dict:
+        conn = db_pool.get_connection(self.db_path)
+        try:
+            entries, stored_hits = conn.execute("SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM judge_cache").fetchone()
+        finally:
+            conn.close()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_hours": self.ttl_seconds / 3600,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "lifetime_hits": stored_hits,
+        }
+
+
+def get_judge_cache(config: dict) -> Optional[JudgeCache]:
+    """Returns the shared cache for the configured database, or None when `benchmark.judge_cache` is disabled."""
+    cache_conf = config.get('benchmark', {}).get('judge_cache', {})
+    if not cache_conf.get('enabled', False) or 'database' not in config:
+        return None
+    db_path = str(Path(__file__).parent / config['database']['path'])
+    with _caches_lock:
+        cache = _caches.get(db_path)
+        if cache is None:
+            cache = JudgeCache(
+                db_path,
+                max_entries=cache_conf.get('max_entries', DEFAULT_MAX_ENTRIES),
+                ttl_hours=cache_conf.get('ttl_hours', DEFAULT_TTL_HOURS),
+            )
+            _caches[db_path] = cache
+            logger.info(f"Judge cache enabled at {db_path} (max {cache.max_entries} entries)")
+        return cache
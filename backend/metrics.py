@@ -3,12 +3,14 @@
 效能指標 (Performance Metrics)
 Phase 5: 監控與分析
 """
-import sqlite3
+import db_pool
 from datetime import datetime, timedelta
 
+DB_PATH = "./db/pipeline.db"
+
 def get_metrics():
     """取得效能指標"""
-    conn = sqlite3.connect("./db/pipeline.db")
+    conn = db_pool.get_connection(DB_PATH)
     cursor = conn.cursor()
     
     # 總計
@@ -40,6 +42,43 @@ def get_metrics():
         'last_24h': last_24h
     }
 
+THROUGHPUT_SOURCES = {
+    'benchmark': 'benchmark_results',
+    'pipeline': 'pipeline_items',
+}
+
+def get_throughput_metrics(conn, source: str = 'benchmark', model: str = None):
+    """依模型彙總 Ollama 吞吐量 (tokens/sec、提示處理速率、模型載入開銷)"""
+    table = THROUGHPUT_SOURCES[source]
+    sql = f"""
+        SELECT model, COUNT(*),
+               SUM(eval_count), SUM(eval_duration),
+               SUM(prompt_eval_count), SUM(prompt_eval_duration),
+               AVG(load_duration), SUM(load_duration), SUM(total_duration)
+        FROM {table}
+        WHERE eval_duration IS NOT NULL AND model IS NOT NULL
+    """
+    params = []
+    if model:
+        sql += " AND model = ?"
+        params.append(model)
+    sql += " GROUP BY model ORDER BY model"
+
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    summaries = []
+    for (model_name, runs, eval_count, eval_ns, prompt_count, prompt_ns,
+         avg_load_ns, load_ns, total_ns) in cursor.fetchall():
+        summaries.append({
+            'model': model_name,
+            'runs': runs,
+            'tokens_per_second': eval_count / (eval_ns / 1e9) if eval_count and eval_ns else None,
+            'prompt_tokens_per_second': prompt_count / (prompt_ns / 1e9) if prompt_count and prompt_ns else None,
+            'avg_load_ms': avg_load_ns / 1e6 if avg_load_ns is not None else None,
+            'load_overhead_pct': load_ns / total_ns * 100 if load_ns is not None and total_ns else None,
+        })
+    return summaries
+
 def print_metrics():
     """列印指標"""
     metrics = get_metrics()
@@ -53,5 +92,15 @@ def print_metrics():
     print(f"  平均處理時間: {metrics['avg_processing_time_ms']:.0f} ms")
     print(f"  最近 24 小時: {metrics['last_24h']}")
 
+    conn = db_pool.get_connection(DB_PATH)
+    throughput = get_throughput_metrics(conn, 'pipeline') + get_throughput_metrics(conn, 'benchmark')
+    conn.close()
+    if throughput:
+        print("\n⚡ 模型吞吐量\n")
+        for t in throughput:
+            tps = f"{t['tokens_per_second']:.1f}" if t['tokens_per_second'] else "N/A"
+            load = f"{t['avg_load_ms']:.0f}" if t['avg_load_ms'] is not None else "N/A"
+            print(f"  {t['model']}: {tps} tokens/sec, 平均載入 {load} ms ({t['runs']} 次)")
+
 if __name__ == "__main__":
     print_metrics()
@@ -0,0 +1,47 @@
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+from http_pool import get_session
+
+logger = logging.getLogger("ModelDigests")
+
+DIGEST_TTL_SECONDS = 60 # How long a digest from /api/tags is trusted before re-checking
+
+
+class ModelDigestResolver:
+    """Caches model digests from Ollama's `/api/tags` so content-addressed caches can key on model weights."""
+
+    def __init__(self, ollama_url: str, timeout: int = 5):
+        self.ollama_url = ollama_url
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._digests: Dict[str, tuple] = {} # model -> (digest, fetched_at)
+
+    def _fetch(self) -> Dict[str, str]:
+        response = get_session(self.ollama_url).get(f"{self.ollama_url}/api/tags", timeout=self.timeout)
+        response.raise_for_status()
+        return {m["name"]: m.get("digest") for m in response.json().get("models", [])}
+
+    def get(self, model: str) -> Optional[str]:
+        """Current digest of `model`, or None when Ollama cannot be reached or does not know it."""
+        with self._lock:
+            cached = self._digests.get(model)
+            if cached and time.time() - cached[1] < DIGEST_TTL_SECONDS:
+                return cached[0]
+        try:
+            digests = self._fetch()
+        except Exception as e:
+            logger.warning(f"Could not resolve digest for {model}: {e}")
+            return None
+
+        now = time.time()
+        with self._lock:
+            for name, digest in digests.items():
+                self._digests[name] = (digest, now)
+        return digests.get(model)
+
+    def invalidate(self, model: str):
+        with self._lock:
+            self._digests.pop(model, None)
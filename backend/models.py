@@ -33,6 +33,8 @@ class PipelineItem(BaseModel):
     metadata_json: Optional[str] = None
     detection_raw_json: Optional[str] = None
     error_message: Optional[str] = None
+    content_hash: Optional[str] = None
+    duplicate_of: Optional[str] = None # Item whose description was reused for identical bytes
 
 class PipelineItemUpdateRequest(BaseModel):
     description: Optional[str] = None
@@ -46,6 +48,30 @@ class BenchmarkRunRequest(BaseModel):
     category: str
     model: str = "Llama 3.2"
     language: Optional[str] = None # New language field
+    stream: bool = False # Stream the generation to record time-to-first-token
+    bypass_judge_cache: bool = False # Ask the judge again even if a cached verdict exists
+
+class BenchmarkRepeatRequest(BaseModel):
+    category: str
+    model: str = "Llama 3.2"
+    language: Optional[str] = None
+    max_trials: int = 10
+    min_trials: int = 3
+    target_ci_width: float = 0.5 # Stop once the bootstrap interval is this narrow (score points)
+    confidence: float = 0.95
+
+class BenchmarkRepeatResponse(BaseModel):
+    trial_set_id: str
+    category: str
+    model: str
+    trials: int
+    stopped_early: bool
+    mean: float
+    variance: float
+    ci_low: float
+    ci_high: float
+    confidence: float
+    scores: List[float]
 
 class BenchmarkRunResponse(BaseModel):
     category: str
@@ -54,13 +80,64 @@ class BenchmarkRunResponse(BaseModel):
     breakdown: Dict[str, float]
     reasoning: str
     run_timestamp: str
+    latency: Optional[Dict[str, Optional[float]]] = None # Only set for streamed runs
+    stats: Optional[Dict[str, Optional[float]]] = None # Ollama timing fields and derived rates
     message: str = "Benchmark simulated successfully."
 
+class GenerationStats(BaseModel):
+    """Timing fields reported by Ollama's /api/generate. Durations are in nanoseconds."""
+    eval_count: Optional[int] = None
+    eval_duration: Optional[int] = None
+    prompt_eval_count: Optional[int] = None
+    prompt_eval_duration: Optional[int] = None
+    load_duration: Optional[int] = None
+    total_duration: Optional[int] = None
+
+    @classmethod
+    def from_ollama(cls, response: Optional[Dict]) -> "GenerationStats":
+        response = response or {}
+        return cls(**{field: response.get(field) for field in cls.model_fields})
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        if not self.eval_count or not self.eval_duration:
+            return None
+        return self.eval_count / (self.eval_duration / 1e9)
+
+    @property
+    def prompt_tokens_per_second(self) -> Optional[float]:
+        if not self.prompt_eval_count or not self.prompt_eval_duration:
+            return None
+        return self.prompt_eval_count / (self.prompt_eval_duration / 1e9)
+
+    @property
+    def load_ms(self) -> Optional[float]:
+        return self.load_duration / 1e6 if self.load_duration is not None else None
+
+    def to_dict(self) -> Dict:
+        """Raw fields plus derived rates, for JSON reports."""
+        data = self.model_dump()
+        data.update({
+            "tokens_per_second": self.tokens_per_second,
+            "prompt_tokens_per_second": self.prompt_tokens_per_second,
+            "load_ms": self.load_ms,
+        })
+        return data
+
+class ThroughputSummary(BaseModel):
+    model: str
+    runs: int
+    tokens_per_second: Optional[float] = None
+    prompt_tokens_per_second: Optional[float] = None
+    avg_load_ms: Optional[float] = None
+    load_overhead_pct: Optional[float] = None # Share of total_duration spent loading the model
+
 class BenchmarkPrompt(BaseModel):
     name: str # e.g., "reasoning_beginner"
     category: str # e.g., "reasoning"
     language: str # e.g., "en", "zh_TW"
     text: str
+    difficulty: Optional[str] = None # Optional stratum for dataset sampling, e.g., "easy", "hard"
 
 class ScoringStandard(BaseModel):
     name: str # e.g., "reasoning_standard_v1"
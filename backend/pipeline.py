@@ -6,6 +6,9 @@ import shutil
 import json
 import uuid
 import sqlite3
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from pathlib import Path
 import yaml
@@ -15,6 +18,15 @@ from typing import List, Dict, Optional
 sys.path.append(str(Path(__file__).parent))
 
 from api import OllamaClient
+import http_pool
+import db_pool
+from write_queue import get_write_queue
+from init_db import migrate_database
+from dir_poller import snapshot_directory
+from content_hash import hash_file
+from image_prep import get_image_preparer
+from thumbnails import get_thumbnail_generator
+from models import GenerationStats
 
 # Setup Logging
 logging.basicConfig(
@@ -34,6 +46,10 @@ class ImagePipeline:
         
         self.config = self._load_config(config_path)
         self.db_path = str(Path(__file__).parent / Path(self.config['database']['path']))
+        db_pool.configure_from_config(self.config)
+        # Status changes and benchmark results are group-committed in the background
+        self.writes = get_write_queue(self.config, self.db_path)
+        self.writes.start()
         self.input_dir = Path(__file__).parent / self.config['paths']['input']
         self.output_dir = Path(__file__).parent / self.config['paths']['output']
         self.failed_dir = Path(__file__).parent / self.config['paths']['failed']
@@ -46,6 +62,9 @@ class ImagePipeline:
         # Initialize API Client with enhanced configuration
         ollama_conf = self.config.get('ollama', {})
         gemini_conf = self.config.get('gemini', {})
+
+        # Size the shared keep-alive pools before any client grabs a session
+        http_pool.configure_from_config(self.config)
         
         self.api = OllamaClient(
             base_url=ollama_conf.get('url', "http://localhost:11434"),
@@ -54,9 +73,22 @@ class ImagePipeline:
             retries=ollama_conf.get('retry_attempts', 3),
             retry_delay=ollama_conf.get('retry_delay_seconds', 1.0),
             use_gemini_fallback=gemini_conf.get('fallback_on_ollama_failure', False),
-            gemini_api_key=gemini_conf.get('api_key', "")
+            gemini_api_key=gemini_conf.get('api_key', ""),
+            image_preparer=get_image_preparer(self.config)
         )
 
+        # Review thumbnails are rendered in a separate process pool
+        self.thumbnails = get_thumbnail_generator(self.config)
+
+        # Content-hash deduplication state
+        self.avoided_model_calls = 0
+        self._hash_lock = threading.Lock()
+        self._inflight_hashes: Dict[str, threading.Event] = {}
+        # Images a worker is still on, including ones a run gave up on after item_timeout_seconds
+        self._inflight_paths: set = set()
+
+        self._migrate_schema()
+
     def _load_config(self, path: str) -> Dict:
         try:
             with open(path, 'r', encoding='utf-8') as f:
@@ -66,110 +98,348 @@ class ImagePipeline:
             sys.exit(1)
 
     def _get_db_connection(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path)
+        """This thread's pooled connection; `close()` on it is a no-op."""
+        return db_pool.get_connection(self.db_path)
 
-    def _record_processing_start(self, item_id: str, filename: str, filepath: str):
+    def _migrate_schema(self):
+        """Adds columns introduced after the database was initialized."""
+        if not Path(self.db_path).exists():
+            return # init_db.py has not been run yet
         try:
             with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO pipeline_items (id, filename, filepath, status, source, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (item_id, filename, filepath, 'processing', 'Ollama', datetime.now()))
-                conn.commit()
+                added = migrate_database(conn)
+            if added:
+                logger.info(f"Database schema migrated, added columns: {', '.join(added)}")
         except Exception as e:
-            logger.error(f"DB Insert Error: {e}")
+            logger.error(f"Database schema migration failed: {e}")
+
+    def close(self):
+        """Commits queued writes and stops the write-behind thread."""
+        self.writes.stop()
+
+    def _record_processing_start(self, item_id: str, filename: str, filepath: str, content_hash: Optional[str] = None):
+        self.writes.submit("""
+            INSERT INTO pipeline_items (id, filename, filepath, status, source, created_at, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (item_id, filename, filepath, 'processing', 'Ollama', datetime.now(), content_hash), key=content_hash)
 
     def _update_processing_status(self, item_id: str, status: str, 
                                   description: Optional[str] = None, 
                                   metadata: Optional[Dict] = None,
-                                  error: Optional[str] = None):
+                                  error: Optional[str] = None,
+                                  processing_time_ms: Optional[int] = None,
+                                  confidence: Optional[float] = None,
+                                  model: Optional[str] = None,
+                                  stats: Optional[GenerationStats] = None,
+                                  content_hash: Optional[str] = None):
+        update_fields = ["status = ?", "updated_at = CURRENT_TIMESTAMP"]
+        params = [status]
+        
+        if description:
+            update_fields.append("description = ?")
+            params.append(description)
+        if metadata:
+            update_fields.append("metadata_json = ?")
+            params.append(json.dumps(metadata, ensure_ascii=False))
+        if error:
+            update_fields.append("error_message = ?")
+            params.append(error)
+        if processing_time_ms is not None:
+            update_fields.append("processing_time_ms = ?")
+            params.append(processing_time_ms)
+        if confidence is not None:
+            update_fields.append("confidence_score = ?")
+            params.append(confidence)
+        if model:
+            update_fields.append("model = ?")
+            params.append(model)
+        if stats:
+            for field, value in stats.model_dump().items():
+                update_fields.append(f"{field} = ?")
+                params.append(value)
+
+        params.append(item_id)
+        sql = f"UPDATE pipeline_items SET {', '.join(update_fields)} WHERE id = ?"
+        self.writes.submit(sql, tuple(params), key=content_hash)
+
+    def _record_benchmark_result(self, run_id: str, category: str, model: str, score: float, breakdown_json: str, reasoning: str, run_timestamp: str,
+                                 stats: Optional[GenerationStats] = None):
+        stats = stats or GenerationStats()
+        self.writes.submit("""
+            INSERT INTO benchmark_results (id, category, model, score, breakdown_json, reasoning, run_timestamp,
+                                           eval_count, eval_duration, prompt_eval_count, prompt_eval_duration,
+                                           load_duration, total_duration)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (run_id, category, model, score, breakdown_json, reasoning, run_timestamp,
+              stats.eval_count, stats.eval_duration, stats.prompt_eval_count, stats.prompt_eval_duration,
+              stats.load_duration, stats.total_duration))
+
+    def _record_benchmark_trial(self, trial_set_id: str, trial_index: int, category: str, model: str, prompt_name: Optional[str],
+                                score: float, breakdown_json: str, run_timestamp: str, stats: Optional[GenerationStats] = None):
+        stats = stats or GenerationStats()
+        self.writes.submit("""
+            INSERT INTO benchmark_trials (trial_set_id, trial_index, category, model, prompt_name, score, breakdown_json,
+                                          run_timestamp, eval_count, eval_duration, prompt_eval_count,
+                                          prompt_eval_duration, load_duration, total_duration)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (trial_set_id, trial_index, category, model, prompt_name, score, breakdown_json, run_timestamp,
+              stats.eval_count, stats.eval_duration, stats.prompt_eval_count, stats.prompt_eval_duration,
+              stats.load_duration, stats.total_duration))
+
+    # --- Content-hash deduplication ---
+
+    @contextmanager
+    def _claim_content_hash(self, content_hash: Optional[str]):
+        """Serializes workers holding the same bytes, so a burst of copies costs one model call."""
+        if not content_hash:
+            yield
+            return
+        while True:
+            with self._hash_lock:
+                event = self._inflight_hashes.get(content_hash)
+                if event is None:
+                    self._inflight_hashes[content_hash] = threading.Event()
+                    break
+            event.wait()
+        try:
+            yield
+        finally:
+            with self._hash_lock:
+                self._inflight_hashes.pop(content_hash).set()
+
+    def _find_processed_duplicate(self, content_hash: str) -> Optional[Dict]:
+        """Earliest successfully described item with the same content hash."""
+        if self.writes.has_pending(content_hash):
+            self.writes.flush() # The copy that was just described may not be committed yet
         try:
             with self._get_db_connection() as conn:
                 cursor = conn.cursor()
-                
-                update_fields = ["status = ?"]
-                params = [status]
-                
-                if description:
-                    update_fields.append("description = ?")
-                    params.append(description)
-                if metadata:
-                    update_fields.append("metadata_json = ?")
-                    params.append(json.dumps(metadata, ensure_ascii=False))
-                if error:
-                    update_fields.append("error_message = ?")
-                    params.append(error)
-                
-                params.append(item_id)
-                
-                sql = f"UPDATE pipeline_items SET {', '.join(update_fields)} WHERE id = ?"
-                cursor.execute(sql, params)
-                conn.commit()
+                cursor.row_factory = sqlite3.Row # Connection-level would leak into the shared connection
+                row = cursor.execute("""
+                    SELECT id, filename, status, source, description, metadata_json, confidence_score, model
+                    FROM pipeline_items
+                    WHERE content_hash = ? AND status IN ('pending', 'approved', 'rejected') AND description IS NOT NULL
+                    ORDER BY created_at LIMIT 1
+                """, (content_hash,)).fetchone()
+            return dict(row) if row else None
         except Exception as e:
-            logger.error(f"DB Update Error: {e}")
+            logger.error(f"DB Lookup Error for content hash: {e}")
+            return None
+
+    def _handle_duplicate(self, image_path: Path, original: Dict, content_hash: str, policy: str) -> bool:
+        """Reuses the original item's description instead of calling the model again."""
+        filename = image_path.name
+        with self._hash_lock:
+            self.avoided_model_calls += 1
+
+        if policy == 'skip':
+            duplicates_dir = self.output_dir / "_duplicates"
+            duplicates_dir.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(image_path), str(duplicates_dir / filename))
+            logger.info(f"Skipped duplicate {filename} (same content as item {original['id']})")
+            return True
+
+        item_id = str(uuid.uuid4())
+        item_output_dir = self.output_dir / image_path.stem
+        item_output_dir.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(image_path), str(item_output_dir / filename))
+
+        metadata = json.loads(original['metadata_json']) if original.get('metadata_json') else {}
+        metadata.update({
+            "id": item_id,
+            "original_filename": filename,
+            "timestamp": datetime.now().isoformat(),
+            "duplicate_of": original['id'],
+        })
+        self._write_artifacts(item_output_dir, metadata, original['description'])
+        self._schedule_thumbnail(item_output_dir / filename, item_output_dir, content_hash,
+                                 reuse_from=self.output_dir / Path(original['filename']).stem)
+        self.writes.submit("""
+            INSERT INTO pipeline_items (id, filename, filepath, status, source, created_at, description,
+                                        metadata_json, confidence_score, model, content_hash, duplicate_of)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (item_id, filename, str(image_path), original['status'], original['source'], datetime.now(),
+              original['description'], json.dumps(metadata, ensure_ascii=False), original['confidence_score'],
+              original['model'], content_hash, original['id']), key=content_hash)
+        logger.info(f"Linked duplicate {filename} to item {original['id']}")
+        return True
 
-    def _record_benchmark_result(self, run_id: str, category: str, model: str, score: float, breakdown_json: str, reasoning: str, run_timestamp: str):
+    def _schedule_thumbnail(self, image_path: Path, item_output_dir: Path, content_hash: Optional[str],
+                            reuse_from: Optional[Path] = None):
+        if self.thumbnails is None:
+            return
         try:
-            with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO benchmark_results (id, category, model, score, breakdown_json, reasoning, run_timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (run_id, category, model, score, breakdown_json, reasoning, run_timestamp))
-                conn.commit()
+            self.thumbnails.submit(image_path, item_output_dir, content_hash, reuse_from)
         except Exception as e:
-            logger.error(f"DB Insert Error for benchmark result: {e}")
+            logger.error(f"Could not schedule thumbnail for {image_path.name}: {e}")
+
+    def _write_artifacts(self, item_output_dir: Path, metadata: Dict, description: str):
+        with open(item_output_dir / "metadata.json", 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+        # Markdown Description
+        with open(item_output_dir / "description.zh-TW.md", 'w', encoding='utf-8') as f:
+            f.write(f"# Image Description\n\n{description}\n")
 
     def scan_input(self) -> List[Path]:
         """Scans input directory for supported images."""
-        allowed_exts = set(self.config['security']['allowed_extensions'])
-        files = []
-        for file in self.input_dir.iterdir():
-            if file.is_file() and file.suffix.lower() in allowed_exts:
-                files.append(file)
+        # One scandir pass; the extension is checked before any stat call
+        files = [self.input_dir / name for name in snapshot_directory(self.input_dir, self.config['security']['allowed_extensions'])]
+        with self._hash_lock:
+            busy = {path for path in files if os.path.abspath(path) in self._inflight_paths}
+        if busy:
+            logger.info(f"Skipping {len(busy)} images still being processed.")
+            files = [path for path in files if path not in busy]
         logger.info(f"Found {len(files)} images in input directory.")
         return files
 
-    def run(self):
-        """Main execution loop for a single run."""
+    def run(self, cancel_event: Optional[threading.Event] = None) -> Optional[Dict]:
+        """
+        Main execution loop for a single run. Images are dispatched to a pool
+        of `processing.max_concurrent_jobs` workers; setting `cancel_event`
+        stops new items from starting while in-flight ones finish.
+
+        A worker past `processing.item_timeout_seconds` cannot be interrupted:
+        it is counted as timed out but may still be running when this returns
+        (`still_running` in the summary), and later scans skip its image.
+        """
         logger.info("Starting Pipeline Run...")
 
         if not self.api.check_health():
             logger.error(f"Ollama server is not healthy at {self.api.base_url}. Please ensure Ollama is running and accessible.")
-            return
+            return None
 
         images = self.scan_input()
         
         if not images:
             logger.info("No images found to process.")
-            return
+            return None
 
-        for image_path in images:
-            self.process_image(image_path)
-            
-        logger.info("Pipeline Run Complete.")
+        proc_conf = self.config.get('processing', {})
+        workers = max(1, min(int(proc_conf.get('max_concurrent_jobs', 1)), len(images)))
+        item_timeout = proc_conf.get('item_timeout_seconds')
+        cancel_event = cancel_event or threading.Event()
+        summary = {"images": len(images), "workers": workers, "processed": 0, "failed": 0,
+                   "timed_out": 0, "cancelled": 0, "serial_time_seconds": 0.0}
+
+        started_at: Dict[Path, float] = {}
+
+        def _worker(image_path: Path, abandoned: threading.Event):
+            if cancel_event.is_set():
+                return None # Left in the input directory for the next run
+            started_at[image_path] = time.monotonic()
+            started = time.perf_counter()
+            ok = self.process_image(image_path, abandoned)
+            return ok, time.perf_counter() - started
 
-    def process_image(self, image_path: Path):
-        """Process a single image."""
+        run_started = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pipeline")
+        pending = {}
+        timed_out = []
+        try:
+            for image_path in images:
+                abandoned = threading.Event()
+                pending[executor.submit(_worker, image_path, abandoned)] = (image_path, abandoned)
+            while pending:
+                done, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.pop(future)
+                    outcome = future.result()
+                    if outcome is None:
+                        summary["cancelled"] += 1
+                        continue
+                    ok, elapsed = outcome
+                    summary["serial_time_seconds"] += elapsed
+                    summary["processed" if ok else "failed"] += 1
+
+                if cancel_event.is_set():
+                    for future in [f for f in pending if f.cancel()]:
+                        pending.pop(future)
+                        summary["cancelled"] += 1
+                if item_timeout:
+                    now = time.monotonic()
+                    for future, (image_path, abandoned) in list(pending.items()):
+                        started = started_at.get(image_path)
+                        if started is not None and now - started >= item_timeout:
+                            # The worker cannot be interrupted mid-request; it fails the item once the call returns
+                            logger.error(f"Timed out after {item_timeout}s: {image_path.name}")
+                            abandoned.set()
+                            pending.pop(future)
+                            timed_out.append(future)
+                            summary["timed_out"] += 1
+        except KeyboardInterrupt:
+            logger.warning("Pipeline run interrupted, cancelling queued images...")
+            cancel_event.set()
+            summary["cancelled"] += sum(1 for f in pending if f.cancel())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        self.writes.flush()
+        summary["still_running"] = sum(1 for future in timed_out if not future.done())
+        wall_time = time.perf_counter() - run_started
+        summary["wall_time_seconds"] = round(wall_time, 3)
+        summary["serial_time_seconds"] = round(summary["serial_time_seconds"], 3)
+        summary["speedup"] = round(summary["serial_time_seconds"] / wall_time, 2) if wall_time > 0 else None
+        logger.info(f"Pipeline Run Complete: {summary['processed']} processed, {summary['failed']} failed, "
+                    f"{summary['timed_out']} timed out ({summary['still_running']} still running), {summary['cancelled']} cancelled with {workers} workers; "
+                    f"wall {summary['wall_time_seconds']}s vs serial {summary['serial_time_seconds']}s "
+                    f"(x{summary['speedup']})")
+        return summary
+
+    def process_image(self, image_path: Path, abandoned: Optional[threading.Event] = None) -> bool:
+        """Process a single image. Returns True on success; an item whose run gave up on it (`abandoned`) fails."""
+        path_key = os.path.abspath(image_path)
+        with self._hash_lock:
+            if path_key in self._inflight_paths:
+                logger.warning(f"Already processing {image_path.name}, skipping")
+                return False
+            self._inflight_paths.add(path_key)
+        try:
+            return self._process_image(image_path, abandoned)
+        finally:
+            with self._hash_lock:
+                self._inflight_paths.discard(path_key)
+
+    def _process_image(self, image_path: Path, abandoned: Optional[threading.Event]) -> bool:
+        policy = self.config.get('processing', {}).get('duplicate_policy', 'link')
+        try:
+            content_hash = hash_file(image_path)
+        except OSError as e:
+            logger.warning(f"Could not hash {image_path.name}, processing without deduplication: {e}")
+            content_hash = None
+
+        with self._claim_content_hash(content_hash):
+            if content_hash and policy != 'reprocess':
+                original = self._find_processed_duplicate(content_hash)
+                if original:
+                    try:
+                        return self._handle_duplicate(image_path, original, content_hash, policy)
+                    except Exception as e:
+                        logger.error(f"Failed to reuse description for {image_path.name}, processing it instead: {e}")
+            return self._process_new_image(image_path, content_hash, abandoned)
+
+    def _process_new_image(self, image_path: Path, content_hash: Optional[str], abandoned: Optional[threading.Event]) -> bool:
         item_id = str(uuid.uuid4())
         filename = image_path.name
         logger.info(f"Processing: {filename} (ID: {item_id})")
         
         # 1. Record Start
-        self._record_processing_start(item_id, filename, str(image_path))
+        self._record_processing_start(item_id, filename, str(image_path), content_hash)
         
         try:
             # 2. Call API
             start_time = time.time()
-            result = self.api.generate_description(str(image_path))
+            result = self.api.generate_description(str(image_path), content_hash=content_hash)
             processing_time = int((time.time() - start_time) * 1000)
             
             if not result:
                 raise Exception("API returned no result")
+            if abandoned is not None and abandoned.is_set():
+                raise TimeoutError(f"Processing exceeded the item timeout ({processing_time} ms)")
 
             description = result.get('description', '')
             confidence = result.get('confidence', 0.0)
+            stats = result.get('stats') or GenerationStats()
             
             # 3. Prepare Output Directory
             # Create a folder for this item in output/
@@ -188,23 +458,26 @@ class ImagePipeline:
                 "timestamp": datetime.now().isoformat(),
                 "processing_time_ms": processing_time,
                 "model": self.api.model,
-                "confidence": confidence
+                "confidence": confidence,
+                "generation_stats": stats.to_dict()
             }
-            with open(item_output_dir / "metadata.json", 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=2)
-            
-            # Markdown Description
-            with open(item_output_dir / "description.zh-TW.md", 'w', encoding='utf-8') as f:
-                f.write(f"# Image Description\n\n{description}\n")
+            self._write_artifacts(item_output_dir, metadata, description)
+            self._schedule_thumbnail(dest_path, item_output_dir, content_hash)
 
             # 6. Update DB Success
             self._update_processing_status(
                 item_id, 
                 status='pending', # Needs manual approval
                 description=description, 
-                metadata=metadata
+                metadata=metadata,
+                processing_time_ms=processing_time,
+                confidence=confidence,
+                model=self.api.model,
+                stats=stats,
+                content_hash=content_hash
             )
             logger.info(f"Successfully processed {filename}")
+            return True
 
         except Exception as e:
             logger.error(f"Failed to process {filename}: {e}")
@@ -214,8 +487,10 @@ class ImagePipeline:
             except:
                 pass # If move fails, leave it or log it
             
-            self._update_processing_status(item_id, status='failed', error=str(e))
+            self._update_processing_status(item_id, status='failed', error=str(e), content_hash=content_hash)
+            return False
 
 if __name__ == "__main__":
     pipeline = ImagePipeline()
-    pipeline.run()
\ No newline at end of file
+    pipeline.run()
+    pipeline.close()
\ No newline at end of file
@@ -1,12 +1,16 @@
 import json
+import random
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
 from models import BenchmarkPrompt # Assuming models.py is in backend/ 
 
 class PromptLoader:
-    def __init__(self, prompts_dir: Path = Path(__file__).parent / "benchmark" / "prompts"):
+    def __init__(self, prompts_dir: Path = Path(__file__).parent / "benchmark" / "prompts",
+                 datasets_dir: Optional[Path] = None):
         self.prompts_dir = prompts_dir
+        # Multi-prompt datasets (<category>_<language>.jsonl) live next to the single prompts
+        self.datasets_dir = datasets_dir or prompts_dir.parent / "datasets"
         self._prompts: Dict[str, Dict[str, BenchmarkPrompt]] = {} # {category: {language: BenchmarkPrompt}}
         self._load_prompts()
 
@@ -43,6 +47,64 @@ class PromptLoader:
             
         return None
 
+    def _dataset_path(self, category: str, language: str) -> Optional[Path]:
+        # Same fallback order as get_prompt: exact, base language, English
+        for lang in dict.fromkeys([language, language.split('_')[0], "en"]):
+            path = self.datasets_dir / f"{category}_{lang}.jsonl"
+            if path.exists():
+                return path
+        return None
+
+    def iter_dataset(self, category: str, language: str = "en") -> Iterator[BenchmarkPrompt]:
+        """
+        Streams the prompts of a category dataset one JSONL line at a time.
+        Categories without a dataset yield their single default prompt.
+        """
+        path = self._dataset_path(category, language)
+        if path is None:
+            prompt = self.get_prompt(category, language)
+            if prompt:
+                yield prompt
+            return
+
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield BenchmarkPrompt(**json.loads(line))
+                except Exception as e:
+                    print(f"Error loading dataset line {path}:{line_number}: {e}")
+
+    def sample_dataset(self, categories: List[str], language: str = "en", per_stratum: Optional[int] = None,
+                       stratify_by: Optional[str] = None, seed: Optional[int] = None) -> List[BenchmarkPrompt]:
+        """
+        Draws up to `per_stratum` prompts from every stratum (category, plus the
+        `stratify_by` prompt field when given) with reservoir sampling, so
+        datasets are never fully loaded into memory. per_stratum=None keeps all prompts.
+        """
+        if stratify_by and stratify_by not in BenchmarkPrompt.model_fields:
+            raise ValueError(f"Cannot stratify by unknown prompt field '{stratify_by}'")
+        rng = random.Random(seed)
+        sampled: List[BenchmarkPrompt] = []
+        for category in categories:
+            reservoirs: Dict[Optional[str], List[BenchmarkPrompt]] = {}
+            seen: Dict[Optional[str], int] = {}
+            for prompt in self.iter_dataset(category, language):
+                stratum = getattr(prompt, stratify_by) if stratify_by else None
+                seen[stratum] = seen.get(stratum, 0) + 1
+                reservoir = reservoirs.setdefault(stratum, [])
+                if per_stratum is None or len(reservoir) < per_stratum:
+                    reservoir.append(prompt)
+                else:
+                    # Algorithm R: keep the new prompt with probability per_stratum / seen
+                    index = rng.randrange(seen[stratum])
+                    if index < per_stratum:
+                        reservoir[index] = prompt
+            for stratum in sorted(reservoirs, key=lambda s: (s is None, s or "")):
+                sampled.extend(reservoirs[stratum])
+        return sampled
+
 # Example usage (for testing)
 if __name__ == "__main__":
     loader = PromptLoader()
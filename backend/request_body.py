@@ -0,0 +1,42 @@
+import json
+import mmap
+import base64
+import os
+from pathlib import Path
+from typing import Dict, Iterator
+
+BASE64_CHUNK_BYTES = 768 * 1024 # Multiple of 3, so encoded chunks concatenate without padding
+_IMAGE_PLACEHOLDER = "__image_base64__"
+
+
+class Base64ImageBody:
+    """
+    JSON body of an `/api/generate` request whose image is base64-encoded on
+    the fly from a memory-mapped file, one chunk at a time. Peak memory per
+    request is one chunk, whatever the image size. The body knows its length,
+    so requests sends a Content-Length header instead of chunked encoding,
+    and it can be iterated again for each retry.
+    """
+
+    def __init__(self, payload: Dict, image_path, chunk_size: int = BASE64_CHUNK_BYTES):
+        if chunk_size % 3:
+            raise ValueError("chunk_size must be a multiple of 3")
+        envelope = json.dumps({**payload, "images": [_IMAGE_PLACEHOLDER]})
+        # "images" is the last key, so the last placeholder is ours even if the prompt contains it
+        prefix, _, suffix = envelope.rpartition(_IMAGE_PLACEHOLDER)
+        self.prefix = prefix.encode("utf-8")
+        self.suffix = suffix.encode("utf-8")
+        self.image_path = Path(image_path)
+        self.image_size = os.path.getsize(image_path)
+        self.chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return len(self.prefix) + 4 * ((self.image_size + 2) // 3) + len(self.suffix)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self.prefix
+        if self.image_size:
+            with open(self.image_path, "rb") as f, mmap.mmap(f.fileno(), self.image_size, access=mmap.ACCESS_READ) as mapped:
+                for start in range(0, self.image_size, self.chunk_size):
+                    yield base64.b64encode(mapped[start:start + self.chunk_size])
+        yield self.suffix
@@ -0,0 +1,195 @@
+import os
+import json
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from model_digests import ModelDigestResolver
+
+logger = logging.getLogger("ResponseCache")
+
+DEFAULT_MAX_SIZE_MB = 256
+
+_caches: Dict[str, "ResponseCache"] = {}
+_caches_lock = threading.Lock()
+
+
+def is_deterministic(options: Optional[Dict]) -> bool:
+    """Only generations with greedy decoding or a fixed seed are safe to replay."""
+    options = options or {}
+    return options.get("temperature") == 0 or options.get("seed") is not None
+
+
+def _safe_name(model: str) -> str:
+    return model.replace("/", "_").replace(":", "_")
+
+
+class ResponseCache:
+    """
+    Size-bounded on-disk cache of Ollama generations. Entries live under
+    `<root>/<model>/<digest>/<key>.json`, so a pulled model with a new digest
+    never sees responses from its previous weights.
+    """
+
+    def __init__(self, root, ollama_url: str, max_size_mb: float = DEFAULT_MAX_SIZE_MB, timeout: int = 5):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ollama_url = ollama_url
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.digests = ModelDigestResolver(ollama_url, timeout)
+        self._seen_digests: Dict[str, str] = {}
+        self._size = sum(f.stat().st_size for f in self.root.rglob("*.json"))
+
+    # --- Model digests ---
+
+    def model_digest(self, model: str) -> Optional[str]:
+        """Current digest of `model`; a changed digest purges entries cached for the old weights."""
+        digest = self.digests.get(model)
+        if digest and self._seen_digests.get(model) != digest:
+            self._purge_stale_digests(model, digest)
+            with self._lock:
+                self._seen_digests[model] = digest
+        return digest
+
+    def _purge_stale_digests(self, model: str, digest: str):
+        model_dir = self.root / _safe_name(model)
+        if not model_dir.exists():
+            return
+        for digest_dir in model_dir.iterdir():
+            if digest_dir.is_dir() and digest_dir.name != digest:
+                logger.info(f"Model {model} changed digest; dropping responses cached for {digest_dir.name[:12]}")
+                self._remove_tree(digest_dir)
+
+    def invalidate_model(self, model: str):
+        """Forgets the digest and cached responses of `model` (called after a pull or delete)."""
+        self.digests.invalidate(model)
+        with self._lock:
+            self._seen_digests.pop(model, None)
+        model_dir = self.root / _safe_name(model)
+        if model_dir.exists():
+            self._remove_tree(model_dir)
+
+    def _remove_tree(self, path: Path):
+        removed = 0
+        for f in path.rglob("*.json"):
+            try:
+                removed += f.stat().st_size
+            except FileNotFoundError:
+                pass # Evicted while we were scanning
+        shutil.rmtree(path, ignore_errors=True)
+        with self._lock:
+            self._size = max(self._size - removed, 0)
+
+    # --- Entries ---
+
+    @staticmethod
+    def make_key(prompt: str, images: Optional[List[str]] = None, options: Optional[Dict] = None) -> str:
+        digest = hashlib.sha256()
+        digest.update(prompt.encode("utf-8"))
+        for image in images or []:
+            digest.update(b"\x00image\x00")
+            digest.update(hashlib.sha256(image.encode("utf-8")).digest())
+        digest.update(b"\x00options\x00")
+        digest.update(json.dumps(options or {}, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, model: str, digest: str, key: str) -> Path:
+        return self.root / _safe_name(model) / digest / f"{key}.json"
+
+    def get(self, model: str, prompt: str, images: Optional[List[str]] = None, options: Optional[Dict] = None) -> Optional[Dict]:
+        digest = self.model_digest(model)
+        if not digest:
+            return None
+        path = self._entry_path(model, digest, self.make_key(prompt, images, options))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path) # mtime doubles as the LRU timestamp
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry
+
+    def put(self, model: str, prompt: str, response: Dict, images: Optional[List[str]] = None, options: Optional[Dict] = None):
+        digest = self.model_digest(model)
+        if not digest:
+            return
+        path = self._entry_path(model, digest, self.make_key(prompt, images, options))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(response, ensure_ascii=False).encode("utf-8")
+        # Per call, so concurrent puts of one key never write into or replace each other's file
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        try:
+            previous = path.stat().st_size
+        except FileNotFoundError:
+            previous = 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._size += len(data) - previous
+        self._evict()
+
+    def _evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            if self._size <= self.max_bytes:
+                return
+            files = []
+            for f in self.root.rglob("*.json"):
+                try:
+                    stat = f.stat()
+                except FileNotFoundError:
+                    continue # Removed by a concurrent invalidate_model
+                files.append((stat.st_mtime, stat.st_size, f))
+            for _, size, f in sorted(files, key=lambda entry: entry[0]):
+                if self._size <= self.max_bytes:
+                    break
+                try:
+                    f.unlink()
+                except FileNotFoundError:
+                    continue # Already gone; invalidate_model accounts for its size
+                self._size -= size
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+
+def get_response_cache(config: dict) -> Optional[ResponseCache]:
+    """Returns the shared cache when `benchmark.response_cache` is enabled, otherwise None."""
+    cache_conf = config.get('benchmark', {}).get('response_cache', {})
+    if not cache_conf.get('enabled', False):
+        return None
+    root = str(Path(__file__).parent / cache_conf.get('path', './cache/responses'))
+    with _caches_lock:
+        cache = _caches.get(root)
+        if cache is None:
+            cache = ResponseCache(
+                root,
+                config['ollama']['url'],
+                max_size_mb=cache_conf.get('max_size_mb', DEFAULT_MAX_SIZE_MB),
+            )
+            _caches[root] = cache
+            logger.info(f"Response cache enabled at {root} ({cache.max_bytes // (1024 * 1024)} MB)")
+        return cache
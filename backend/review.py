@@ -3,14 +3,16 @@
 審核 CLI 工具 (Review CLI)
 Phase 2: 審核隊列管理
 """
-import sqlite3
+import db_pool
 import sys
 from pathlib import Path
 import shutil
 
+DB_PATH = "./db/pipeline.db"
+
 def list_pending():
     """列出待審核項目"""
-    conn = sqlite3.connect("./db/pipeline.db")
+    conn = db_pool.get_connection(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT id, filename, created_at FROM pipeline_items WHERE status='pending' ORDER BY created_at")
     items = cursor.fetchall()
@@ -26,7 +28,7 @@ def list_pending():
 
 def show_item(item_id):
     """顯示項目詳情"""
-    conn = sqlite3.connect("./db/pipeline.db")
+    conn = db_pool.get_connection(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM pipeline_items WHERE id=?", (item_id,))
     item = cursor.fetchone()
@@ -45,9 +47,9 @@ def show_item(item_id):
 
 def approve_item(item_id):
     """批准項目"""
-    conn = sqlite3.connect("./db/pipeline.db")
+    conn = db_pool.get_connection(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("UPDATE pipeline_items SET status='approved' WHERE id=?", (item_id,))
+    cursor.execute("UPDATE pipeline_items SET status='approved', updated_at=CURRENT_TIMESTAMP WHERE id=?", (item_id,))
     cursor.execute("INSERT INTO approval_history (item_id, action) VALUES (?, 'approve')", (item_id,))
     conn.commit()
     conn.close()
@@ -55,7 +57,7 @@ def approve_item(item_id):
 
 def reject_item(item_id):
     """拒絕項目"""
-    conn = sqlite3.connect("./db/pipeline.db")
+    conn = db_pool.get_connection(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT filepath FROM pipeline_items WHERE id=?", (item_id,))
     result = cursor.fetchone()
@@ -68,7 +70,7 @@ def reject_item(item_id):
         if src.exists():
             shutil.move(str(src), str(dst))
     
-    cursor.execute("UPDATE pipeline_items SET status='rejected' WHERE id=?", (item_id,))
+    cursor.execute("UPDATE pipeline_items SET status='rejected', updated_at=CURRENT_TIMESTAMP WHERE id=?", (item_id,))
     cursor.execute("INSERT INTO approval_history (item_id, action) VALUES (?, 'reject')", (item_id,))
     conn.commit()
     conn.close()
@@ -1,19 +1,24 @@
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Literal, Optional
 import json
 import uuid
 import random
 import time
 from pathlib import Path
 import logging
+import asyncio
 
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
-from models import BenchmarkRunResponse, BenchmarkRunRequest, CompareRequest, CompareResponse, BlindTestResult
+from models import BenchmarkRunResponse, BenchmarkRunRequest, BenchmarkRepeatRequest, BenchmarkRepeatResponse, CompareRequest, CompareResponse, BlindTestResult, GenerationStats, ThroughputSummary
 from dependencies import get_pipeline
-from api import OllamaClient
-from benchmark import run_benchmark as execute_benchmark, CATEGORIES
+from api import AsyncOllamaClient
+from benchmark import run_benchmark as execute_benchmark, run_repeat_trials as execute_repeat_trials, CATEGORIES
+from metrics import get_throughput_metrics
+from judge_cache import get_judge_cache
+from export_stream import stream_export, MEDIA_TYPES
 
 router = APIRouter()
 logger = logging.getLogger("BackendAPI")
@@ -42,8 +47,10 @@ async def run_benchmark(request: BenchmarkRunRequest):
     
     # Run the actual benchmark
     try:
-        # Use pipeline.config which is already loaded
-        result = execute_benchmark(model_name, category_key, pipeline.config, language=request.language or "en")
+        # Use pipeline.config which is already loaded. The benchmark runner is
+        # blocking (model call + judge call), so keep it off the event loop.
+        result = await run_in_threadpool(execute_benchmark, model_name, category_key, pipeline.config, language=request.language or "en", stream=request.stream,
+                                          bypass_judge_cache=request.bypass_judge_cache)
         
         score = float(result['score'])
         breakdown = {k: float(v) for k, v in result['breakdown'].items()}
@@ -60,7 +67,8 @@ async def run_benchmark(request: BenchmarkRunRequest):
             score=score,
             breakdown_json=json.dumps(breakdown),
             reasoning=reasoning,
-            run_timestamp=run_timestamp
+            run_timestamp=run_timestamp,
+            stats=GenerationStats.from_ollama(result.get('stats'))
         )
         
         return BenchmarkRunResponse(
@@ -70,12 +78,72 @@ async def run_benchmark(request: BenchmarkRunRequest):
             breakdown=breakdown,
             reasoning=reasoning,
             run_timestamp=run_timestamp,
+            latency=result.get('latency'),
+            stats=result.get('stats'),
             message="Benchmark completed successfully."
         )
     except Exception as e:
         logger.error(f"Benchmark run failed: {e}")
         raise HTTPException(status_code=500, detail=f"Benchmark execution failed: {e}")
 
+@router.post("/benchmark/repeat", response_model=BenchmarkRepeatResponse)
+async def run_repeat_benchmark(request: BenchmarkRepeatRequest):
+    """
+    Runs repeated trials of one category until the bootstrap confidence interval
+    of the mean score is narrow enough (or max_trials is reached). Every trial
+    is stored in benchmark_trials under a shared trial_set_id.
+    """
+    category_key = request.category.lower()
+    if category_key == "language":
+        category_key = "general"
+    if category_key not in CATEGORIES:
+        raise HTTPException(status_code=400, detail=f"Invalid category. Available: {', '.join(CATEGORIES.keys())}")
+    if request.max_trials < 1 or request.min_trials < 1:
+        raise HTTPException(status_code=400, detail="max_trials and min_trials must be at least 1")
+    if request.min_trials > request.max_trials:
+        raise HTTPException(status_code=400, detail="min_trials cannot be greater than max_trials")
+
+    pipeline = get_pipeline()
+    model_name = "gemma3:4b" if request.model == "Llama 3.2" else request.model
+    trial_set_id = str(uuid.uuid4())
+
+    def record_trial(index: int, result: dict):
+        pipeline._record_benchmark_trial(
+            trial_set_id=trial_set_id,
+            trial_index=index,
+            category=category_key,
+            model=request.model,
+            prompt_name=result.get('prompt_name'),
+            score=float(result['score']),
+            breakdown_json=json.dumps(result.get('breakdown', {})),
+            run_timestamp=result['timestamp'],
+            stats=GenerationStats.from_ollama(result.get('stats'))
+        )
+
+    try:
+        summary = await run_in_threadpool(
+            execute_repeat_trials, model_name, category_key, pipeline.config,
+            language=request.language or "en", max_trials=request.max_trials, min_trials=request.min_trials,
+            target_ci_width=request.target_ci_width, confidence=request.confidence, on_trial=record_trial
+        )
+    except Exception as e:
+        logger.error(f"Repeat benchmark failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Repeat benchmark failed: {e}")
+
+    return BenchmarkRepeatResponse(
+        trial_set_id=trial_set_id,
+        category=request.category,
+        model=request.model,
+        trials=summary['trials'],
+        stopped_early=summary['stopped_early'],
+        mean=summary['mean'],
+        variance=summary['variance'],
+        ci_low=summary['ci_low'],
+        ci_high=summary['ci_high'],
+        confidence=summary['confidence'],
+        scores=summary['scores']
+    )
+
 @router.get("/benchmark/results/{category}", response_model=BenchmarkRunResponse)
 async def get_benchmark_results(category: str):
     """
@@ -176,6 +244,66 @@ async def get_benchmark_history(category: str):
         if conn:
             conn.close()
 
+BENCHMARK_EXPORT_COLUMNS = ["id", "category", "model", "score", "breakdown_json", "reasoning", "run_timestamp",
+                            "eval_count", "eval_duration", "prompt_eval_count", "prompt_eval_duration",
+                            "load_duration", "total_duration"]
+
+@router.get("/benchmark/history/{category}/export")
+async def export_benchmark_history(category: str, format: Literal["ndjson", "csv"] = "ndjson"):
+    """
+    Streams the full benchmark history of a category as NDJSON or CSV,
+    oldest first, reading and encoding one chunk of rows at a time.
+    """
+    pipeline = get_pipeline()
+    search_category = category.lower()
+    if search_category == "language":
+        search_category = "general"
+    sql = f"""
+        SELECT {', '.join(BENCHMARK_EXPORT_COLUMNS)}
+        FROM benchmark_results
+        WHERE category = ?
+        ORDER BY run_timestamp ASC
+    """
+    return StreamingResponse(
+        stream_export(pipeline.db_path, sql, (search_category,), BENCHMARK_EXPORT_COLUMNS, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="benchmark_{search_category}.{format}"'},
+    )
+
+@router.get("/benchmark/throughput", response_model=List[ThroughputSummary])
+async def get_benchmark_throughput(
+    source: str = Query("benchmark", description="Aggregate over 'benchmark' results or 'pipeline' items"),
+    model: Optional[str] = Query(None, description="Model name to filter by")
+):
+    """
+    Aggregates Ollama timing fields per model: generation tokens/sec,
+    prompt-processing rate and model-load overhead.
+    """
+    if source not in ("benchmark", "pipeline"):
+        raise HTTPException(status_code=400, detail="Invalid source. Available: benchmark, pipeline")
+
+    pipeline = get_pipeline()
+    conn = None
+    try:
+        conn = pipeline._get_db_connection()
+        return [ThroughputSummary(**summary) for summary in get_throughput_metrics(conn, source, model)]
+    except Exception as e:
+        logger.error(f"Failed to aggregate throughput metrics: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to aggregate throughput metrics: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+@router.get("/benchmark/judge_cache")
+async def get_judge_cache_stats():
+    """
+    Returns judge-cache size and hit-rate statistics for this process.
+    """
+    cache = get_judge_cache(get_pipeline().config)
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
 @router.get("/benchmark/report", response_class=PlainTextResponse)
 async def generate_benchmark_report(
     category: Optional[str] = Query(None, description="Benchmark category to filter by"),
@@ -262,14 +390,14 @@ async def compare_models(request: CompareRequest):
     """
     pipeline = get_pipeline()
     
-    if not pipeline.api.check_health():
+    if not await AsyncOllamaClient.from_client(pipeline.api).check_health():
         raise HTTPException(
             status_code=503,
             detail="Ollama service is not running or not accessible for comparison.",
         )
 
-    model1_client = OllamaClient(base_url=pipeline.api.base_url, model=request.model1)
-    model2_client = OllamaClient(base_url=pipeline.api.base_url, model=request.model2)
+    model1_client = AsyncOllamaClient.from_client(pipeline.api, model=request.model1)
+    model2_client = AsyncOllamaClient.from_client(pipeline.api, model=request.model2)
 
     model1_response = {}
     model2_response = {}
@@ -280,14 +408,22 @@ async def compare_models(request: CompareRequest):
                 raise HTTPException(status_code=400, detail=f"Image path not found: {request.image_path}")
             
             logger.info(f"Comparing models {request.model1} and {request.model2} with image {request.image_path}")
-            model1_response = model1_client.generate_description(request.image_path, request.prompt or "Describe this image.", language=request.language) or {"error": f"Model {request.model1} failed."}
-            model2_response = model2_client.generate_description(request.image_path, request.prompt or "Describe this image.", language=request.language) or {"error": f"Model {request.model2} failed."}
+            # Both generations run concurrently on the event loop
+            model1_response, model2_response = await asyncio.gather(
+                model1_client.generate_description(request.image_path, request.prompt or "Describe this image.", language=request.language),
+                model2_client.generate_description(request.image_path, request.prompt or "Describe this image.", language=request.language),
+            )
         elif request.prompt:
             logger.info(f"Comparing models {request.model1} and {request.model2} with prompt '{request.prompt}'")
-            model1_response = model1_client.generate_description(prompt=request.prompt, language=request.language) or {"error": f"Model {request.model1} failed."}
-            model2_response = model2_client.generate_description(prompt=request.prompt, language=request.language) or {"error": f"Model {request.model2} failed."}
+            model1_response, model2_response = await asyncio.gather(
+                model1_client.generate_description(prompt=request.prompt, language=request.language),
+                model2_client.generate_description(prompt=request.prompt, language=request.language),
+            )
         else:
             raise HTTPException(status_code=400, detail="Either image_path or prompt must be provided for comparison.")
+
+        model1_response = model1_response or {"error": f"Model {request.model1} failed."}
+        model2_response = model2_response or {"error": f"Model {request.model2} failed."}
         
         return CompareResponse(
             model1_response=model1_response,
@@ -298,6 +434,70 @@ async def compare_models(request: CompareRequest):
         logger.error(f"Error during model comparison: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to compare models: {e}")
 
+@router.post("/benchmark/compare/stream")
+async def compare_models_stream(request: CompareRequest):
+    """
+    Streaming variant of /benchmark/compare. Both models generate concurrently and
+    their tokens are interleaved as NDJSON events (`token`, `done`, `error`), followed
+    by a `summary` event ranking the models by time-to-first-token.
+    """
+    pipeline = get_pipeline()
+
+    if not request.image_path and not request.prompt:
+        raise HTTPException(status_code=400, detail="Either image_path or prompt must be provided for comparison.")
+    if request.image_path and not Path(request.image_path).exists():
+        raise HTTPException(status_code=400, detail=f"Image path not found: {request.image_path}")
+    if not await AsyncOllamaClient.from_client(pipeline.api).check_health():
+        raise HTTPException(
+            status_code=503,
+            detail="Ollama service is not running or not accessible for comparison.",
+        )
+
+    prompt = request.prompt or ("Describe this image." if request.image_path else "")
+    models = {"model1": request.model1, "model2": request.model2}
+    logger.info(f"Streaming comparison of models {request.model1} and {request.model2}")
+
+    async def produce(model_key: str, model_name: str, queue: asyncio.Queue):
+        client = AsyncOllamaClient.from_client(pipeline.api, model=model_name)
+        try:
+            async for event in client.stream_generate(request.image_path, prompt, language=request.language or "en"):
+                await queue.put({"model_key": model_key, "model": model_name, **event})
+        except Exception as e:
+            logger.error(f"Streaming comparison failed for {model_name}: {e}")
+            await queue.put({"model_key": model_key, "model": model_name, "type": "error", "error": str(e)})
+        finally:
+            await queue.put(None) # Sentinel: this producer is finished
+
+    async def event_stream():
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks = [asyncio.create_task(produce(key, name, queue)) for key, name in models.items()]
+        latencies = {}
+        remaining = len(tasks)
+        try:
+            while remaining:
+                event = await queue.get()
+                if event is None:
+                    remaining -= 1
+                    continue
+                if event["type"] == "done":
+                    latencies[event["model_key"]] = event["latency"]
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+
+            ranking = sorted(
+                (
+                    {"model_key": key, "model": models[key], **latency}
+                    for key, latency in latencies.items()
+                ),
+                key=lambda entry: entry["ttft_ms"] if entry.get("ttft_ms") is not None else float("inf"),
+            )
+            yield json.dumps({"type": "summary", "ranking": ranking}, ensure_ascii=False) + "\n"
+        finally:
+            # Client disconnected or stream finished: stop any generation still in flight
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
 @router.get("/blind_test/prompt")
 async def get_blind_test_prompt(
     model_exclude: Optional[List[str]] = Query(None)
@@ -308,8 +508,8 @@ async def get_blind_test_prompt(
     pipeline = get_pipeline()
     ollama_models_raw = []
     try:
-        ollama_client_temp = OllamaClient()
-        ollama_models_raw = ollama_client_temp.get_ollama_models()
+        ollama_client_temp = AsyncOllamaClient.from_client(pipeline.api)
+        ollama_models_raw = await ollama_client_temp.get_ollama_models()
         available_models = [m['name'] for m in ollama_models_raw if m['name'] not in (model_exclude or [])]
         
         if len(available_models) < 2:
@@ -321,8 +521,12 @@ async def get_blind_test_prompt(
         test_image_path = "backend/input/sample.jpg"
         test_prompt = "Describe this image."
         
-        model_a_response = OllamaClient(base_url=pipeline.api.base_url, model=model_a).generate_description(test_image_path, test_prompt) or {"description": "Model A failed.", "confidence": 0.0}
-        model_b_response = OllamaClient(base_url=pipeline.api.base_url, model=model_b).generate_description(test_image_path, test_prompt) or {"description": "Model B failed.", "confidence": 0.0}
+        model_a_response, model_b_response = await asyncio.gather(
+            AsyncOllamaClient.from_client(pipeline.api, model=model_a).generate_description(test_image_path, test_prompt),
+            AsyncOllamaClient.from_client(pipeline.api, model=model_b).generate_description(test_image_path, test_prompt),
+        )
+        model_a_response = model_a_response or {"description": "Model A failed.", "confidence": 0.0}
+        model_b_response = model_b_response or {"description": "Model B failed.", "confidence": 0.0}
 
         return {
             "prompt_content": test_image_path,
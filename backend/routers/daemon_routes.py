@@ -34,4 +34,4 @@ async def stop_daemon():
 async def get_daemon_status():
     daemon = get_daemon()
     status = "running" if daemon.is_running() else "stopped"
-    return {"status": status}
+    return {"status": status, "queue": daemon.queue_metrics()}
@@ -3,6 +3,9 @@ import psutil
 import logging
 from typing import Dict
 
+import http_pool
+import db_pool
+
 router = APIRouter()
 logger = logging.getLogger("BackendAPI")
 
@@ -21,4 +24,28 @@ async def get_system_resources():
         }
     except Exception as e:
         logger.error(f"Failed to retrieve system resources: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve system resources: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve system resources: {e}")
+
+
+@router.get("/monitoring/http_pool")
+async def get_http_pool_stats():
+    """
+    Returns keep-alive session and connection reuse counters per Ollama host.
+    """
+    try:
+        return http_pool.get_pool_stats()
+    except Exception as e:
+        logger.error(f"Failed to retrieve HTTP pool stats: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve HTTP pool stats: {e}")
+
+
+@router.get("/monitoring/db_pool")
+async def get_db_pool_stats():
+    """
+    Returns open SQLite connections and connection-acquire latency per database file.
+    """
+    try:
+        return db_pool.get_pool_stats()
+    except Exception as e:
+        logger.error(f"Failed to retrieve DB pool stats: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve DB pool stats: {e}")
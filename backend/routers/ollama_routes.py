@@ -3,21 +3,31 @@ import logging
 
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 from models import OllamaModel, OllamaPullRequest, OllamaDeleteRequest
 from dependencies import get_pipeline
-from api import OllamaClient # The client for Ollama itself
+from api import AsyncOllamaClient # Non-blocking client for Ollama itself
+from response_cache import get_response_cache
+from embedding_cache import get_embedding_cache
 
 router = APIRouter()
 logger = logging.getLogger("BackendAPI")
 
+async def _invalidate_cached_responses(pipeline, model_name: str):
+    """Drops cached generations and embeddings so the new weights are benchmarked afresh."""
+    for cache in (get_response_cache(pipeline.config), get_embedding_cache(pipeline.config)):
+        if cache:
+            # Removing a model's cache directory is disk-bound; keep it off the event loop
+            await run_in_threadpool(cache.invalidate_model, model_name)
+
 @router.get("/ollama/health")
 async def get_ollama_health():
     """
     Checks if the Ollama server is running and accessible.
     """
     pipeline = get_pipeline()
-    is_healthy = pipeline.api.check_health()
+    is_healthy = await AsyncOllamaClient.from_client(pipeline.api).check_health()
     if is_healthy:
         return {"status": "healthy", "message": "Ollama server is running."}
     else:
@@ -33,8 +43,8 @@ async def list_ollama_models():
     """
     pipeline = get_pipeline()
     try:
-        ollama_client = OllamaClient(base_url=pipeline.api.base_url)
-        models_raw = ollama_client.get_ollama_models()
+        ollama_client = AsyncOllamaClient.from_client(pipeline.api)
+        models_raw = await ollama_client.get_ollama_models()
         # Convert raw models to OllamaModel Pydantic format
         models = []
         for m in models_raw:
@@ -53,16 +63,20 @@ async def list_ollama_models():
 @router.post("/ollama/pull")
 async def pull_ollama_model(request: OllamaPullRequest):
     """
-    Pulls a new Ollama model.
+    Pulls a new Ollama model. Returns once the pull has finished, so cached
+    results are only dropped when the new weights are in place.
     """
     pipeline = get_pipeline()
     try:
-        ollama_client = OllamaClient(base_url=pipeline.api.base_url)
-        success = ollama_client.pull_model(request.model_name)
+        ollama_client = AsyncOllamaClient.from_client(pipeline.api)
+        success = await ollama_client.pull_model(request.model_name)
         if success:
-            return {"message": f"Model '{request.model_name}' pull initiated successfully."}
+            await _invalidate_cached_responses(pipeline, request.model_name)
+            return {"message": f"Model '{request.model_name}' pulled successfully."}
         else:
             raise HTTPException(status_code=500, detail=f"Failed to initiate pull for model '{request.model_name}'. Check Ollama server logs.")
+    except HTTPException:
+        raise # Re-raise HTTPExceptions
     except Exception as e:
         logger.error(f"Failed to pull Ollama model '{request.model_name}': {e}")
         raise HTTPException(status_code=500, detail=f"Failed to pull Ollama model: {e}")
@@ -74,12 +88,15 @@ async def delete_ollama_model(request: OllamaDeleteRequest):
     """
     pipeline = get_pipeline()
     try:
-        ollama_client = OllamaClient(base_url=pipeline.api.base_url)
-        success = ollama_client.delete_model(request.model_name)
+        ollama_client = AsyncOllamaClient.from_client(pipeline.api)
+        success = await ollama_client.delete_model(request.model_name)
         if success:
+            await _invalidate_cached_responses(pipeline, request.model_name)
             return {"message": f"Model '{request.model_name}' deleted successfully."}
         else:
             raise HTTPException(status_code=500, detail=f"Failed to delete model '{request.model_name}'. Check Ollama server logs.")
+    except HTTPException:
+        raise # Re-raise HTTPExceptions
     except Exception as e:
         logger.error(f"Failed to delete Ollama model '{request.model_name}': {e}")
         raise HTTPException(status_code=500, detail=f"Failed to delete Ollama model: {e}")
\ No newline at end of file
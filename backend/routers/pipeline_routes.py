@@ -1,10 +1,15 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+import json
+import base64
 import logging
-from typing import List
+from datetime import datetime
+from typing import List, Literal, Optional, Tuple
 from models import PipelineTriggerResponse, PipelineItem, PipelineItemUpdateRequest
 
 from dependencies import get_pipeline
+from export_stream import stream_export, MEDIA_TYPES
+from api import AsyncOllamaClient
 
 router = APIRouter()
 logger = logging.getLogger("BackendAPI")
@@ -18,7 +23,7 @@ async def run_pipeline(background_tasks: BackgroundTasks):
     logger.info("API: Pipeline run requested.")
     pipeline = get_pipeline()
     
-    if not pipeline.api.check_health():
+    if not await AsyncOllamaClient.from_client(pipeline.api).check_health():
         raise HTTPException(
             status_code=503,
             detail="Ollama service is not running or model not available. Please check Ollama server.",
@@ -61,6 +66,9 @@ async def get_pipeline_status():
         cursor.execute("SELECT AVG(processing_time_ms) FROM pipeline_items WHERE processing_time_ms IS NOT NULL")
         avg_processing_time = cursor.fetchone()[0] or 0.0
 
+        cursor.execute("SELECT COUNT(*) FROM pipeline_items WHERE duplicate_of IS NOT NULL")
+        duplicate_items = cursor.fetchone()[0]
+
         uptime = "N/A"
 
         return {
@@ -71,6 +79,9 @@ async def get_pipeline_status():
             "rejected_items": rejected_items,
             "avg_processing_time": avg_processing_time,
             "uptime": uptime,
+            "duplicate_items": duplicate_items,
+            "avoided_model_calls": pipeline.avoided_model_calls,
+            "write_queue": pipeline.writes.stats(),
         }
     except Exception as e:
         logger.error(f"Failed to get pipeline status from DB: {e}")
@@ -79,43 +90,88 @@ async def get_pipeline_status():
         if conn:
             conn.close()
 
-@router.get("/pipeline/items", response_model=List[PipelineItem])
-async def get_pipeline_items():
+# Columns every list row carries (required by PipelineItem, plus the cursor key)
+ITEM_KEY_COLUMNS = ["id", "filename", "filepath", "status", "created_at", "updated_at"]
+ITEM_OPTIONAL_COLUMNS = ["source", "processing_time_ms", "confidence_score", "description", "metadata_json",
+                         "detection_raw_json", "error_message", "content_hash", "duplicate_of"]
+MAX_PAGE_SIZE = 1000
+
+def _encode_cursor(created_at: str, item_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, item_id]).encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), str(item_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+def _select_columns(fields: Optional[str]) -> List[str]:
+    """Key columns plus the requested optional ones (all of them when `fields` is not given)."""
+    if fields is None:
+        return ITEM_KEY_COLUMNS + ITEM_OPTIONAL_COLUMNS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = set(requested) - set(ITEM_KEY_COLUMNS + ITEM_OPTIONAL_COLUMNS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return ITEM_KEY_COLUMNS + [c for c in ITEM_OPTIONAL_COLUMNS if c in requested]
+
+def _items_query(columns: List[str], status: Optional[str], source: Optional[str],
+                 created_after: Optional[datetime], created_before: Optional[datetime],
+                 cursor: Optional[str]) -> Tuple[str, list]:
+    """
+    Newest-first SELECT over pipeline_items. Paging continues strictly after the
+    cursor's (created_at, id), which the composite indexes serve as a range
+    scan, so a deep page costs the same as the first one.
     """
-    Retrieves all pipeline items from the database.
+    where, params = [], []
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if source:
+        where.append("source = ?")
+        params.append(source)
+    if created_after:
+        where.append("created_at >= ?")
+        params.append(created_after.isoformat(sep=" "))
+    if created_before:
+        where.append("created_at < ?")
+        params.append(created_before.isoformat(sep=" "))
+    if cursor:
+        where.append("(created_at, id) < (?, ?)")
+        params.extend(_decode_cursor(cursor))
+    sql = f"SELECT {', '.join(columns)} FROM pipeline_items"
+    if where:
+        sql += f" WHERE {' AND '.join(where)}"
+    return sql + " ORDER BY created_at DESC, id DESC", params
+
+@router.get("/pipeline/items", response_model=List[PipelineItem], response_model_exclude_unset=True)
+async def get_pipeline_items(
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    status: Optional[str] = None,
+    source: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated optional columns to include, e.g. source,confidence_score"),
+):
+    """
+    Retrieves one page of pipeline items, newest first. When more items follow,
+    the X-Next-Cursor response header holds the cursor for the next page.
     """
     pipeline = get_pipeline()
+    columns = _select_columns(fields)
+    sql, params = _items_query(columns, status, source, created_after, created_before, cursor)
     conn = None
     try:
         conn = pipeline._get_db_connection()
-        cursor = conn.cursor()
+        rows = conn.execute(sql + " LIMIT ?", (*params, limit + 1)).fetchall()
 
-        cursor.execute("""
-            SELECT id, filename, filepath, status, source, created_at, updated_at,
-                   processing_time_ms, confidence_score, description,
-                   metadata_json, detection_raw_json, error_message
-            FROM pipeline_items
-            ORDER BY created_at DESC
-        """)
-        rows = cursor.fetchall()
-        
-        items = []
-        for row in rows:
-            items.append(PipelineItem(
-                id=row[0],
-                filename=row[1],
-                filepath=row[2],
-                status=row[3],
-                source=row[4],
-                created_at=row[5],
-                updated_at=row[6],
-                processing_time_ms=row[7],
-                confidence_score=row[8],
-                description=row[9],
-                metadata_json=row[10],
-                detection_raw_json=row[11],
-                error_message=row[12],
-            ))
+        items = [PipelineItem(**dict(zip(columns, row))) for row in rows[:limit]]
+        if len(rows) > limit:
+            last = items[-1]
+            response.headers["X-Next-Cursor"] = _encode_cursor(last.created_at, last.id)
         return items
     except Exception as e:
         logger.error(f"Failed to retrieve pipeline items from DB: {e}")
@@ -123,6 +179,31 @@ async def get_pipeline_items():
     finally:
         if conn:
             conn.close()
+
+# Declared before /pipeline/items/{item_id}, which would otherwise capture "export" as an id
+@router.get("/pipeline/items/export")
+async def export_pipeline_items(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    status: Optional[str] = None,
+    source: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated optional columns to include"),
+):
+    """
+    Streams every matching pipeline item as NDJSON or CSV, newest first.
+    Rows are read and encoded a chunk at a time, so memory use does not
+    grow with the table.
+    """
+    pipeline = get_pipeline()
+    columns = _select_columns(fields)
+    sql, params = _items_query(columns, status, source, created_after, created_before, None)
+    return StreamingResponse(
+        stream_export(pipeline.db_path, sql, params, columns, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="pipeline_items.{format}"'},
+    )
+
 @router.get("/pipeline/items/{item_id}", response_model=PipelineItem)
 async def get_pipeline_item(item_id: str):
     """
@@ -137,7 +218,7 @@ async def get_pipeline_item(item_id: str):
         cursor.execute("""
             SELECT id, filename, filepath, status, source, created_at, updated_at,
                    processing_time_ms, confidence_score, description,
-                   metadata_json, detection_raw_json, error_message
+                   metadata_json, detection_raw_json, error_message, content_hash, duplicate_of
             FROM pipeline_items
             WHERE id = ?
         """, (item_id,))
@@ -160,6 +241,8 @@ async def get_pipeline_item(item_id: str):
             metadata_json=row[10],
             detection_raw_json=row[11],
             error_message=row[12],
+            content_hash=row[13],
+            duplicate_of=row[14],
         )
         return item
     except HTTPException:
@@ -0,0 +1,121 @@
+import json
+import time
+import logging
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("OllamaStreaming")
+
+
+class StreamTimer:
+    """Records latency marks while a token stream is consumed."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._token_times: List[float] = []
+
+    def mark_token(self):
+        now = time.perf_counter()
+        if self.first_token_at is None:
+            self.first_token_at = now
+        self._token_times.append(now)
+
+    def finish(self):
+        if self.finished_at is None:
+            self.finished_at = time.perf_counter()
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Returns latency figures in milliseconds (None when no token arrived)."""
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        gaps = [(b - a) * 1000 for a, b in zip(self._token_times, self._token_times[1:])]
+        gaps_sorted = sorted(gaps)
+
+        def percentile(p: float) -> Optional[float]:
+            if not gaps_sorted:
+                return None
+            index = min(int(round(p * (len(gaps_sorted) - 1))), len(gaps_sorted) - 1)
+            return round(gaps_sorted[index], 3)
+
+        return {
+            "ttft_ms": round((self.first_token_at - self.started_at) * 1000, 3) if self.first_token_at is not None else None,
+            "total_ms": round((end - self.started_at) * 1000, 3),
+            "token_count": len(self._token_times),
+            "inter_token_ms_mean": round(sum(gaps) / len(gaps), 3) if gaps else None,
+            "inter_token_ms_p50": percentile(0.5),
+            "inter_token_ms_p95": percentile(0.95),
+        }
+
+
+def _parse_chunk(line) -> Optional[Dict]:
+    if isinstance(line, bytes):
+        line = line.decode("utf-8")
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        logger.warning(f"Skipping malformed stream chunk: {line[:100]}")
+        return None
+
+
+def _handle_chunk(chunk: Dict, timer: StreamTimer, parts: List[str]) -> List[Dict]:
+    """Turns one Ollama NDJSON chunk into zero or more stream events."""
+    if chunk.get("error"):
+        raise RuntimeError(f"Ollama stream error: {chunk['error']}")
+
+    events = []
+    token = chunk.get("response", "")
+    if token:
+        timer.mark_token()
+        parts.append(token)
+        events.append({"type": "token", "text": token})
+    if chunk.get("done"):
+        timer.finish()
+        final = {k: v for k, v in chunk.items() if k not in ("response", "context")}
+        events.append({
+            "type": "done",
+            "response": "".join(parts),
+            "latency": timer.summary(),
+            "raw_response": final,
+        })
+    return events
+
+
+def consume_ndjson_stream(lines: Iterator, timer: Optional[StreamTimer] = None) -> Iterator[Dict]:
+    """
+    Consumes Ollama's `/api/generate` NDJSON stream, yielding `token` events as
+    they arrive and a final `done` event with the full text and latency summary.
+    """
+    timer = timer or StreamTimer()
+    parts: List[str] = []
+    for line in lines:
+        chunk = _parse_chunk(line)
+        if chunk is None:
+            continue
+        for event in _handle_chunk(chunk, timer, parts):
+            yield event
+            if event["type"] == "done":
+                return
+
+    # The connection closed without a `done` chunk; report what we have
+    timer.finish()
+    yield {"type": "done", "response": "".join(parts), "latency": timer.summary(), "raw_response": {}, "incomplete": True}
+
+
+async def aconsume_ndjson_stream(lines: AsyncIterator, timer: Optional[StreamTimer] = None) -> AsyncIterator[Dict]:
+    """Async variant of consume_ndjson_stream for httpx streaming responses."""
+    timer = timer or StreamTimer()
+    parts: List[str] = []
+    async for line in lines:
+        chunk = _parse_chunk(line)
+        if chunk is None:
+            continue
+        for event in _handle_chunk(chunk, timer, parts):
+            yield event
+            if event["type"] == "done":
+                return
+
+    timer.finish()
+    yield {"type": "done", "response": "".join(parts), "latency": timer.summary(), "raw_response": {}, "incomplete": True}
@@ -26,7 +26,7 @@ def verify_output():
     checks = {
         'description.zh-TW.md': output_dir / "description.zh-TW.md",
         'metadata.json': output_dir / "metadata.json",
-        'thumbnail.jpg': output_dir / "thumbnail.jpg"
+        'thumbnail.webp': output_dir / "thumbnail.webp"
     }
     
     print("\n🔍 驗證輸出：")
@@ -0,0 +1,72 @@
+import pytest
+import asyncio
+import httpx
+from unittest.mock import patch, AsyncMock
+
+# Adjust path to import api
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from api import AsyncOllamaClient, OllamaClient
+
+def _mock_http(handler):
+    """Patches the pooled async client with one backed by an in-memory transport."""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return patch('api.get_async_client', return_value=client)
+
+def test_generate_description_success():
+    def handler(request):
+        assert request.url.path == "/api/generate"
+        return httpx.Response(200, json={"response": " A cat on a sofa. "})
+
+    async def run():
+        client = AsyncOllamaClient(base_url="http://mock-ollama:11434", model="mock_model", retries=0)
+        return await client.generate_description(prompt="Describe")
+
+    with _mock_http(handler):
+        result = asyncio.run(run())
+    assert result['description'] == "A cat on a sofa."
+    assert result['source'] == "Ollama"
+
+def test_generate_description_retries_then_falls_back_to_gemini():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500, text="boom")
+
+    async def run():
+        client = AsyncOllamaClient(base_url="http://mock-ollama:11434", retries=1, retry_delay=0,
+                                   use_gemini_fallback=True, gemini_api_key="mock_key")
+        return await client.generate_description(prompt="Describe")
+
+    with _mock_http(handler), patch('api.random.uniform', return_value=0), patch('api.asyncio.sleep', new_callable=AsyncMock):
+        result = asyncio.run(run())
+    assert len(calls) == 2
+    assert result['source'] == "Gemini"
+
+def test_check_health_and_models():
+    def handler(request):
+        if request.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": [{"name": "model1"}]})
+        return httpx.Response(200, text="Ollama is running")
+
+    async def run():
+        client = AsyncOllamaClient(base_url="http://mock-ollama:11434")
+        return await client.check_health(), await client.get_ollama_models()
+
+    with _mock_http(handler):
+        healthy, models = asyncio.run(run())
+    assert healthy is True
+    assert models == [{"name": "model1"}]
+
+def test_from_client_copies_settings():
+    sync_client = OllamaClient(base_url="http://mock-ollama:11434", model="base_model", timeout=7,
+                               retries=2, retry_delay=0.5, use_gemini_fallback=True, gemini_api_key="k")
+    async_client = AsyncOllamaClient.from_client(sync_client, model="other_model")
+    assert async_client.base_url == "http://mock-ollama:11434"
+    assert async_client.model == "other_model"
+    assert async_client.timeout == 7
+    assert async_client.retries == 2
+    assert async_client.use_gemini_fallback is True
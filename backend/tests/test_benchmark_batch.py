@@ -0,0 +1,145 @@
+import pytest
+import json
+from unittest.mock import MagicMock, patch
+
+# Adjust path to import benchmark_batch.py
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmark_batch import run_grouped_schedule, build_load_report
+from batch_manifest import BatchManifest, IncrementalResultWriter, ITEM_GENERATED, ITEM_JUDGED, RUN_COMPLETED, RUN_INCOMPLETE
+
+MOCK_CONFIG = {
+    'ollama': {'enabled': True, 'url': 'http://mock-ollama:11434', 'timeout_seconds': 5},
+    'ollama_judge': {'enabled': True, 'model': 'judge-model'},
+    'benchmark': {'parallelism': 2},
+}
+CATEGORIES = ['reasoning', 'coding']
+
+def _stats(load_ms):
+    return {'load_duration': int(load_ms * 1e6)}
+
+@pytest.fixture
+def manifest(tmp_path):
+    return BatchManifest(tmp_path / "pipeline.db")
+
+def _judge(candidate, config, language="en", bypass_judge_cache=False):
+    return {**candidate, 'score': 4, 'judge_stats': {}}
+
+def test_grouped_schedule_generates_per_model_then_judges(manifest):
+    run_id = manifest.create_run(['a', 'b'], CATEGORIES, "en", "grouped")
+    calls = []
+
+    def generate(model, category, config, language="en", stream=False):
+        calls.append(('generate', model))
+        assert config['ollama']['keep_alive'] == "10m"
+        first = not any(c[1] == model for c in calls[:-1])
+        return {'model': model, 'category': category, 'output': 'o', 'stats': _stats(1000 if first else 0)}
+
+    def judge(candidate, config, language="en", bypass_judge_cache=False):
+        calls.append(('judge', candidate['model']))
+        return {**candidate, 'score': 4, 'judge_stats': _stats(500 if len([c for c in calls if c[0] == 'judge']) == 1 else 0)}
+
+    with patch('benchmark_batch.generate_candidate', side_effect=generate), \
+         patch('benchmark_batch.judge_candidate', side_effect=judge), \
+         patch('benchmark_batch.unload_model') as mock_unload:
+        load_report = run_grouped_schedule(manifest, run_id, MOCK_CONFIG, keep_alive="10m")
+
+    kinds = [kind for kind, _ in calls]
+    assert kinds == ['generate'] * 4 + ['judge'] * 4
+    assert [c[1] for c in calls[:2]] == ['a', 'a']
+    assert [args[0][0] for args in mock_unload.call_args_list] == ['a', 'b', 'judge-model']
+    assert [r['category'] for r in manifest.results(run_id)['a']] == CATEGORIES
+
+    assert load_report['model_loads'] == 3
+    assert load_report['naive_model_loads'] == 8
+    assert load_report['load_time_ms'] == pytest.approx(2500.0)
+    # Interleaved: 2 categories x (1000 ms candidate + 500 ms judge) per model
+    assert load_report['estimated_naive_load_time_ms'] == pytest.approx(6000.0)
+    assert load_report['saved_ms'] == pytest.approx(3500.0)
+
+def test_load_report_without_ollama_judge():
+    candidates = {'a': [{'stats': _stats(800)}, {'stats': {}}]}
+    results = {'a': [{'score': 3}, {'score': 2}]}
+    report = build_load_report(candidates, results, 'simple')
+    assert report['model_loads'] == 1
+    assert report['naive_model_loads'] == 1
+    assert report['saved_ms'] == 0.0
+
+def test_resume_only_reruns_incomplete_items(manifest, tmp_path):
+    run_id = manifest.create_run(['a', 'b'], CATEGORIES, "en", "grouped")
+    writer = IncrementalResultWriter(tmp_path / "partial.jsonl")
+
+    def flaky_generate(model, category, config, language="en", stream=False):
+        if model == 'b' and category == 'coding':
+            raise ConnectionError("Ollama went away")
+        return {'model': model, 'category': category, 'output': 'o', 'stats': {}}
+
+    with patch('benchmark_batch.generate_candidate', side_effect=flaky_generate), \
+         patch('benchmark_batch.judge_candidate', side_effect=_judge), \
+         patch('benchmark_batch.unload_model'):
+        run_grouped_schedule(manifest, run_id, MOCK_CONFIG, writer=writer)
+    assert manifest.finish_run(run_id) == RUN_INCOMPLETE
+    assert manifest.progress(run_id) == {'pending': 1, 'generated': 0, 'judged': 3}
+    assert manifest.items(run_id, model='b')[1]['error'] == "Ollama went away"
+
+    with patch('benchmark_batch.generate_candidate', side_effect=lambda m, c, *a, **k: {'model': m, 'category': c, 'output': 'o', 'stats': {}}) as mock_generate, \
+         patch('benchmark_batch.judge_candidate', side_effect=_judge) as mock_judge, \
+         patch('benchmark_batch.unload_model'):
+        run_grouped_schedule(manifest, run_id, MOCK_CONFIG, writer=writer)
+    assert mock_generate.call_count == 1
+    assert mock_judge.call_count == 1
+    assert manifest.finish_run(run_id) == RUN_COMPLETED
+    assert [r['category'] for r in manifest.results(run_id)['b']] == CATEGORIES
+
+    lines = [json.loads(line) for line in (tmp_path / "partial.jsonl").read_text(encoding='utf-8').splitlines()]
+    assert len(lines) == 4
+    assert all(line['run_id'] == run_id for line in lines)
+
+def test_generated_items_are_judged_after_restart(manifest):
+    run_id = manifest.create_run(['a'], CATEGORIES, "en", "grouped")
+    # Process died after generation but before judging
+    for category in CATEGORIES:
+        manifest.save_candidate(run_id, 'a', category, {'model': 'a', 'category': category, 'output': 'o', 'stats': {}})
+    assert len(manifest.items(run_id, status=ITEM_GENERATED)) == 2
+
+    with patch('benchmark_batch.generate_candidate') as mock_generate, \
+         patch('benchmark_batch.judge_candidate', side_effect=_judge), \
+         patch('benchmark_batch.unload_model'):
+        run_grouped_schedule(manifest, run_id, MOCK_CONFIG)
+    mock_generate.assert_not_called()
+    assert len(manifest.items(run_id, status=ITEM_JUDGED)) == 2
+
+def test_resume_retries_real_generation_and_judge_failures(manifest):
+    """generate_candidate and call_llm_judge report Ollama failures as return values, not exceptions"""
+    from benchmark import prompt_loader
+    run_id = manifest.create_run(['a', 'b'], CATEGORIES, "en", "grouped")
+    category_of = {prompt_loader.get_prompt(c, "en").text: c for c in CATEGORIES}
+    failing = {('b', 'coding'), ('judge-model', 'a')} # (model, category) or (judge, candidate model)
+
+    def post(url, json=None, timeout=None):
+        response = MagicMock(status_code=200, text="server error")
+        if json['model'] == 'judge-model':
+            key = ('judge-model', 'a' if "output-a" in json.get('prompt', '') else 'b')
+            response.json.return_value = {'response': '{"score": 4, "reasoning": "ok", "breakdown": {}}'}
+        else:
+            key = (json['model'], category_of.get(json.get('prompt')))
+            response.json.return_value = {'response': f"output-{json['model']}"}
+        if key in failing and json.get('keep_alive') != 0:
+            response.status_code = 500
+        return response
+
+    session = MagicMock()
+    session.post.side_effect = post
+    with patch('benchmark.get_session', return_value=session):
+        run_grouped_schedule(manifest, run_id, MOCK_CONFIG)
+        # b/coding stays pending, a's candidates stay generated: neither the error text nor a 0 score is kept
+        assert manifest.progress(run_id) == {'pending': 1, 'generated': 2, 'judged': 1}
+        assert manifest.items(run_id, model='b')[1]['error']
+        assert all(item['error'] for item in manifest.items(run_id, status=ITEM_GENERATED))
+
+        failing.clear()
+        run_grouped_schedule(manifest, run_id, MOCK_CONFIG)
+    assert manifest.finish_run(run_id) == RUN_COMPLETED
+    assert all(r['score'] == 4 for rs in manifest.results(run_id).values() for r in rs)
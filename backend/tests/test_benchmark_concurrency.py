@@ -0,0 +1,71 @@
+import pytest
+import threading
+import time
+from unittest.mock import patch
+
+# Adjust path to import benchmark.py
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import benchmark
+from benchmark import run_categories_concurrently
+
+MOCK_CONFIG = {'ollama': {'enabled': True, 'url': 'http://mock-ollama:11434', 'timeout_seconds': 5}}
+
+def _fake_generate(delays):
+    def generate(model_name, category, config, language="en", stream=False):
+        time.sleep(delays[category])
+        return {'model': model_name, 'category': category, 'prompt': 'p', 'output': f"out-{category}",
+                'latency': None, 'stats': {}}
+    return generate
+
+def test_results_keep_category_order():
+    categories = ['reasoning', 'coding', 'vision']
+    # Later categories finish first
+    delays = {'reasoning': 0.15, 'coding': 0.05, 'vision': 0.0}
+    with patch('benchmark.generate_candidate', side_effect=_fake_generate(delays)), \
+         patch('benchmark.call_llm_judge', return_value={'score': 4, 'reasoning': 'ok', 'breakdown': {}}):
+        results = run_categories_concurrently("mock_model", categories, MOCK_CONFIG, parallelism=3)
+    assert [r['category'] for r in results] == categories
+    assert [r['output'] for r in results] == ["out-reasoning", "out-coding", "out-vision"]
+    assert all(r['score'] == 4 for r in results)
+
+def test_judging_overlaps_generation():
+    categories = ['reasoning', 'coding']
+    delays = {'reasoning': 0.0, 'coding': 0.3}
+    judge_started = threading.Event()
+    coding_generation_running = threading.Event()
+    overlap = []
+
+    def generate(model_name, category, config, language="en", stream=False):
+        if category == 'coding':
+            coding_generation_running.set()
+        result = _fake_generate(delays)(model_name, category, config, language, stream)
+        if category == 'coding':
+            overlap.append(judge_started.is_set())
+        return result
+
+    def judge(model_output, category, config, language="en", bypass_cache=False):
+        judge_started.set()
+        return {'score': 3, 'reasoning': 'ok', 'breakdown': {}}
+
+    with patch('benchmark.generate_candidate', side_effect=generate), \
+         patch('benchmark.call_llm_judge', side_effect=judge):
+        run_categories_concurrently("mock_model", categories, MOCK_CONFIG, parallelism=2)
+    # The reasoning judgement ran while the coding generation was still in flight
+    assert overlap == [True]
+
+def test_run_full_benchmark_serial_flag(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config").mkdir()
+    (tmp_path / "output").mkdir()
+    (tmp_path / "config" / "jade_config.yaml").write_text("benchmark:\n  parallelism: 4\n  serial: false\n", encoding='utf-8')
+
+    fake_result = {'score': 3, 'latency': None}
+    with patch('benchmark.run_benchmark', return_value=fake_result) as mock_run, \
+         patch('benchmark.run_categories_concurrently') as mock_concurrent:
+        results = benchmark.run_full_benchmark("mock_model", serial=True)
+    assert mock_run.call_count == len(benchmark.CATEGORIES)
+    mock_concurrent.assert_not_called()
+    assert len(results) == len(benchmark.CATEGORIES)
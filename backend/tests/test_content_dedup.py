@@ -0,0 +1,104 @@
+import time
+import sqlite3
+import hashlib
+import threading
+import pytest
+import yaml
+from unittest.mock import MagicMock
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from content_hash import hash_file
+from init_db import migrate_database
+from pipeline import ImagePipeline
+
+def _make_pipeline(tmp_path, policy):
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    db_path = tmp_path / "pipeline.db"
+    with sqlite3.connect(db_path) as conn:
+        migrate_database(conn)
+    config = {
+        'database': {'path': str(db_path)},
+        'paths': {'input': str(tmp_path / "input"), 'output': str(tmp_path / "output"),
+                  'failed': str(tmp_path / "output" / "_failed")},
+        'ollama': {'url': 'http://mock-ollama:11434', 'model': 'mock-vision'},
+        'gemini': {},
+        'processing': {'duplicate_policy': policy},
+        'security': {'allowed_extensions': ['.jpg']},
+    }
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config))
+    pipeline = ImagePipeline(config_path=str(config_path))
+    pipeline.api = MagicMock()
+    pipeline.api.model = 'mock-vision'
+    pipeline.api.generate_description.return_value = {'description': 'A jade bracelet', 'confidence': 0.9}
+    return pipeline
+
+def _drop(pipeline, name, data=b"same image bytes"):
+    path = pipeline.input_dir / name
+    path.write_bytes(data)
+    return path
+
+def _rows(pipeline):
+    pipeline.writes.flush()
+    with sqlite3.connect(pipeline.db_path) as conn:
+        return conn.execute("SELECT filename, status, description, content_hash, duplicate_of FROM pipeline_items ORDER BY filename").fetchall()
+
+def test_hash_file_streams_in_chunks(tmp_path):
+    path = tmp_path / "big.bin"
+    data = bytes(range(256)) * 1000
+    path.write_bytes(data)
+    assert hash_file(path, chunk_size=1000) == hashlib.sha256(data).hexdigest()
+
+def test_link_policy_reuses_description(tmp_path):
+    pipeline = _make_pipeline(tmp_path, 'link')
+    assert pipeline.process_image(_drop(pipeline, "a.jpg"))
+    assert pipeline.process_image(_drop(pipeline, "b.jpg"))
+
+    assert pipeline.api.generate_description.call_count == 1
+    assert pipeline.avoided_model_calls == 1
+    (a_name, _, a_desc, a_hash, a_dup), (b_name, b_status, b_desc, b_hash, b_dup) = _rows(pipeline)
+    assert a_hash == b_hash == hashlib.sha256(b"same image bytes").hexdigest()
+    assert a_dup is None and b_dup is not None
+    assert b_status == 'pending' and b_desc == a_desc
+    assert "A jade bracelet" in (pipeline.output_dir / "b" / "description.zh-TW.md").read_text(encoding="utf-8")
+
+def test_skip_policy_moves_duplicate_aside(tmp_path):
+    pipeline = _make_pipeline(tmp_path, 'skip')
+    pipeline.process_image(_drop(pipeline, "a.jpg"))
+    pipeline.process_image(_drop(pipeline, "b.jpg"))
+    assert len(_rows(pipeline)) == 1
+    assert (pipeline.output_dir / "_duplicates" / "b.jpg").exists()
+    assert pipeline.avoided_model_calls == 1
+
+def test_reprocess_policy_and_failed_originals_call_model(tmp_path):
+    pipeline = _make_pipeline(tmp_path, 'reprocess')
+    pipeline.process_image(_drop(pipeline, "a.jpg"))
+    pipeline.process_image(_drop(pipeline, "b.jpg"))
+    assert pipeline.api.generate_description.call_count == 2
+
+    pipeline = _make_pipeline(tmp_path / "second", 'link')
+    pipeline.api.generate_description.return_value = None # First attempt fails
+    pipeline.process_image(_drop(pipeline, "a.jpg"))
+    pipeline.api.generate_description.return_value = {'description': 'ok', 'confidence': 0.5}
+    pipeline.process_image(_drop(pipeline, "b.jpg"))
+    assert pipeline.api.generate_description.call_count == 2
+    assert pipeline.avoided_model_calls == 0
+
+def test_concurrent_copies_cost_one_model_call(tmp_path):
+    pipeline = _make_pipeline(tmp_path, 'link')
+    def slow_describe(path, content_hash=None):
+        time.sleep(0.1)
+        return {'description': 'A jade bracelet', 'confidence': 0.9}
+    pipeline.api.generate_description.side_effect = slow_describe
+    paths = [_drop(pipeline, f"{i}.jpg") for i in range(3)]
+    threads = [threading.Thread(target=pipeline.process_image, args=(p,)) for p in paths]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert pipeline.api.generate_description.call_count == 1
+    assert pipeline.avoided_model_calls == 2
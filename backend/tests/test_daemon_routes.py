@@ -10,10 +10,15 @@ sys.path.append(str(Path(__file__).parent.parent))
 from routers import daemon_routes # Import the module containing the router
 import dependencies # Import the dependencies module to patch its components
 
+QUEUE_METRICS = {"depth": 2, "in_flight": 1, "max_size": 256, "workers": 2, "oldest_age_seconds": 1.5,
+                 "enqueued": 10, "processed": 7, "failed": 0, "duplicates": 1, "rejected": 0}
+
 # Fixture to provide a mock Daemon instance
 @pytest.fixture
 def mock_daemon_instance():
-    return MagicMock(spec=dependencies.Daemon) # Use spec=dependencies.Daemon
+    daemon = MagicMock(spec=dependencies.Daemon) # Use spec=dependencies.Daemon
+    daemon.queue_metrics.return_value = QUEUE_METRICS
+    return daemon
 
 # Fixture to patch global state and Daemon class for each test
 @pytest.fixture
@@ -36,13 +41,13 @@ def test_get_daemon_status_running(client_with_global_mock, mock_daemon_instance
     mock_daemon_instance.is_running.return_value = True
     response = client_with_global_mock.get("/daemon/status")
     assert response.status_code == 200
-    assert response.json() == {"status": "running"}
+    assert response.json() == {"status": "running", "queue": QUEUE_METRICS}
 
 def test_get_daemon_status_stopped(client_with_global_mock, mock_daemon_instance):
     mock_daemon_instance.is_running.return_value = False
     response = client_with_global_mock.get("/daemon/status")
     assert response.status_code == 200
-    assert response.json() == {"status": "stopped"}
+    assert response.json() == {"status": "stopped", "queue": QUEUE_METRICS}
 
 # --- Tests for start_daemon ---
 def test_start_daemon_success(client_with_global_mock, mock_daemon_instance):
@@ -0,0 +1,62 @@
+import threading
+import pytest
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import db_pool
+
+@pytest.fixture(autouse=True)
+def reset_pools():
+    db_pool.configure_db(**db_pool.DEFAULT_DB_SETTINGS)
+    yield
+    db_pool.close_all()
+    db_pool.configure_db(**db_pool.DEFAULT_DB_SETTINGS)
+
+def test_connection_is_tuned_for_wal(tmp_path):
+    conn = db_pool.get_connection(tmp_path / "pipeline.db")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1 # NORMAL
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -16384
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+def test_one_connection_per_thread(tmp_path):
+    db_path = tmp_path / "pipeline.db"
+    first = db_pool.get_connection(db_path)
+    assert db_pool.get_connection(str(db_path)) is first
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db_pool.get_connection(db_path)))
+    thread.start()
+    thread.join()
+    assert other[0] is not first
+
+def test_close_keeps_connection_open_and_rolls_back(tmp_path):
+    conn = db_pool.get_connection(tmp_path / "pipeline.db")
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.commit()
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.close()
+
+    again = db_pool.get_connection(tmp_path / "pipeline.db")
+    assert again is conn
+    assert again.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+def test_config_changes_reopen_connections(tmp_path):
+    conn = db_pool.get_connection(tmp_path / "pipeline.db")
+    db_pool.configure_from_config({"database": {"path": "./db/pipeline.db", "busy_timeout_ms": 250}})
+    reopened = db_pool.get_connection(tmp_path / "pipeline.db")
+    assert reopened is not conn
+    assert reopened.execute("PRAGMA busy_timeout").fetchone()[0] == 250
+
+def test_pool_stats_track_acquires(tmp_path):
+    db_path = tmp_path / "pipeline.db"
+    for _ in range(3):
+        db_pool.get_connection(db_path)
+    stats = db_pool.get_pool_stats()[str(db_path.resolve())]
+    assert stats["acquires"] == 3
+    assert stats["opened"] == 1
+    assert stats["connections"] == 1
+    assert stats["acquire_max_ms"] >= stats["acquire_avg_ms"] >= 0
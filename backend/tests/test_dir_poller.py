@@ -0,0 +1,95 @@
+import os
+import time
+import threading
+import pytest
+from unittest.mock import MagicMock
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from dir_poller import DirectoryPoller, snapshot_directory
+from daemon import Daemon
+from ingest_queue import IngestQueue
+from file_debouncer import FileDebouncer
+
+EXTS = ['.jpg', '.png']
+
+def test_snapshot_filters_extensions_and_directories(tmp_path):
+    (tmp_path / "a.jpg").write_bytes(b"12")
+    (tmp_path / "B.PNG").write_bytes(b"1")
+    (tmp_path / "notes.txt").write_bytes(b"1")
+    (tmp_path / "folder.jpg").mkdir()
+    snapshot = snapshot_directory(tmp_path, EXTS)
+    assert set(snapshot) == {"a.jpg", "B.PNG"}
+    assert snapshot["a.jpg"][0] == 2
+
+def test_poll_reports_new_and_changed_files_only(tmp_path):
+    (tmp_path / "old.jpg").write_bytes(b"1")
+    poller = DirectoryPoller(tmp_path, EXTS, MagicMock())
+    assert [p.name for p in poller.poll_once()] == ["old.jpg"]
+    assert poller.poll_once() == []
+
+    (tmp_path / "new.jpg").write_bytes(b"1")
+    with open(tmp_path / "old.jpg", "ab") as f:
+        f.write(b"more")
+    assert sorted(p.name for p in poller.poll_once()) == ["new.jpg", "old.jpg"]
+
+    poller.forget(tmp_path / "new.jpg")
+    assert [p.name for p in poller.poll_once()] == ["new.jpg"]
+
+def test_polling_thread_feeds_callback(tmp_path):
+    seen = threading.Event()
+    poller = DirectoryPoller(tmp_path, EXTS, lambda path: seen.set(), interval=0.05)
+    poller.start()
+    (tmp_path / "arrived.jpg").write_bytes(b"1")
+    assert seen.wait(2)
+    poller.stop()
+
+def test_catch_up_scan_throttles_to_queue_capacity(tmp_path):
+    daemon = Daemon.__new__(Daemon)
+    daemon.pipeline = MagicMock()
+    daemon.pipeline.scan_input.return_value = [tmp_path / f"{i}.jpg" for i in range(5)]
+    daemon.queue = IngestQueue(MagicMock(), max_size=2) # Not started, so nothing drains
+    daemon.debouncer = MagicMock()
+    daemon.debouncer.pending.return_value = 0
+    daemon.debouncer.touch.side_effect = daemon.queue.submit
+    daemon.watch_interval = 0.01
+    daemon._stop_catch_up = threading.Event()
+
+    thread = threading.Thread(target=daemon._catch_up)
+    thread.start()
+    thread.join(0.2)
+    assert daemon.debouncer.touch.call_count == 2 # Waiting for the queue to drain
+    assert daemon.catch_up_found == 5
+    daemon._stop_catch_up.set()
+    thread.join(2)
+    assert not thread.is_alive()
+
+def test_files_rejected_by_full_queue_are_retried(tmp_path):
+    daemon = Daemon.__new__(Daemon)
+    daemon.deferred = 0
+    processed = []
+    daemon.queue = IngestQueue(processed.append, max_size=2)
+    daemon.debouncer = FileDebouncer(daemon._enqueue, interval=0.05)
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"{i}.jpg"
+        path.write_bytes(b"x")
+        paths.append(path)
+        daemon._enqueue(path) # What the debouncer does once the file has settled
+    assert daemon.queue.metrics()["depth"] == 2
+    assert daemon.deferred == 3
+    assert daemon.debouncer.pending() == 3 # Held for retry instead of dropped
+
+    daemon.queue.start()
+    daemon.debouncer.start()
+    try:
+        deadline = time.monotonic() + 5
+        while len(processed) < 5 and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        daemon.debouncer.stop()
+        daemon.queue.stop()
+    assert sorted(processed) == paths
@@ -0,0 +1,111 @@
+import pytest
+import numpy as np
+from unittest.mock import MagicMock, patch
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from embedding_benchmark import recall_at_k, mean_reciprocal_rank, spearman, neighbour_purity, evaluate_embeddings, embed_texts
+from benchmark import generate_candidate, judge_candidate
+
+TASK = {
+    "name": "tiny_task",
+    "corpus": [
+        {"id": "cat", "topic": "pets", "text": "cat sleeping"},
+        {"id": "dog", "topic": "pets", "text": "dog walking"},
+        {"id": "bread", "topic": "food", "text": "bread baking"},
+    ],
+    "queries": [{"text": "kitten napping", "relevant": ["cat"]}, {"text": "baking loaves", "relevant": ["bread"]}],
+    "pairs": [{"a": "cat sleeping", "b": "kitten napping", "score": 4.5},
+              {"a": "cat sleeping", "b": "bread baking", "score": 0.5},
+              {"a": "dog walking", "b": "cat sleeping", "score": 2.5}],
+}
+
+# Hand-made vectors: pets along x (cats slightly along z), food along y
+VECTORS = {
+    "cat sleeping": [1.0, 0.0, 0.3], "kitten napping": [1.0, 0.0, 0.35], "dog walking": [1.0, 0.05, 0.0],
+    "bread baking": [0.0, 1.0, 0.0], "baking loaves": [0.05, 1.0, 0.0],
+}
+
+def _embed_session():
+    session = MagicMock()
+    def post(url, json=None, timeout=None):
+        response = MagicMock()
+        response.json.return_value = {"embeddings": [VECTORS[text] for text in json["input"]]}
+        return response
+    session.post.side_effect = post
+    return session
+
+def _tags_session(digest="sha256:embed1"):
+    session = MagicMock()
+    session.get.return_value.json.return_value = {"models": [{"name": "nomic-embed-text", "digest": digest}]}
+    return session
+
+@pytest.fixture
+def config(tmp_path):
+    return {
+        'ollama': {'enabled': True, 'url': 'http://mock-ollama:11434', 'timeout_seconds': 5},
+        'benchmark': {'embedding': {'batch_size': 4, 'top_k': 1}},
+        'embedding_cache': {'enabled': True, 'path': str(tmp_path / "embeddings")},
+    }
+
+def test_retrieval_metrics():
+    similarities = np.array([[0.9, 0.1, 0.5], [0.2, 0.3, 0.8]])
+    assert recall_at_k(similarities, [[0], [1]], 1) == 0.5
+    assert recall_at_k(similarities, [[0], [1]], 2) == 1.0
+    assert mean_reciprocal_rank(similarities, [[0], [1]]) == pytest.approx((1 + 0.5) / 2)
+
+def test_spearman_and_purity():
+    assert spearman(np.array([0.1, 0.5, 0.9]), np.array([1, 2, 3])) == pytest.approx(1.0)
+    assert spearman(np.array([0.9, 0.5, 0.1]), np.array([1, 2, 3])) == pytest.approx(-1.0)
+    vectors = np.array([[1, 0], [0.9, 0.1], [0, 1], [0.1, 0.9]], dtype=float)
+    assert neighbour_purity(vectors, ["a", "a", "b", "b"]) == 1.0
+
+def test_evaluate_embeddings_batches_and_reuses_cache(config):
+    session = _embed_session()
+    with patch('embedding_benchmark.get_session', return_value=session), \
+         patch('model_digests.get_session', return_value=_tags_session()):
+        first = evaluate_embeddings("nomic-embed-text", config, task=TASK)
+        # 11 texts, 5 distinct, at batch_size 4 -> 2 /api/embed calls
+        assert session.post.call_count == 2
+        second = evaluate_embeddings("nomic-embed-text", config, task=TASK)
+        assert session.post.call_count == 2 # Served from the embedding cache
+
+    assert first['metrics']['recall_at_1'] == 1.0
+    assert first['metrics']['spearman'] == pytest.approx(1.0)
+    assert first['metrics']['neighbour_purity'] == pytest.approx(2 / 3)
+    assert first['metrics']['cache_hits'] == 0
+    assert second['metrics']['cache_hits'] == 11
+    assert second['metrics']['embeddings_per_sec'] is None
+    assert second['score'] == first['score']
+    assert set(first['breakdown']) == {"semantic_similarity", "clustering", "retrieval_effectiveness"}
+
+def test_embedding_category_skips_llm_judge(config):
+    evaluation = {'task': 'tiny_task', 'score': 4.2, 'breakdown': {'clustering': 4.0},
+                  'metrics': {'recall_at_1': 1.0, 'recall_at_5': 1.0, 'mrr': 1.0, 'spearman': 0.9,
+                              'neighbour_purity': 0.8, 'embeddings_per_sec': 100.0}}
+    with patch('benchmark.evaluate_embeddings', return_value=evaluation), \
+         patch('benchmark.call_ollama_with_stats') as mock_generate, \
+         patch('benchmark.call_llm_judge') as mock_judge:
+        candidate = generate_candidate("nomic-embed-text", "embedding", config)
+        result = judge_candidate(candidate, config)
+    mock_generate.assert_not_called()
+    mock_judge.assert_not_called()
+    assert result['score'] == 4.2
+    assert result['embedding_metrics']['mrr'] == 1.0
+
+def test_embedding_failure_scores_zero(config):
+    with patch('benchmark.evaluate_embeddings', side_effect=RuntimeError("model not found")):
+        result = judge_candidate(generate_candidate("missing", "embedding", config), config)
+    assert result['score'] == 0
+
+def test_embed_texts_with_no_texts(config):
+    config['embedding_cache']['enabled'] = False
+    with patch('embedding_benchmark.embed_batch') as mock_embed:
+        vectors, stats = embed_texts("nomic-embed-text", [], config, batch_size=4)
+    mock_embed.assert_not_called()
+    assert vectors.shape == (0, 0)
+    assert vectors.dtype == np.float32
+    assert stats['embedded'] == 0
@@ -0,0 +1,129 @@
+import pytest
+import numpy as np
+from unittest.mock import MagicMock, patch
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import model_digests
+from embedding_cache import EmbeddingCache
+
+MODEL = "nomic-embed-text"
+
+def _tags_session(digest):
+    session = MagicMock()
+    session.get.return_value.json.return_value = {"models": [{"name": MODEL, "digest": digest}]}
+    return session
+
+def _fake_embed(calls):
+    def embed(texts):
+        calls.append(list(texts))
+        return np.array([[len(t), ord(t[0]), 1.0] for t in texts], dtype=np.float32)
+    return embed
+
+@pytest.fixture(autouse=True)
+def no_digest_ttl(monkeypatch):
+    monkeypatch.setattr(model_digests, "DIGEST_TTL_SECONDS", 0)
+
+def test_embed_only_misses_and_reload_from_disk(tmp_path):
+    calls = []
+    with patch('model_digests.get_session', return_value=_tags_session("sha256:aaa")):
+        cache = EmbeddingCache(tmp_path, "http://mock-ollama:11434")
+        vectors, info = cache.embed(MODEL, ["alpha", "beta", "alpha"], _fake_embed(calls), batch_size=1)
+        assert calls == [["alpha"], ["beta"]] # Duplicates embedded once
+        assert info['cache_hits'] == 0
+        np.testing.assert_array_equal(vectors[0], vectors[2])
+
+        reopened = EmbeddingCache(tmp_path, "http://mock-ollama:11434")
+        hits, missing = reopened.lookup(MODEL, ["beta", "gamma", "alpha"])
+    assert missing == [1]
+    np.testing.assert_array_equal(hits[0], [4, ord("b"), 1])
+    np.testing.assert_array_equal(hits[2], [5, ord("a"), 1])
+
+def test_new_digest_drops_old_vectors(tmp_path):
+    calls = []
+    cache = EmbeddingCache(tmp_path, "http://mock-ollama:11434")
+    with patch('model_digests.get_session', return_value=_tags_session("sha256:aaa")):
+        cache.embed(MODEL, ["alpha"], _fake_embed(calls))
+    with patch('model_digests.get_session', return_value=_tags_session("sha256:bbb")):
+        _, info = cache.embed(MODEL, ["alpha"], _fake_embed(calls))
+    assert info['cache_hits'] == 0
+    assert len(calls) == 2
+    assert [d.name for d in (tmp_path / MODEL).iterdir()] == ["sha256:bbb"]
+
+def test_unreachable_ollama_bypasses_cache(tmp_path):
+    calls = []
+    session = MagicMock()
+    session.get.side_effect = ConnectionError("down")
+    with patch('model_digests.get_session', return_value=session):
+        cache = EmbeddingCache(tmp_path, "http://mock-ollama:11434")
+        cache.embed(MODEL, ["alpha"], _fake_embed(calls))
+        _, info = cache.embed(MODEL, ["alpha"], _fake_embed(calls))
+    assert info['cache_hits'] == 0
+    assert len(calls) == 2
+
+def test_lru_eviction_compacts_vector_file(tmp_path):
+    texts = [f"text-{i}" for i in range(6)]
+    with patch('model_digests.get_session', return_value=_tags_session("sha256:aaa")):
+        cache = EmbeddingCache(tmp_path, "http://mock-ollama:11434", max_entries=4, compact_ratio=0.3)
+        cache.embed(MODEL, texts[:4], _fake_embed([]))
+        cache.lookup(MODEL, texts[:1]) # Keep text-0 recently used
+        cache.embed(MODEL, texts[4:], _fake_embed([]))
+        hits, missing = cache.lookup(MODEL, texts)
+
+    assert missing == [1, 2]
+    assert cache.stats()['evictions'] == 2
+    assert cache.stats()['compactions'] == 1
+    digest_dir = tmp_path / MODEL / "sha256:aaa"
+    vector_files = list(digest_dir.glob("vectors.*.f32"))
+    assert [f.name for f in vector_files] == ["vectors.1.f32"]
+    assert vector_files[0].stat().st_size == 4 * 3 * 4
+    np.testing.assert_array_equal(hits[5], [6, ord("t"), 1])
+
+def test_partial_append_is_truncated_on_load(tmp_path):
+    with patch('model_digests.get_session', return_value=_tags_session("sha256:aaa")):
+        cache = EmbeddingCache(tmp_path, "http://mock-ollama:11434")
+        cache.embed(MODEL, ["alpha"], _fake_embed([]))
+        vector_path = tmp_path / MODEL / "sha256:aaa" / "vectors.0.f32"
+        with open(vector_path, "ab") as f:
+            f.write(b"\x00" * 6) # Crash mid-append, before the index was updated
+
+        reopened = EmbeddingCache(tmp_path, "http://mock-ollama:11434")
+        hits, missing = reopened.lookup(MODEL, ["alpha"])
+    assert missing == []
+    assert vector_path.stat().st_size == 3 * 4
+
+def test_appends_go_to_the_log_and_recency_survives_restart(tmp_path):
+    texts = [f"text-{i}" for i in range(4)]
+    digest_dir = tmp_path / MODEL / "sha256:aaa"
+    with patch('model_digests.get_session', return_value=_tags_session("sha256:aaa")):
+        cache = EmbeddingCache(tmp_path, "http://mock-ollama:11434", max_entries=4)
+        cache.embed(MODEL, texts, _fake_embed([]), batch_size=1)
+        assert not (digest_dir / "index.json").exists() # No full index rewrite per append
+        assert len((digest_dir / "index.log").read_text().splitlines()) == 4
+        cache.lookup(MODEL, texts[:1]) # text-0 becomes the most recently used
+
+        # A new process sees the lookup, so text-1 (not text-0) is the LRU victim
+        reopened = EmbeddingCache(tmp_path, "http://mock-ollama:11434", max_entries=4)
+        reopened.embed(MODEL, ["text-4"], _fake_embed([]))
+        _, missing = reopened.lookup(MODEL, texts)
+        assert missing == [1]
+
+        reopened.close()
+        assert (digest_dir / "index.json").exists() and not (digest_dir / "index.log").exists()
+        _, missing = EmbeddingCache(tmp_path, "http://mock-ollama:11434").lookup(MODEL, texts + ["text-4"])
+    assert missing == [1]
+
+def test_torn_log_line_is_ignored(tmp_path):
+    with patch('model_digests.get_session', return_value=_tags_session("sha256:aaa")):
+        cache = EmbeddingCache(tmp_path, "http://mock-ollama:11434")
+        cache.embed(MODEL, ["alpha", "beta"], _fake_embed([]), batch_size=1)
+        log_path = tmp_path / MODEL / "sha256:aaa" / "index.log"
+        data = log_path.read_bytes()
+        log_path.write_bytes(data[:-10]) # Crash while writing the second record
+
+        _, missing = EmbeddingCache(tmp_path, "http://mock-ollama:11434").lookup(MODEL, ["alpha", "beta"])
+    assert missing == [1]
+    assert (tmp_path / MODEL / "sha256:aaa" / "vectors.0.f32").stat().st_size == 3 * 4
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+import sqlite3
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from export_stream import stream_export
+from init_db import migrate_database
+from routers import pipeline_routes, benchmark_routes
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "pipeline.db"
+    with sqlite3.connect(path) as conn:
+        migrate_database(conn)
+        conn.executemany("""
+            INSERT INTO pipeline_items (id, filename, filepath, status, source, created_at, description)
+            VALUES (?, ?, ?, ?, 'Ollama', ?, ?)
+        """, [(f"item-{i:04d}", f"{i}.jpg", f"/in/{i}.jpg", "pending" if i % 2 else "approved",
+               f"2026-10-17 12:{i // 60:02d}:{i % 60:02d}", f'玉鐲 "{i}", jade') for i in range(1200)])
+        conn.executemany("""
+            INSERT INTO benchmark_results (id, category, model, score, breakdown_json, reasoning, run_timestamp)
+            VALUES (?, ?, 'gemma3:4b', ?, '{}', 'ok', ?)
+        """, [(f"run-{i}", "general" if i < 3 else "coding", 7.5 + i, f"2026-10-0{i + 1} 09:00:00") for i in range(5)])
+    return path
+
+@pytest.fixture
+def client(db_path):
+    pipeline = MagicMock()
+    pipeline.db_path = str(db_path)
+    app = FastAPI()
+    app.include_router(pipeline_routes.router)
+    app.include_router(benchmark_routes.router)
+    with patch.object(pipeline_routes, 'get_pipeline', return_value=pipeline), \
+         patch.object(benchmark_routes, 'get_pipeline', return_value=pipeline):
+        with TestClient(app) as client:
+            yield client
+
+def test_rows_are_encoded_a_chunk_at_a_time(db_path):
+    blocks = list(stream_export(db_path, "SELECT id, description FROM pipeline_items ORDER BY id", (),
+                                ["id", "description"], "ndjson", chunk_size=500))
+    assert len(blocks) == 3 # 500 + 500 + 200 rows
+    lines = b"".join(blocks).decode("utf-8").splitlines()
+    assert len(lines) == 1200
+    assert json.loads(lines[7]) == {"id": "item-0007", "description": '玉鐲 "7", jade'}
+
+def test_csv_has_header_and_quotes_values(db_path):
+    data = b"".join(stream_export(db_path, "SELECT id, description FROM pipeline_items ORDER BY id LIMIT 2", (),
+                                  ["id", "description"], "csv")).decode("utf-8")
+    assert list(csv.reader(io.StringIO(data))) == [["id", "description"], ["item-0000", '玉鐲 "0", jade'],
+                                                    ["item-0001", '玉鐲 "1", jade']]
+
+def test_empty_csv_export_still_has_header(db_path):
+    data = b"".join(stream_export(db_path, "SELECT id FROM pipeline_items WHERE 0", (), ["id"], "csv"))
+    assert data.decode("utf-8").splitlines() == ["id"]
+
+def test_pipeline_items_export_route(client):
+    response = client.get("/pipeline/items/export", params={"status": "pending", "fields": "source"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 600
+    assert rows[0]["id"] == "item-1199" # Newest first, like the list endpoint
+    assert "description" not in rows[0] and rows[0]["source"] == "Ollama"
+
+def test_benchmark_history_export_route(client):
+    response = client.get("/benchmark/history/language/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert 'filename="benchmark_general.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == ["run-0", "run-1", "run-2"]
+    assert client.get("/benchmark/history/general/export", params={"format": "xml"}).status_code == 422
@@ -0,0 +1,101 @@
+import time
+import threading
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from file_debouncer import FileDebouncer
+from daemon import PipelineEventHandler
+
+def _collector():
+    ready, event = [], threading.Event()
+    def on_ready(path):
+        ready.append(path)
+        event.set()
+    return ready, event, on_ready
+
+def test_file_released_once_stable(tmp_path):
+    ready, event, on_ready = _collector()
+    debouncer = FileDebouncer(on_ready, interval=0.05)
+    debouncer.start()
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"x" * 10)
+    debouncer.touch(path)
+    debouncer.touch(path) # Coalesced
+    assert event.wait(2)
+    debouncer.stop()
+    assert ready == [path]
+    assert debouncer.coalesced == 1
+
+def test_growing_file_waits_until_writes_stop(tmp_path):
+    ready, event, on_ready = _collector()
+    debouncer = FileDebouncer(on_ready, interval=0.1)
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"x")
+    debouncer.touch(path)
+    debouncer.start()
+    for _ in range(4): # Keep writing for ~0.3s, longer than one interval
+        time.sleep(0.07)
+        with open(path, "ab") as f:
+            f.write(b"x" * 100)
+    assert not ready
+    assert event.wait(2)
+    debouncer.stop()
+    assert path.stat().st_size == 401
+
+def test_deleted_or_empty_files_are_not_released(tmp_path):
+    ready, _, on_ready = _collector()
+    debouncer = FileDebouncer(on_ready, interval=0.05)
+    debouncer.start()
+    gone = tmp_path / "gone.jpg"
+    gone.write_bytes(b"x")
+    debouncer.touch(gone)
+    gone.unlink()
+    empty = tmp_path / "empty.jpg"
+    empty.touch()
+    debouncer.touch(empty)
+    time.sleep(0.3)
+    debouncer.stop()
+    assert ready == []
+
+def test_handler_coalesces_events_and_follows_renames(tmp_path):
+    pipeline = MagicMock()
+    pipeline.config = {'security': {'allowed_extensions': ['.jpg']}}
+    pipeline.input_dir = tmp_path
+    debouncer = MagicMock()
+    handler = PipelineEventHandler(pipeline, debouncer)
+
+    handler.on_created(SimpleNamespace(is_directory=False, src_path=str(tmp_path / "a.jpg")))
+    handler.on_modified(SimpleNamespace(is_directory=False, src_path=str(tmp_path / "a.jpg")))
+    handler.on_created(SimpleNamespace(is_directory=False, src_path=str(tmp_path / "notes.txt")))
+    handler.on_moved(SimpleNamespace(is_directory=False, src_path=str(tmp_path / "b.jpg.part"),
+                                     dest_path=str(tmp_path / "b.jpg")))
+    handler.on_moved(SimpleNamespace(is_directory=False, src_path=str(tmp_path / "c.jpg"),
+                                     dest_path=str(tmp_path / "output" / "c.jpg")))
+
+    assert [c.args[0].name for c in debouncer.touch.call_args_list] == ["a.jpg", "a.jpg", "b.jpg"]
+    assert [c.args[0].name for c in debouncer.discard.call_args_list] == ["b.jpg.part", "c.jpg"]
+
+def test_file_that_stays_empty_is_dropped(tmp_path):
+    ready, event, on_ready = _collector()
+    debouncer = FileDebouncer(on_ready, interval=0.02, max_empty_checks=3)
+    debouncer.start()
+    path = tmp_path / "placeholder.jpg"
+    path.touch()
+    debouncer.touch(path)
+    deadline = time.monotonic() + 2
+    while debouncer.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert debouncer.pending() == 0 # No longer holds back the catch-up scan
+    assert debouncer.dropped_empty == 1
+
+    path.write_bytes(b"x" * 10) # The write that finally fills it raises a new event
+    debouncer.touch(path)
+    assert event.wait(2)
+    debouncer.stop()
+    assert ready == [path]
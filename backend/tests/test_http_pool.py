@@ -0,0 +1,82 @@
+import pytest
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adjust path to import http_pool and api
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import http_pool
+from api import OllamaClient
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Required for keep-alive
+
+    def do_GET(self):
+        body = json.dumps({"models": []}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def keep_alive_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture(autouse=True)
+def reset_pool():
+    http_pool.close_all()
+    http_pool.configure_pool(**http_pool.DEFAULT_POOL_SETTINGS)
+    yield
+    http_pool.close_all()
+
+def test_get_session_is_shared_per_base_url():
+    first = http_pool.get_session("http://mock-ollama:11434")
+    second = http_pool.get_session("http://mock-ollama:11434/")
+    other = http_pool.get_session("http://other-ollama:11434")
+    assert first is second
+    assert first is not other
+
+    stats = http_pool.get_pool_stats()["hosts"]
+    assert stats["http://mock-ollama:11434"]["session_misses"] == 1
+    assert stats["http://mock-ollama:11434"]["session_hits"] == 1
+    assert stats["http://other-ollama:11434"]["session_misses"] == 1
+
+def test_ollama_clients_share_session():
+    client_a = OllamaClient(base_url="http://mock-ollama:11434", model="model_a")
+    client_b = OllamaClient(base_url="http://mock-ollama:11434", model="model_b")
+    assert client_a.session is client_b.session
+
+def test_configure_pool_rebuilds_sessions():
+    session = http_pool.get_session("http://mock-ollama:11434")
+    http_pool.configure_pool(pool_maxsize=16)
+    assert http_pool.get_pool_stats()["settings"]["pool_maxsize"] == 16
+    assert http_pool.get_session("http://mock-ollama:11434") is not session
+
+def test_configure_from_config_reads_http_pool_section():
+    http_pool.configure_from_config({"ollama": {"http_pool": {"pool_connections": 2, "pool_block": True}}})
+    settings = http_pool.get_pool_stats()["settings"]
+    assert settings["pool_connections"] == 2
+    assert settings["pool_block"] is True
+    assert settings["pool_maxsize"] == http_pool.DEFAULT_POOL_SETTINGS["pool_maxsize"]
+
+def test_connections_are_reused(keep_alive_server):
+    client = OllamaClient(base_url=keep_alive_server)
+    for _ in range(5):
+        assert client.get_ollama_models() == []
+
+    stats = http_pool.get_pool_stats()["hosts"][keep_alive_server]
+    assert stats["requests_sent"] == 5
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 4
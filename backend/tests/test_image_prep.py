@@ -0,0 +1,79 @@
+import io
+import base64
+import pytest
+from PIL import Image
+from unittest.mock import patch
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from image_prep import ImagePreparer
+from api import OllamaClient
+
+def _noisy_png(path, size):
+    # Random pixels keep PNG large, like a real photo would be
+    Image.frombytes("RGB", size, bytes((i * 7919) % 251 for i in range(size[0] * size[1] * 3))).save(path, "PNG")
+    return path
+
+def test_large_image_downscaled_and_reencoded(tmp_path):
+    source = _noisy_png(tmp_path / "big.png", (800, 400))
+    preparer = ImagePreparer(tmp_path / "cache", max_dimension=200)
+    data = preparer.prepare(source)
+
+    with Image.open(io.BytesIO(data)) as img:
+        assert img.format == "JPEG"
+        assert img.size == (200, 100)
+    assert len(data) < source.stat().st_size
+    assert preparer.stats()['misses'] == 1
+
+def test_prepared_payload_cached_by_content_hash(tmp_path):
+    source = _noisy_png(tmp_path / "a.png", (300, 300))
+    preparer = ImagePreparer(tmp_path / "cache", max_dimension=100)
+    first = preparer.prepare(source)
+    with patch.object(preparer, '_encode') as encode:
+        copy = tmp_path / "copy.png"
+        copy.write_bytes(source.read_bytes()) # Same bytes, other name
+        assert preparer.prepare(copy) == first
+    encode.assert_not_called()
+    assert preparer.stats()['hits'] == 1
+
+def test_small_image_in_target_format_sent_unchanged(tmp_path):
+    source = tmp_path / "small.jpg"
+    Image.new("RGB", (50, 50), (10, 200, 30)).save(source, "JPEG")
+    preparer = ImagePreparer(tmp_path / "cache", max_dimension=100)
+    assert preparer.prepare(source) == source.read_bytes()
+
+def test_undecodable_file_falls_back_to_original(tmp_path):
+    source = tmp_path / "broken.jpg"
+    source.write_bytes(b"not really an image")
+    preparer = ImagePreparer(tmp_path / "cache")
+    assert preparer.prepare(source) == b"not really an image"
+
+def test_client_encodes_prepared_bytes(tmp_path):
+    source = _noisy_png(tmp_path / "big.png", (400, 400))
+    preparer = ImagePreparer(tmp_path / "cache", max_dimension=100)
+    client = OllamaClient(image_preparer=preparer)
+    encoded = client._encode_image_to_base64(str(source))
+    assert base64.b64decode(encoded) == preparer.prepare(source)
+
+def test_client_reuses_known_content_hash(tmp_path):
+    from content_hash import hash_file
+    source = _noisy_png(tmp_path / "big.png", (400, 400))
+    content_hash = hash_file(source)
+    preparer = ImagePreparer(tmp_path / "cache", max_dimension=100)
+    client = OllamaClient(image_preparer=preparer)
+    with patch('image_prep.hash_file') as rehash, client._image_file(str(source), content_hash) as prepared:
+        rehash.assert_not_called() # The pipeline already hashed it for deduplication
+    assert prepared == preparer.prepare_path(source)
+
+def test_pinned_files_survive_eviction(tmp_path):
+    sources = [_noisy_png(tmp_path / f"{i}.png", (300, 200 + i)) for i in range(3)]
+    preparer = ImagePreparer(tmp_path / "cache", max_dimension=100, max_cache_mb=0)
+    with preparer.pinned(sources[0]) as held:
+        preparer.prepare(sources[1]) # Over budget: evicts everything that is not in use
+        assert held.exists()
+    preparer.prepare(sources[2])
+    assert not held.exists()
+    assert not list((tmp_path / "cache").glob("*.tmp"))
@@ -0,0 +1,68 @@
+import time
+import threading
+import pytest
+from unittest.mock import MagicMock
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ingest_queue import IngestQueue
+
+def test_workers_drain_queue_in_parallel(tmp_path):
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def handler(path):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return path.name != "bad.jpg"
+
+    queue = IngestQueue(handler, workers=3, max_size=10)
+    queue.start()
+    for name in ["a.jpg", "b.jpg", "c.jpg", "bad.jpg"]:
+        assert queue.submit(tmp_path / name)
+    assert queue.join(timeout=5)
+    queue.stop()
+
+    assert peak[0] >= 2
+    metrics = queue.metrics()
+    assert metrics['processed'] == 3
+    assert metrics['failed'] == 1
+    assert metrics['depth'] == 0
+
+def test_duplicates_and_full_queue_are_rejected(tmp_path):
+    queue = IngestQueue(MagicMock(), workers=1, max_size=2) # Not started, so nothing drains
+    assert queue.submit(tmp_path / "a.jpg")
+    assert not queue.submit(tmp_path / "a.jpg")
+    assert queue.submit(tmp_path / "b.jpg")
+    assert not queue.submit(tmp_path / "c.jpg")
+
+    metrics = queue.metrics()
+    assert metrics['depth'] == 2
+    assert metrics['duplicates'] == 1
+    assert metrics['rejected'] == 1
+    assert metrics['oldest_age_seconds'] >= 0
+
+def test_path_can_be_requeued_after_processing(tmp_path):
+    handler = MagicMock(return_value=True)
+    queue = IngestQueue(handler, workers=1)
+    queue.start()
+    assert queue.submit(tmp_path / "a.jpg")
+    assert queue.join(timeout=5)
+    assert queue.submit(tmp_path / "a.jpg")
+    assert queue.join(timeout=5)
+    queue.stop()
+    assert handler.call_count == 2
+
+def test_handler_exception_counts_as_failure(tmp_path):
+    queue = IngestQueue(MagicMock(side_effect=RuntimeError("boom")), workers=1)
+    queue.start()
+    queue.submit(tmp_path / "a.jpg")
+    assert queue.join(timeout=5)
+    queue.stop()
+    assert queue.metrics()['failed'] == 1
@@ -0,0 +1,90 @@
+import pytest
+import time
+from unittest.mock import patch
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import judge_cache
+from judge_cache import JudgeCache
+from benchmark import call_llm_judge
+
+VERDICT = {'score': 4.0, 'reasoning': 'ok', 'breakdown': {'accuracy': 4.0}}
+
+@pytest.fixture
+def cache(tmp_path):
+    return JudgeCache(tmp_path / "pipeline.db", max_entries=2, ttl_hours=1)
+
+@pytest.fixture
+def judge_config(tmp_path, monkeypatch):
+    # get_judge_cache resolves the database path relative to the backend package
+    monkeypatch.setattr(judge_cache, '_caches', {})
+    return {
+        'database': {'path': str(tmp_path / "pipeline.db")},
+        'benchmark': {'judge_cache': {'enabled': True}},
+        'gemini': {'enabled': False},
+        'ollama': {'enabled': True, 'url': 'http://mock-ollama:11434', 'timeout_seconds': 5},
+        'ollama_judge': {'enabled': True, 'model': 'judge-model'},
+    }
+
+def test_key_depends_on_every_field():
+    base = ("output", "reasoning_standard_v1", "ollama", "judge-model", "template")
+    keys = {JudgeCache.make_key(*base)}
+    for index in range(len(base)):
+        changed = list(base)
+        changed[index] += "x"
+        keys.add(JudgeCache.make_key(*changed))
+    assert len(keys) == len(base) + 1
+    # Boundaries between fields are part of the key
+    assert JudgeCache.make_key("ab", "c", "", "", "") != JudgeCache.make_key("a", "bc", "", "", "")
+
+def test_get_put_and_hit_rate(cache):
+    assert cache.get("k1") is None
+    cache.put("k1", VERDICT, "std", "ollama", "judge-model")
+    assert cache.get("k1") == VERDICT
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+    assert stats['lifetime_hits'] == 1
+
+def test_lru_eviction(cache):
+    now = time.time()
+    with patch('judge_cache.time.time', side_effect=[now, now + 1, now + 2, now + 3]):
+        cache.put("k1", VERDICT, "std", "ollama", "m")
+        cache.put("k2", VERDICT, "std", "ollama", "m")
+        cache.get("k1") # k1 is now more recently used than k2
+        cache.put("k3", VERDICT, "std", "ollama", "m")
+    assert cache.stats()['entries'] == 2
+    assert cache.get("k2") is None
+    assert cache.get("k1") == VERDICT
+    assert cache.stats()['evictions'] == 1
+
+def test_ttl_expiry(cache):
+    with patch('judge_cache.time.time', return_value=0.0):
+        cache.put("k1", VERDICT, "std", "ollama", "m")
+    with patch('judge_cache.time.time', return_value=3601.0):
+        assert cache.get("k1") is None
+    assert cache.stats()['entries'] == 0
+
+def test_call_llm_judge_uses_cache_and_bypass(judge_config):
+    verdict = {**VERDICT, 'judge_stats': {'eval_count': 10}}
+    with patch('benchmark._call_ollama_judge', return_value=verdict) as mock_judge:
+        first = call_llm_judge("same output", "reasoning", judge_config)
+        second = call_llm_judge("same output", "reasoning", judge_config)
+        assert mock_judge.call_count == 1
+        assert first['judge_stats'] == {'eval_count': 10}
+        assert second['cached'] is True
+        assert second['score'] == 4.0
+        assert second['judge_stats'] is None
+
+        call_llm_judge("same output", "reasoning", judge_config, bypass_cache=True)
+        assert mock_judge.call_count == 2
+
+def test_call_llm_judge_does_not_cache_failures(judge_config):
+    failure = {'score': 0, 'reasoning': 'Judge failed', 'breakdown': {}, 'judge_error': 'timeout'}
+    with patch('benchmark._call_ollama_judge', return_value=failure) as mock_judge:
+        call_llm_judge("output", "reasoning", judge_config)
+        call_llm_judge("output", "reasoning", judge_config)
+    assert mock_judge.call_count == 2
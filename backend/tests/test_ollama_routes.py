@@ -1,6 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, AsyncMock, patch
 from fastapi import FastAPI # Import FastAPI
 
 # Adjust path to import routers and dependencies
@@ -10,7 +10,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from routers.ollama_routes import router # Import the router to be tested
 from dependencies import get_pipeline
-from api import OllamaClient # Import the actual OllamaClient
+from api import OllamaClient, AsyncOllamaClient # Import the actual clients
 from pydantic import ConfigDict # For Pydantic warnings
 from models import OllamaPullRequest, OllamaDeleteRequest, BlindTestResult # To modify these models
 
@@ -33,9 +33,9 @@ def mock_pipeline():
 
 # --- Tests for get_ollama_health ---
 
-# Instead of mocking pipeline.api.check_health, we can patch OllamaClient.check_health
-# directly which is called by the actual API route function.
-@patch('api.OllamaClient.check_health')
+# Instead of mocking pipeline.api.check_health, we can patch AsyncOllamaClient.check_health
+# directly which is awaited by the actual API route function.
+@patch('api.AsyncOllamaClient.check_health', new_callable=AsyncMock)
 def test_get_ollama_health_healthy(mock_check_health, mock_pipeline):
     """Test when Ollama is healthy."""
     mock_check_health.return_value = True
@@ -43,7 +43,7 @@ def test_get_ollama_health_healthy(mock_check_health, mock_pipeline):
     assert response.status_code == 200
     assert response.json() == {"status": "healthy", "message": "Ollama server is running."}
 
-@patch('api.OllamaClient.check_health')
+@patch('api.AsyncOllamaClient.check_health', new_callable=AsyncMock)
 def test_get_ollama_health_unhealthy(mock_check_health, mock_pipeline):
     """Test when Ollama is unhealthy."""
     mock_check_health.return_value = False
@@ -53,18 +53,18 @@ def test_get_ollama_health_unhealthy(mock_check_health, mock_pipeline):
 
 # --- Tests for list_ollama_models ---
 
-# Mock the OllamaClient that ollama_routes.py will import and instantiate
-@patch('routers.ollama_routes.OllamaClient')
+# Mock the AsyncOllamaClient that ollama_routes.py will import and instantiate
+@patch('routers.ollama_routes.AsyncOllamaClient')
 def test_list_ollama_models_success(mock_ollama_client_class, mock_pipeline):
     """Test successful retrieval of Ollama models."""
     mock_pipeline.api.base_url = "http://mock-ollama:11434" # Set base_url for OllamaClient init
     
-    mock_ollama_client_instance = MagicMock(spec=OllamaClient)
+    mock_ollama_client_instance = AsyncMock(spec=AsyncOllamaClient)
     mock_ollama_client_instance.get_ollama_models.return_value = [
         {"name": "model1", "model": "model1:latest", "size": 1000, "digest": "abc", "modified_at": "now"},
         {"name": "model2", "model": "model2:latest", "size": 2000, "digest": "def", "modified_at": "then"}
     ]
-    mock_ollama_client_class.return_value = mock_ollama_client_instance # When OllamaClient() is called, return our mock instance
+    mock_ollama_client_class.from_client.return_value = mock_ollama_client_instance # When AsyncOllamaClient.from_client() is called, return our mock instance
 
     response = client.get("/ollama/models")
     assert response.status_code == 200
@@ -73,25 +73,25 @@ def test_list_ollama_models_success(mock_ollama_client_class, mock_pipeline):
         {"name": "model2", "model": "model2:latest", "size": 2000, "digest": "def", "modified_at": "then"}
     ]
 
-@patch('routers.ollama_routes.OllamaClient')
+@patch('routers.ollama_routes.AsyncOllamaClient')
 def test_list_ollama_models_empty(mock_ollama_client_class, mock_pipeline):
     """Test retrieval when no Ollama models are found."""
     mock_pipeline.api.base_url = "http://mock-ollama:11434"
-    mock_ollama_client_instance = MagicMock(spec=OllamaClient)
+    mock_ollama_client_instance = AsyncMock(spec=AsyncOllamaClient)
     mock_ollama_client_instance.get_ollama_models.return_value = []
-    mock_ollama_client_class.return_value = mock_ollama_client_instance
+    mock_ollama_client_class.from_client.return_value = mock_ollama_client_instance
 
     response = client.get("/ollama/models")
     assert response.status_code == 200
     assert response.json() == []
 
-@patch('routers.ollama_routes.OllamaClient')
+@patch('routers.ollama_routes.AsyncOllamaClient')
 def test_list_ollama_models_exception(mock_ollama_client_class, mock_pipeline):
     """Test error handling during Ollama model listing."""
     mock_pipeline.api.base_url = "http://mock-ollama:11434"
-    mock_ollama_client_instance = MagicMock(spec=OllamaClient)
+    mock_ollama_client_instance = AsyncMock(spec=AsyncOllamaClient)
     mock_ollama_client_instance.get_ollama_models.side_effect = Exception("Ollama list error")
-    mock_ollama_client_class.return_value = mock_ollama_client_instance
+    mock_ollama_client_class.from_client.return_value = mock_ollama_client_instance
 
     response = client.get("/ollama/models")
     assert response.status_code == 500
@@ -99,16 +99,66 @@ def test_list_ollama_models_exception(mock_ollama_client_class, mock_pipeline):
 
 # --- Tests for pull_ollama_model ---
 
-def test_pull_ollama_model_not_implemented():
-    """Test that pull model endpoint returns 501 Not Implemented."""
+@patch('routers.ollama_routes.AsyncOllamaClient')
+def test_pull_ollama_model_success(mock_ollama_client_class):
+    """Test that pull model endpoint awaits the async client."""
+    mock_ollama_client_instance = AsyncMock(spec=AsyncOllamaClient)
+    mock_ollama_client_instance.pull_model.return_value = True
+    mock_ollama_client_class.from_client.return_value = mock_ollama_client_instance
+
+    response = client.post("/ollama/pull", json={"model_name": "new_model"})
+    assert response.status_code == 200
+    assert response.json() == {"message": "Model 'new_model' pulled successfully."}
+    mock_ollama_client_instance.pull_model.assert_awaited_once_with("new_model")
+
+@patch('routers.ollama_routes.AsyncOllamaClient')
+def test_pull_invalidates_caches_after_the_pull_completes(mock_ollama_client_class):
+    """Cached results are dropped once the pull has returned, not before."""
+    events = []
+    mock_ollama_client_instance = AsyncMock(spec=AsyncOllamaClient)
+    mock_ollama_client_instance.pull_model.side_effect = lambda name: events.append("pulled") or True
+    mock_ollama_client_class.from_client.return_value = mock_ollama_client_instance
+    cache = MagicMock()
+    cache.invalidate_model.side_effect = lambda name: events.append(f"invalidated {name}")
+
+    with patch('routers.ollama_routes.get_response_cache', return_value=cache), \
+         patch('routers.ollama_routes.get_embedding_cache', return_value=None):
+        response = client.post("/ollama/pull", json={"model_name": "new_model"})
+    assert response.status_code == 200
+    assert events == ["pulled", "invalidated new_model"]
+
+def test_async_pull_waits_for_completion():
+    import asyncio
+    ollama_client = AsyncOllamaClient(base_url="http://mock-ollama:11434", retries=0)
+    http = MagicMock()
+    http.request = AsyncMock(return_value=MagicMock())
+    with patch('api.get_async_client', return_value=http):
+        assert asyncio.run(ollama_client.pull_model("new_model"))
+    _, kwargs = http.request.call_args
+    assert kwargs["json"] == {"name": "new_model", "stream": False}
+    assert kwargs["timeout"] >= 600
+
+@patch('routers.ollama_routes.AsyncOllamaClient')
+def test_pull_ollama_model_failure(mock_ollama_client_class):
+    """Test that a failed pull surfaces as a 500."""
+    mock_ollama_client_instance = AsyncMock(spec=AsyncOllamaClient)
+    mock_ollama_client_instance.pull_model.return_value = False
+    mock_ollama_client_class.from_client.return_value = mock_ollama_client_instance
+
     response = client.post("/ollama/pull", json={"model_name": "new_model"})
-    assert response.status_code == 501
-    assert response.json() == {"detail": "Not Implemented: Ollama model pull functionality."}
+    assert response.status_code == 500
+    assert "new_model" in response.json()['detail']
 
 # --- Tests for delete_ollama_model ---
 
-def test_delete_ollama_model_not_implemented():
-    """Test that delete model endpoint returns 501 Not Implemented."""
+@patch('routers.ollama_routes.AsyncOllamaClient')
+def test_delete_ollama_model_success(mock_ollama_client_class):
+    """Test that delete model endpoint awaits the async client."""
+    mock_ollama_client_instance = AsyncMock(spec=AsyncOllamaClient)
+    mock_ollama_client_instance.delete_model.return_value = True
+    mock_ollama_client_class.from_client.return_value = mock_ollama_client_instance
+
     response = client.post("/ollama/delete", json={"model_name": "old_model"})
-    assert response.status_code == 501
-    assert response.json() == {"detail": "Not Implemented: Ollama model delete functionality."}
\ No newline at end of file
+    assert response.status_code == 200
+    assert response.json() == {"message": "Model 'old_model' deleted successfully."}
+    mock_ollama_client_instance.delete_model.assert_awaited_once_with("old_model")
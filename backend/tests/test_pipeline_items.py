@@ -0,0 +1,73 @@
+import sqlite3
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import db_pool
+from init_db import migrate_database
+from routers import pipeline_routes
+
+@pytest.fixture
+def client(tmp_path):
+    db_path = tmp_path / "pipeline.db"
+    with sqlite3.connect(db_path) as conn:
+        migrate_database(conn)
+        # Two items share each timestamp, so paging has to break ties on id
+        conn.executemany("""
+            INSERT INTO pipeline_items (id, filename, filepath, status, source, created_at, description, metadata_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(f"item-{i:02d}", f"{i}.jpg", f"/in/{i}.jpg", "approved" if i % 3 == 0 else "pending",
+               "Gemini" if i % 5 == 0 else "Ollama", f"2026-10-{1 + i // 2:02d} 12:00:00", f"desc {i}", "{}")
+              for i in range(25)])
+    pipeline = MagicMock()
+    pipeline._get_db_connection.side_effect = lambda: db_pool.get_connection(db_path)
+    app = FastAPI()
+    app.include_router(pipeline_routes.router)
+    with patch.object(pipeline_routes, 'get_pipeline', return_value=pipeline):
+        with TestClient(app) as client:
+            yield client
+    db_pool.close_all()
+
+def _all_pages(client, **params):
+    ids, cursor = [], None
+    while True:
+        response = client.get("/pipeline/items", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids += [item["id"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+
+def test_pages_cover_every_item_once_newest_first(client):
+    first = client.get("/pipeline/items", params={"limit": 10})
+    assert len(first.json()) == 10
+    assert "X-Next-Cursor" in first.headers
+
+    ids = _all_pages(client, limit=7)
+    assert ids == [f"item-{i:02d}" for i in reversed(range(25))]
+
+def test_filters(client):
+    ids = _all_pages(client, status="approved", limit=3)
+    assert ids == [f"item-{i:02d}" for i in reversed(range(0, 25, 3))]
+    assert _all_pages(client, source="Gemini") == ["item-20", "item-15", "item-10", "item-05", "item-00"]
+    ids = _all_pages(client, created_after="2026-10-12T00:00:00", created_before="2026-10-13T00:00:00")
+    assert ids == ["item-23", "item-22"]
+
+def test_projection_omits_heavy_columns(client):
+    item = client.get("/pipeline/items", params={"limit": 1, "fields": "confidence_score"}).json()[0]
+    assert "description" not in item and "metadata_json" not in item
+    assert item["id"] == "item-24" and "confidence_score" in item
+
+    full = client.get("/pipeline/items", params={"limit": 1}).json()[0]
+    assert full["description"] == "desc 24"
+
+def test_bad_parameters(client):
+    assert client.get("/pipeline/items", params={"fields": "password"}).status_code == 400
+    assert client.get("/pipeline/items", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/pipeline/items", params={"limit": 0}).status_code == 422
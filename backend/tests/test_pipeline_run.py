@@ -0,0 +1,110 @@
+import time
+import threading
+import pytest
+from unittest.mock import MagicMock
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pipeline import ImagePipeline
+
+def _pipeline(images, max_concurrent_jobs=2, item_timeout_seconds=None):
+    pipeline = ImagePipeline.__new__(ImagePipeline)
+    pipeline.config = {'processing': {'max_concurrent_jobs': max_concurrent_jobs,
+                                      'item_timeout_seconds': item_timeout_seconds}}
+    pipeline.api = MagicMock()
+    pipeline.writes = MagicMock()
+    pipeline.api.check_health.return_value = True
+    pipeline.scan_input = MagicMock(return_value=[Path(name) for name in images])
+    return pipeline
+
+def test_run_bounds_concurrency_and_reports_speedup():
+    pipeline = _pipeline([f"{i}.jpg" for i in range(6)], max_concurrent_jobs=3)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def process(image_path, abandoned=None):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return image_path.name != "5.jpg"
+
+    pipeline.process_image = process
+    summary = pipeline.run()
+
+    assert peak[0] == 3
+    assert summary['workers'] == 3
+    assert summary['processed'] == 5
+    assert summary['failed'] == 1
+    assert summary['serial_time_seconds'] >= 0.3
+    assert summary['wall_time_seconds'] < summary['serial_time_seconds']
+    assert summary['speedup'] > 1.5
+
+def test_run_cancel_leaves_queued_images():
+    pipeline = _pipeline([f"{i}.jpg" for i in range(5)], max_concurrent_jobs=1)
+    cancel = threading.Event()
+    processed = []
+
+    def process(image_path, abandoned=None):
+        processed.append(image_path.name)
+        cancel.set()
+        return True
+
+    pipeline.process_image = process
+    summary = pipeline.run(cancel_event=cancel)
+
+    assert processed == ["0.jpg"]
+    assert summary['processed'] == 1
+    assert summary['cancelled'] == 4
+
+def test_run_abandons_items_past_timeout():
+    pipeline = _pipeline(["slow.jpg", "fast.jpg"], max_concurrent_jobs=2, item_timeout_seconds=0.1)
+    flagged = threading.Event()
+
+    def process(image_path, abandoned=None):
+        if image_path.name == "slow.jpg":
+            abandoned.wait(5)
+            flagged.set()
+            return False
+        return True
+
+    pipeline.process_image = process
+    summary = pipeline.run()
+
+    assert flagged.wait(1)
+    assert summary['timed_out'] == 1
+    assert summary['processed'] == 1
+
+def test_run_skips_when_ollama_unhealthy():
+    pipeline = _pipeline(["a.jpg"])
+    pipeline.api.check_health.return_value = False
+    pipeline.process_image = MagicMock()
+    assert pipeline.run() is None
+    pipeline.process_image.assert_not_called()
+
+def test_timed_out_workers_are_reported_and_skipped_on_rescan(tmp_path):
+    for name in ("slow.jpg", "next.jpg"):
+        (tmp_path / name).write_bytes(b"jpeg")
+    pipeline = _pipeline([], max_concurrent_jobs=1, item_timeout_seconds=0.1)
+    pipeline.config['security'] = {'allowed_extensions': ['.jpg']}
+    pipeline.input_dir = tmp_path
+    pipeline._hash_lock = threading.Lock()
+    pipeline._inflight_paths = set()
+    release = threading.Event()
+    pipeline._process_image = lambda image_path, abandoned: release.wait(5)
+
+    pipeline.scan_input = MagicMock(return_value=[tmp_path / "slow.jpg"])
+    summary = pipeline.run()
+    del pipeline.scan_input # Back to the real directory scan
+    try:
+        assert summary['timed_out'] == 1
+        assert summary['still_running'] == 1
+        # The abandoned worker still owns slow.jpg, so neither a rescan nor a direct call picks it up again
+        assert pipeline.scan_input() == [tmp_path / "next.jpg"]
+        assert pipeline.process_image(tmp_path / "slow.jpg") is False
+    finally:
+        release.set()
@@ -0,0 +1,92 @@
+import pytest
+import json
+import threading
+import time
+from unittest.mock import patch
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from prompt_loader import PromptLoader
+from benchmark_dataset import summarize_scores, run_dataset_benchmark
+
+@pytest.fixture
+def loader(tmp_path):
+    prompts_dir = tmp_path / "prompts"
+    datasets_dir = tmp_path / "datasets"
+    prompts_dir.mkdir()
+    datasets_dir.mkdir()
+    (prompts_dir / "vision_en.json").write_text(json.dumps(
+        {"name": "vision_default_en", "category": "vision", "language": "en", "text": "Describe."}), encoding='utf-8')
+    with open(datasets_dir / "reasoning_en.jsonl", 'w', encoding='utf-8') as f:
+        for i in range(30):
+            difficulty = "easy" if i % 3 else "hard"
+            f.write(json.dumps({"name": f"r{i}", "category": "reasoning", "language": "en",
+                                "difficulty": difficulty, "text": f"Question {i}"}) + "\n")
+        f.write("\n") # Blank lines are ignored
+    return PromptLoader(prompts_dir=prompts_dir)
+
+def test_iter_dataset_streams_lines_and_falls_back(loader):
+    stream = loader.iter_dataset("reasoning", "zh_TW") # Falls back to the English dataset
+    assert next(stream).name == "r0"
+    assert sum(1 for _ in stream) == 29
+    # No dataset file: the single default prompt is used
+    assert [p.name for p in loader.iter_dataset("vision", "en")] == ["vision_default_en"]
+
+def test_sample_dataset_is_stratified_and_seeded(loader):
+    sample = loader.sample_dataset(["reasoning", "vision"], per_stratum=4, stratify_by="difficulty", seed=7)
+    reasoning = [p for p in sample if p.category == "reasoning"]
+    assert sorted(p.difficulty for p in reasoning) == ["easy"] * 4 + ["hard"] * 4
+    assert [p.name for p in sample if p.category == "vision"] == ["vision_default_en"]
+    again = loader.sample_dataset(["reasoning", "vision"], per_stratum=4, stratify_by="difficulty", seed=7)
+    assert [p.name for p in again] == [p.name for p in sample]
+
+def test_sample_dataset_without_limit_keeps_everything(loader):
+    assert len(loader.sample_dataset(["reasoning"])) == 30
+    with pytest.raises(ValueError):
+        loader.sample_dataset(["reasoning"], stratify_by="nonexistent")
+
+def test_summarize_scores():
+    results = [
+        {'category': 'reasoning', 'score': 4}, {'category': 'reasoning', 'score': 2},
+        {'category': 'coding', 'score': 3}, {'category': 'coding', 'score': None, 'error': 'timeout'},
+    ]
+    summary = summarize_scores(results)
+    assert summary['reasoning']['n'] == 2
+    assert summary['reasoning']['mean'] == 3.0
+    assert summary['reasoning']['ci95_low'] < 3.0 < summary['reasoning']['ci95_high']
+    assert summary['coding']['n'] == 1
+    assert summary['coding']['ci95_low'] is None
+
+def test_run_dataset_benchmark_bounds_concurrency(loader, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "output").mkdir()
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def generate(model, category, config, language="en", stream=False, prompt_obj=None):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        if prompt_obj.name == "r3":
+            raise ConnectionError("Ollama went away")
+        return {'model': model, 'category': category, 'prompt_name': prompt_obj.name, 'output': 'o'}
+
+    config = {'benchmark': {'dataset': {'concurrency': 3}}}
+    with patch('benchmark_dataset.prompt_loader', loader), \
+         patch('benchmark_dataset.load_benchmark_config', return_value=config), \
+         patch('benchmark_dataset.generate_candidate', side_effect=generate), \
+         patch('benchmark_dataset.judge_candidate', side_effect=lambda c, *a, **k: {**c, 'score': 4}):
+        report = run_dataset_benchmark("mock_model", categories=["reasoning"])
+
+    assert 1 < peak <= 3
+    assert report['failed'] == 1
+    assert report['summary']['reasoning']['n'] == 29
+    assert [r['prompt_name'] for r in report['results']][:4] == ["r0", "r1", "r2", "r3"]
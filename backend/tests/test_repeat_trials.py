@@ -0,0 +1,89 @@
+import pytest
+import sqlite3
+from unittest.mock import MagicMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from trial_stats import bootstrap_ci, summarize_trials, should_stop
+from benchmark import run_repeat_trials
+from routers import benchmark_routes
+
+MOCK_CONFIG = {'ollama': {'enabled': True, 'url': 'http://mock-ollama:11434', 'timeout_seconds': 5}}
+
+def _scored(scores):
+    scores = iter(scores)
+    def judge(candidate, config, language="en", bypass_judge_cache=False):
+        return {**candidate, 'score': next(scores), 'breakdown': {}, 'timestamp': '2026-01-01T00:00:00'}
+    return judge
+
+def _generate(model, category, config, language="en", stream=False, prompt_obj=None):
+    return {'model': model, 'category': category, 'prompt_name': 'p', 'output': 'o', 'stats': {}}
+
+def test_bootstrap_ci_contains_mean_and_is_seeded():
+    scores = [3, 4, 2, 5, 4, 3, 4]
+    low, high = bootstrap_ci(scores, seed=1)
+    assert low < sum(scores) / len(scores) < high
+    assert bootstrap_ci(scores, seed=1) == (low, high)
+    assert bootstrap_ci([4, 4, 4]) == (4.0, 4.0)
+    assert bootstrap_ci([]) == (None, None)
+
+def test_summarize_trials():
+    summary = summarize_trials([2, 4], seed=0)
+    assert summary['trials'] == 2
+    assert summary['mean'] == 3.0
+    assert summary['variance'] == 2.0
+    assert summary['ci_low'] <= 3.0 <= summary['ci_high']
+
+def test_should_stop_respects_min_trials():
+    assert not should_stop([4, 4], min_trials=3, target_ci_width=0.5)
+    assert should_stop([4, 4, 4], min_trials=3, target_ci_width=0.5)
+    assert not should_stop([1, 5, 1, 5], min_trials=3, target_ci_width=0.5, seed=0)
+
+def test_run_repeat_trials_stops_early_on_stable_scores():
+    recorded = []
+    with patch('benchmark.generate_candidate', side_effect=_generate) as mock_generate, \
+         patch('benchmark.judge_candidate', side_effect=_scored([4] * 10)):
+        summary = run_repeat_trials("m", "reasoning", MOCK_CONFIG, max_trials=10, min_trials=3,
+                                    on_trial=lambda index, result: recorded.append(index))
+    assert mock_generate.call_count == 3
+    assert summary['stopped_early'] is True
+    assert summary['ci_width'] == 0.0
+    assert recorded == [0, 1, 2]
+
+def test_run_repeat_trials_runs_to_max_on_noisy_scores():
+    with patch('benchmark.generate_candidate', side_effect=_generate), \
+         patch('benchmark.judge_candidate', side_effect=_scored([1, 5, 1, 5, 1, 5])):
+        summary = run_repeat_trials("m", "reasoning", MOCK_CONFIG, max_trials=6, min_trials=3, target_ci_width=0.1)
+    assert summary['trials'] == 6
+    assert summary['stopped_early'] is False
+    assert summary['mean'] == 3.0
+
+@patch('routers.benchmark_routes.get_pipeline')
+def test_repeat_route_records_every_trial(mock_get_pipeline):
+    pipeline = MagicMock()
+    pipeline.config = MOCK_CONFIG
+    mock_get_pipeline.return_value = pipeline
+
+    app = FastAPI()
+    app.include_router(benchmark_routes.router)
+    client = TestClient(app)
+    with patch('benchmark.generate_candidate', side_effect=_generate), \
+         patch('benchmark.judge_candidate', side_effect=_scored([3, 3, 3, 3])):
+        response = client.post("/benchmark/repeat", json={"category": "language", "model": "m", "min_trials": 3})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['trials'] == 3
+    assert body['scores'] == [3.0, 3.0, 3.0]
+    assert pipeline._record_benchmark_trial.call_count == 3
+    first_call = pipeline._record_benchmark_trial.call_args_list[0].kwargs
+    assert first_call['trial_set_id'] == body['trial_set_id']
+    assert first_call['category'] == "general"
+
+    assert client.post("/benchmark/repeat", json={"category": "unknown"}).status_code == 400
+    assert client.post("/benchmark/repeat", json={"category": "language", "min_trials": 5, "max_trials": 2}).status_code == 400
@@ -0,0 +1,76 @@
+import json
+import base64
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from request_body import Base64ImageBody
+from api import OllamaClient
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(bytes(range(256)) * 40 + b"tail") # 10244 bytes, not a multiple of 3
+    return path
+
+@pytest.fixture
+def ollama_server():
+    """Minimal /api/generate endpoint that records the headers and body it received."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            received.append({"headers": dict(self.headers), "body": json.loads(self.rfile.read(length))})
+            reply = json.dumps({"response": "A jade pendant", "done": True}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", received
+    server.shutdown()
+
+def test_body_matches_json_dumps(image):
+    payload = {"model": "vision", "prompt": 'Say "__image_base64__"', "stream": False}
+    body = Base64ImageBody(payload, image, chunk_size=999)
+    data = b"".join(body)
+
+    assert len(data) == len(body)
+    decoded = json.loads(data)
+    assert decoded["prompt"] == payload["prompt"]
+    assert base64.b64decode(decoded["images"][0]) == image.read_bytes()
+    assert b"".join(body) == data # Re-iterable for retries
+
+def test_chunk_size_must_keep_base64_aligned(image):
+    with pytest.raises(ValueError):
+        Base64ImageBody({}, image, chunk_size=1000)
+
+def test_empty_image(tmp_path):
+    empty = tmp_path / "empty.jpg"
+    empty.touch()
+    body = Base64ImageBody({"model": "m"}, empty)
+    assert json.loads(b"".join(body))["images"] == [""]
+
+def test_client_streams_image_with_content_length(image, ollama_server):
+    url, received = ollama_server
+    client = OllamaClient(base_url=url, model="vision", retries=0)
+    result = client.generate_description(str(image), prompt="Describe")
+
+    assert result["description"] == "A jade pendant"
+    request = received[0]
+    assert "Transfer-Encoding" not in request["headers"]
+    assert base64.b64decode(request["body"]["images"][0]) == image.read_bytes()
+    assert request["body"]["model"] == "vision"
@@ -0,0 +1,156 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import response_cache
+import model_digests
+from response_cache import ResponseCache, is_deterministic
+from benchmark import call_ollama_with_stats
+
+OLLAMA_URL = "http://mock-ollama:11434"
+
+def _tags_session(digests):
+    """Session mock whose /api/tags reports the given {model: digest} mapping."""
+    session = MagicMock()
+    def get(url, timeout=None):
+        response = MagicMock()
+        response.json.return_value = {"models": [{"name": name, "digest": digest} for name, digest in digests.items()]}
+        return response
+    session.get.side_effect = get
+    return session
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(tmp_path / "responses", OLLAMA_URL, max_size_mb=1)
+
+def test_is_deterministic():
+    assert is_deterministic({"temperature": 0})
+    assert is_deterministic({"seed": 42, "temperature": 0.7})
+    assert not is_deterministic({"temperature": 0.8})
+    assert not is_deterministic(None)
+
+def test_roundtrip_and_key_fields(cache):
+    with patch('model_digests.get_session', return_value=_tags_session({"m:latest": "sha-1"})):
+        cache.put("m:latest", "prompt", {"response": "hi"}, options={"temperature": 0})
+        assert cache.get("m:latest", "prompt", options={"temperature": 0}) == {"response": "hi"}
+        assert cache.get("m:latest", "prompt", options={"temperature": 0, "seed": 1}) is None
+        assert cache.get("m:latest", "prompt", images=["aW1n"], options={"temperature": 0}) is None
+        assert cache.get("m:latest", "other prompt", options={"temperature": 0}) is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 3
+
+def test_digest_change_invalidates(cache, monkeypatch):
+    with patch('model_digests.get_session', return_value=_tags_session({"m:latest": "sha-1"})):
+        cache.put("m:latest", "prompt", {"response": "old weights"})
+    # The model was pulled again and now has a different digest
+    monkeypatch.setattr(model_digests, 'DIGEST_TTL_SECONDS', 0)
+    with patch('model_digests.get_session', return_value=_tags_session({"m:latest": "sha-2"})):
+        assert cache.get("m:latest", "prompt") is None
+    assert not (cache.root / "m_latest" / "sha-1").exists()
+    assert cache.stats()['size_bytes'] == 0
+
+def test_invalidate_model(cache):
+    with patch('model_digests.get_session', return_value=_tags_session({"m:latest": "sha-1"})) as mock_session:
+        cache.put("m:latest", "prompt", {"response": "hi"})
+        cache.invalidate_model("m:latest")
+        assert cache.get("m:latest", "prompt") is None
+    # The digest was re-fetched after invalidation
+    assert mock_session.return_value.get.call_count == 2
+
+def test_size_bound_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path / "responses", OLLAMA_URL, max_size_mb=0.001) # ~1 KB
+    big = {"response": "x" * 400}
+    with patch('model_digests.get_session', return_value=_tags_session({"m": "sha-1"})):
+        cache.put("m", "p1", big)
+        cache.put("m", "p2", big)
+        cache.put("m", "p3", big)
+        assert cache.get("m", "p1") is None
+        assert cache.get("m", "p3") == big
+    assert cache.stats()['size_bytes'] <= cache.max_bytes
+    assert cache.stats()['evictions'] >= 1
+
+def test_call_ollama_with_stats_replays_deterministic_generation(tmp_path, monkeypatch):
+    monkeypatch.setattr(response_cache, '_caches', {})
+    config = {
+        'ollama': {'enabled': True, 'url': OLLAMA_URL, 'timeout_seconds': 5, 'options': {'temperature': 0}},
+        'benchmark': {'response_cache': {'enabled': True, 'path': str(tmp_path / "responses")}},
+    }
+    session = _tags_session({"m": "sha-1"})
+    session.post.return_value.status_code = 200
+    session.post.return_value.json.return_value = {"response": "answer", "eval_count": 5, "eval_duration": 1_000_000_000, "context": [1, 2]}
+    with patch('model_digests.get_session', return_value=session), \
+         patch('benchmark.get_session', return_value=session):
+        first_text, first_stats = call_ollama_with_stats("m", "prompt", config)
+        second_text, second_stats = call_ollama_with_stats("m", "prompt", config)
+    assert first_text == second_text == "answer"
+    assert session.post.call_count == 1
+    assert session.post.call_args.kwargs['json']['options'] == {'temperature': 0}
+    assert first_stats.eval_count == 5
+    assert second_stats.eval_count is None
+
+def test_call_ollama_with_stats_skips_cache_when_sampling(tmp_path, monkeypatch):
+    monkeypatch.setattr(response_cache, '_caches', {})
+    config = {
+        'ollama': {'enabled': True, 'url': OLLAMA_URL, 'timeout_seconds': 5},
+        'benchmark': {'response_cache': {'enabled': True, 'path': str(tmp_path / "responses")}},
+    }
+    session = MagicMock()
+    session.post.return_value.status_code = 200
+    session.post.return_value.json.return_value = {"response": "answer"}
+    with patch('benchmark.get_session', return_value=session):
+        call_ollama_with_stats("m", "prompt", config)
+        call_ollama_with_stats("m", "prompt", config)
+    assert session.post.call_count == 2
+
+def test_failed_cache_write_keeps_the_generation(tmp_path, monkeypatch):
+    monkeypatch.setattr(response_cache, '_caches', {})
+    config = {
+        'ollama': {'enabled': True, 'url': OLLAMA_URL, 'timeout_seconds': 5, 'options': {'temperature': 0}},
+        'benchmark': {'response_cache': {'enabled': True, 'path': str(tmp_path / "responses")}},
+    }
+    session = _tags_session({"m": "sha-1"})
+    session.post.return_value.status_code = 200
+    session.post.return_value.json.return_value = {"response": "answer", "eval_count": 5}
+    with patch('model_digests.get_session', return_value=session), \
+         patch('benchmark.get_session', return_value=session), \
+         patch.object(ResponseCache, 'put', side_effect=OSError("No space left on device")):
+        text, stats = call_ollama_with_stats("m", "prompt", config, raise_on_error=True)
+    assert text == "answer"
+    assert stats.eval_count == 5
+
+def test_concurrent_puts_of_one_key_use_separate_temp_files(cache):
+    import threading
+    errors = []
+    def put(i):
+        try:
+            cache.put("m", "prompt", {"response": str(i) * 200})
+        except Exception as e:
+            errors.append(e)
+    with patch('model_digests.get_session', return_value=_tags_session({"m": "sha-1"})):
+        threads = [threading.Thread(target=put, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert cache.get("m", "prompt")["response"] in {str(i) * 200 for i in range(8)}
+    assert not list(cache.root.rglob("*.tmp"))
+
+def test_eviction_skips_files_removed_mid_scan(tmp_path):
+    cache = ResponseCache(tmp_path / "responses", OLLAMA_URL, max_size_mb=0.001) # ~1 KB
+    with patch('model_digests.get_session', return_value=_tags_session({"m": "sha-1"})):
+        cache.put("m", "p1", {"response": "x" * 400})
+        cache.put("m", "p2", {"response": "x" * 400})
+        vanished = next(cache.root.rglob("*.json"))
+        real_rglob = Path.rglob
+        def rglob_then_invalidate(self, pattern):
+            files = list(real_rglob(self, pattern))
+            vanished.unlink() # A concurrent invalidate_model got there between listing and stat
+            return files
+        with patch.object(Path, 'rglob', rglob_then_invalidate):
+            cache.put("m", "p3", {"response": "x" * 400})
+    assert cache.stats()['evictions'] >= 1
@@ -0,0 +1,83 @@
+import pytest
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, AsyncMock, patch
+
+# Adjust path to import streaming and routers
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from streaming import StreamTimer, consume_ndjson_stream
+from routers import benchmark_routes
+
+NDJSON_LINES = [
+    b'{"model": "m", "response": "Hel", "done": false}',
+    b'',
+    b'{"model": "m", "response": "lo", "done": false}',
+    b'{"model": "m", "response": "", "done": true, "eval_count": 2, "context": [1, 2, 3]}',
+]
+
+# --- Tests for consume_ndjson_stream ---
+
+def test_consume_ndjson_stream_emits_tokens_and_done():
+    events = list(consume_ndjson_stream(iter(NDJSON_LINES)))
+    assert [e['type'] for e in events] == ['token', 'token', 'done']
+    done = events[-1]
+    assert done['response'] == "Hello"
+    assert done['latency']['token_count'] == 2
+    assert done['latency']['ttft_ms'] is not None
+    assert done['latency']['inter_token_ms_mean'] is not None
+    assert done['raw_response']['eval_count'] == 2
+    assert 'context' not in done['raw_response']
+
+def test_consume_ndjson_stream_incomplete():
+    events = list(consume_ndjson_stream(iter(NDJSON_LINES[:1])))
+    assert events[-1]['type'] == 'done'
+    assert events[-1]['incomplete'] is True
+    assert events[-1]['response'] == "Hel"
+
+def test_consume_ndjson_stream_error_chunk():
+    with pytest.raises(RuntimeError):
+        list(consume_ndjson_stream(iter([b'{"error": "model not found"}'])))
+
+def test_stream_timer_without_tokens():
+    timer = StreamTimer()
+    timer.finish()
+    summary = timer.summary()
+    assert summary['ttft_ms'] is None
+    assert summary['token_count'] == 0
+    assert summary['inter_token_ms_p50'] is None
+
+# --- Tests for /benchmark/compare/stream ---
+
+def _fake_stream(ttft_ms):
+    async def stream_generate(*args, **kwargs):
+        yield {"type": "token", "text": "hi"}
+        yield {"type": "done", "response": "hi", "latency": {"ttft_ms": ttft_ms, "total_ms": ttft_ms + 10}}
+    return stream_generate
+
+@patch('routers.benchmark_routes.get_pipeline')
+@patch('routers.benchmark_routes.AsyncOllamaClient')
+def test_compare_stream_ranks_by_ttft(mock_client_class, mock_get_pipeline):
+    mock_get_pipeline.return_value = MagicMock()
+    health_client = MagicMock()
+    health_client.check_health = AsyncMock(return_value=True)
+    slow_client = MagicMock()
+    slow_client.stream_generate = _fake_stream(50.0)
+    fast_client = MagicMock()
+    fast_client.stream_generate = _fake_stream(5.0)
+    mock_client_class.from_client.side_effect = [health_client, slow_client, fast_client]
+
+    app = FastAPI()
+    app.include_router(benchmark_routes.router)
+    client = TestClient(app)
+    response = client.post("/benchmark/compare/stream", json={"model1": "slow", "model2": "fast", "prompt": "Hi"})
+
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert sum(1 for e in events if e['type'] == 'token') == 2
+    summary = events[-1]
+    assert summary['type'] == 'summary'
+    assert [entry['model'] for entry in summary['ranking']] == ["fast", "slow"]
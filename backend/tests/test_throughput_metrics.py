@@ -0,0 +1,80 @@
+import pytest
+import sqlite3
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models import GenerationStats
+from metrics import get_throughput_metrics
+from init_db import migrate_database
+
+OLLAMA_RESPONSE = {
+    "response": "Hello",
+    "eval_count": 100,
+    "eval_duration": 2_000_000_000,
+    "prompt_eval_count": 50,
+    "prompt_eval_duration": 500_000_000,
+    "load_duration": 250_000_000,
+    "total_duration": 3_000_000_000,
+}
+
+@pytest.fixture
+def conn(tmp_path):
+    connection = sqlite3.connect(tmp_path / "pipeline.db")
+    migrate_database(connection)
+    yield connection
+    connection.close()
+
+def test_generation_stats_derived_rates():
+    stats = GenerationStats.from_ollama(OLLAMA_RESPONSE)
+    assert stats.tokens_per_second == 50.0
+    assert stats.prompt_tokens_per_second == 100.0
+    assert stats.load_ms == 250.0
+    assert stats.to_dict()['tokens_per_second'] == 50.0
+
+def test_generation_stats_missing_fields():
+    stats = GenerationStats.from_ollama({"response": "Simulated"})
+    assert stats.tokens_per_second is None
+    assert stats.load_ms is None
+
+def test_migrate_database_adds_columns_to_old_schema(tmp_path):
+    connection = sqlite3.connect(tmp_path / "old.db")
+    connection.execute("""
+        CREATE TABLE benchmark_results (
+            id TEXT PRIMARY KEY, category TEXT NOT NULL, model TEXT NOT NULL, score REAL NOT NULL,
+            breakdown_json TEXT, reasoning TEXT, run_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    added = migrate_database(connection)
+    assert "benchmark_results.eval_count" in added
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(benchmark_results)")}
+    assert {"eval_duration", "load_duration", "total_duration"} <= columns
+    assert migrate_database(connection) == [] # Idempotent
+    connection.close()
+
+def test_get_throughput_metrics_aggregates_per_model(conn):
+    rows = [
+        ("r1", "model_a", 100, 2_000_000_000, 50, 500_000_000, 250_000_000, 3_000_000_000),
+        ("r2", "model_a", 300, 2_000_000_000, 50, 500_000_000, 0, 2_500_000_000),
+        ("r3", "model_b", 10, 1_000_000_000, 5, 100_000_000, 0, 1_100_000_000),
+    ]
+    for row in rows:
+        conn.execute("""
+            INSERT INTO benchmark_results (id, category, model, score, eval_count, eval_duration,
+                                           prompt_eval_count, prompt_eval_duration, load_duration, total_duration)
+            VALUES (?, 'reasoning', ?, 3, ?, ?, ?, ?, ?, ?)
+        """, row)
+    conn.commit()
+
+    summaries = {s['model']: s for s in get_throughput_metrics(conn, 'benchmark')}
+    assert summaries['model_a']['runs'] == 2
+    assert summaries['model_a']['tokens_per_second'] == pytest.approx(100.0)
+    assert summaries['model_a']['prompt_tokens_per_second'] == pytest.approx(100.0)
+    assert summaries['model_a']['avg_load_ms'] == pytest.approx(125.0)
+    assert summaries['model_a']['load_overhead_pct'] == pytest.approx(250 / 5500 * 100)
+    assert summaries['model_b']['tokens_per_second'] == pytest.approx(10.0)
+
+    assert [s['model'] for s in get_throughput_metrics(conn, 'benchmark', model='model_b')] == ['model_b']
+    assert get_throughput_metrics(conn, 'pipeline') == []
@@ -0,0 +1,64 @@
+import json
+import pytest
+from PIL import Image
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from thumbnails import ThumbnailGenerator, render_thumbnail, get_thumbnail_generator, THUMBNAIL_NAME, SIDECAR_NAME
+
+@pytest.fixture
+def source(tmp_path):
+    item_dir = tmp_path / "item"
+    item_dir.mkdir()
+    path = item_dir / "photo.png"
+    Image.new("RGBA", (900, 300), (20, 120, 60, 255)).save(path)
+    return path
+
+@pytest.fixture
+def generator():
+    generator = ThumbnailGenerator(max_size=150, workers=1)
+    yield generator
+    generator.shutdown()
+
+def test_render_thumbnail_writes_webp_and_sidecar(source):
+    info = render_thumbnail(str(source), str(source.parent), 150, 80, "abc")
+    with Image.open(source.parent / THUMBNAIL_NAME) as thumb:
+        assert thumb.format == "WEBP"
+        assert thumb.size == (150, 50)
+    assert info == json.loads((source.parent / SIDECAR_NAME).read_text())
+    assert info["source_hash"] == "abc"
+
+def test_generator_renders_in_pool_then_skips_unchanged(source, generator):
+    future = generator.submit(source, source.parent, "hash-1")
+    assert future.result(timeout=60)["width"] == 150
+    assert generator.submit(source, source.parent, "hash-1") is None
+
+    # A new source hash or size invalidates the thumbnail
+    assert generator.submit(source, source.parent, "hash-2").result(timeout=60)["source_hash"] == "hash-2"
+    generator.max_size = 100
+    assert generator.submit(source, source.parent, "hash-2").result(timeout=60)["width"] == 100
+    generator.shutdown() # Done callbacks have run once the pool is joined
+    assert generator.stats() == {"generated": 3, "skipped": 1, "failed": 0}
+
+def test_duplicate_reuses_existing_thumbnail(source, generator, tmp_path):
+    render_thumbnail(str(source), str(source.parent), 150, 80, "same")
+    copy_dir = tmp_path / "copy"
+    copy_dir.mkdir()
+    assert generator.submit(copy_dir / "photo.png", copy_dir, "same", reuse_from=source.parent) is None
+    assert (copy_dir / THUMBNAIL_NAME).read_bytes() == (source.parent / THUMBNAIL_NAME).read_bytes()
+
+def test_failures_are_counted(tmp_path, generator):
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not an image")
+    future = generator.submit(broken, tmp_path, "x")
+    with pytest.raises(Exception):
+        future.result(timeout=60)
+    generator.shutdown()
+    assert generator.stats()["failed"] == 1
+
+def test_disabled_by_config():
+    assert get_thumbnail_generator({'output': {'generate_thumbnail': False}}) is None
+    assert get_thumbnail_generator({'output': {'generate_thumbnail': True, 'thumbnail_max_size': 400}}).max_size == 400
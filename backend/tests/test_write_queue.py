@@ -0,0 +1,115 @@
+import time
+import sqlite3
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+
+# Adjust path to import backend modules
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import db_pool
+from write_queue import WriteBehindQueue, get_write_queue
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "pipeline.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER PRIMARY KEY, tag TEXT)")
+    yield path
+    db_pool.close_all()
+
+def _count(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+def test_writes_are_group_committed(db_path):
+    queue = WriteBehindQueue(db_path, flush_interval=60, max_batch=1000)
+    queue.start()
+    for i in range(50):
+        queue.submit("INSERT INTO t (x) VALUES (?)", (i,))
+    assert _count(db_path) == 0 # Still queued
+    queue.stop() # Flushes on shutdown
+    assert _count(db_path) == 50
+    assert queue.stats()["batches"] == 1
+    assert queue.stats()["avg_batch_size"] == 50
+
+def test_size_threshold_triggers_flush(db_path):
+    queue = WriteBehindQueue(db_path, flush_interval=60, max_batch=10)
+    queue.start()
+    try:
+        for i in range(10):
+            queue.submit("INSERT INTO t (x) VALUES (?)", (i,))
+        deadline = time.monotonic() + 5
+        while _count(db_path) < 10 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _count(db_path) == 10
+    finally:
+        queue.stop()
+
+def test_durable_submit_is_committed_on_return(db_path):
+    queue = WriteBehindQueue(db_path, flush_interval=60, durable=True)
+    queue.start()
+    try:
+        threads = [threading.Thread(target=queue.submit, args=("INSERT INTO t (x) VALUES (?)", (i,))) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert _count(db_path) == 8
+        assert queue.stats()["batches"] <= 8
+    finally:
+        queue.stop()
+
+def test_failed_statement_does_not_lose_the_batch(db_path):
+    queue = WriteBehindQueue(db_path, flush_interval=60)
+    queue.start()
+    queue.submit("INSERT INTO t (x) VALUES (?)", (1,))
+    queue.submit("INSERT INTO t (x) VALUES (?)", (1,)) # Primary key conflict
+    queue.submit("INSERT INTO t (x) VALUES (?)", (2,))
+    queue.stop()
+    assert _count(db_path) == 2
+    assert queue.stats()["failed"] == 1
+
+def test_pending_keys(db_path):
+    queue = WriteBehindQueue(db_path, flush_interval=60)
+    queue.start()
+    queue.submit("INSERT INTO t (x, tag) VALUES (?, ?)", (1, "a"), key="hash-a")
+    assert queue.has_pending("hash-a")
+    assert not queue.has_pending("hash-b")
+    queue.flush()
+    assert not queue.has_pending("hash-a")
+    queue.stop()
+
+def test_config(db_path):
+    queue = get_write_queue({'database': {'write_behind': {'durable': True, 'flush_interval_ms': 50}}}, db_path)
+    assert queue.durable
+    assert queue.flush_interval == 0.05
+
+def test_flusher_survives_database_errors(db_path):
+    queue = WriteBehindQueue(db_path, flush_interval=0.02)
+    queue.start()
+    try:
+        with patch('write_queue.db_pool.get_connection', side_effect=sqlite3.OperationalError("unable to open database")):
+            queue.submit("INSERT INTO t (x) VALUES (?)", (1,))
+            deadline = time.monotonic() + 5
+            while queue.stats()["failed"] < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        assert queue.stats()["failed"] == 1
+        queue.submit("INSERT INTO t (x) VALUES (?)", (2,))
+        deadline = time.monotonic() + 5
+        while _count(db_path) < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _count(db_path) == 1 # The background thread kept flushing
+    finally:
+        queue.stop()
+
+def test_app_shutdown_commits_daemon_and_api_pipelines():
+    import dependencies
+    daemon, pipeline = MagicMock(), MagicMock()
+    with patch.object(dependencies, '_daemon_instance', daemon), patch.object(dependencies, '_pipeline_instance', pipeline):
+        dependencies.shutdown()
+    daemon.stop.assert_called_once()
+    daemon.pipeline.close.assert_called_once() # The daemon's pipeline has its own write queue
+    pipeline.close.assert_called_once()
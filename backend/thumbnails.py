@@ -0,0 +1,128 @@
+import os
+import json
+import shutil
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger("Thumbnails")
+
+THUMBNAIL_NAME = "thumbnail.webp"
+SIDECAR_NAME = "thumbnail.json" # Source hash and size the thumbnail was rendered from
+DEFAULT_MAX_SIZE = 1200
+DEFAULT_QUALITY = 80
+
+
+def render_thumbnail(source: str, dest_dir: str, max_size: int, quality: int, content_hash: str) -> Dict:
+    """Writes a WebP thumbnail and its sidecar into `dest_dir`. Runs in a worker process."""
+    dest_dir = Path(dest_dir)
+    with Image.open(source) as img:
+        img.draft("RGB", (max_size, max_size))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        tmp_path = dest_dir / f"{THUMBNAIL_NAME}.tmp"
+        img.save(tmp_path, format="WEBP", quality=quality, method=4)
+        size = img.size
+    os.replace(tmp_path, dest_dir / THUMBNAIL_NAME)
+    info = {"source_hash": content_hash, "max_size": max_size, "width": size[0], "height": size[1]}
+    with open(dest_dir / SIDECAR_NAME, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+    return info
+
+
+def _read_sidecar(directory: Path) -> Optional[Dict]:
+    try:
+        with open(directory / SIDECAR_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+class ThumbnailGenerator:
+    """
+    Renders review thumbnails in a process pool so Pillow's CPU work stays
+    off the pipeline workers. A thumbnail whose sidecar already records the
+    same source hash and size is not rendered again.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, quality: int = DEFAULT_QUALITY, workers: Optional[int] = None):
+        self.max_size = max_size
+        self.quality = quality
+        self.workers = workers
+        self.generated = 0
+        self.skipped = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _is_current(self, directory: Path, content_hash: str) -> bool:
+        info = _read_sidecar(directory)
+        return (info is not None and info.get("source_hash") == content_hash
+                and info.get("max_size") == self.max_size and (directory / THUMBNAIL_NAME).exists())
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs worker threads can inherit held locks
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def submit(self, source: Path, dest_dir: Path, content_hash: Optional[str],
+               reuse_from: Optional[Path] = None) -> Optional[Future]:
+        """
+        Schedules a thumbnail for `source` in `dest_dir`. Returns None when
+        nothing needs rendering: the existing thumbnail (or the one in
+        `reuse_from`, copied over) matches the source hash.
+        """
+        if content_hash and self._is_current(dest_dir, content_hash):
+            with self._lock:
+                self.skipped += 1
+            return None
+        if content_hash and reuse_from is not None and self._is_current(reuse_from, content_hash):
+            shutil.copyfile(reuse_from / THUMBNAIL_NAME, dest_dir / THUMBNAIL_NAME)
+            shutil.copyfile(reuse_from / SIDECAR_NAME, dest_dir / SIDECAR_NAME)
+            with self._lock:
+                self.skipped += 1
+            return None
+
+        future = self._pool().submit(render_thumbnail, str(source), str(dest_dir), self.max_size,
+                                     self.quality, content_hash or "")
+        future.add_done_callback(lambda f: self._on_done(f, source))
+        return future
+
+    def _on_done(self, future: Future, source: Path):
+        with self._lock:
+            if future.exception() is None:
+                self.generated += 1
+                return
+            self.failed += 1
+        logger.error(f"Thumbnail failed for {source.name}: {future.exception()}")
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict:
+        return {"generated": self.generated, "skipped": self.skipped, "failed": self.failed}
+
+
+def get_thumbnail_generator(config: dict) -> Optional[ThumbnailGenerator]:
+    """Returns a generator when `output.generate_thumbnail` is on, otherwise None."""
+    output_conf = config.get('output', {})
+    if not output_conf.get('generate_thumbnail', False):
+        return None
+    return ThumbnailGenerator(
+        max_size=output_conf.get('thumbnail_max_size', DEFAULT_MAX_SIZE),
+        quality=output_conf.get('thumbnail_quality', DEFAULT_QUALITY),
+        workers=output_conf.get('thumbnail_workers'),
+    )
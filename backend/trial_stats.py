@@ -0,0 +1,50 @@
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_RESAMPLES = 2000
+DEFAULT_CONFIDENCE = 0.95
+
+
+def bootstrap_ci(scores: Sequence[float], confidence: float = DEFAULT_CONFIDENCE,
+                 n_resamples: int = DEFAULT_RESAMPLES, seed: Optional[int] = None) -> tuple:
+    """
+    Percentile bootstrap interval for the mean. All resamples are drawn as one
+    (n_resamples, n) index matrix, so the cost is a single vectorized pass.
+    """
+    values = np.asarray(scores, dtype=float)
+    if values.size == 0:
+        return None, None
+    if values.size == 1 or np.all(values == values[0]):
+        return float(values[0]), float(values[0])
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, values.size, size=(n_resamples, values.size))
+    means = values[indices].mean(axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha])
+    return float(low), float(high)
+
+
+def summarize_trials(scores: Sequence[float], confidence: float = DEFAULT_CONFIDENCE,
+                     n_resamples: int = DEFAULT_RESAMPLES, seed: Optional[int] = None) -> Dict:
+    """Mean, sample variance and bootstrap CI of a set of trial scores."""
+    values = np.asarray(scores, dtype=float)
+    ci_low, ci_high = bootstrap_ci(values, confidence, n_resamples, seed)
+    return {
+        "trials": int(values.size),
+        "mean": float(values.mean()) if values.size else None,
+        "variance": float(values.var(ddof=1)) if values.size > 1 else 0.0 if values.size else None,
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "ci_width": ci_high - ci_low if ci_low is not None else None,
+        "confidence": confidence,
+    }
+
+
+def should_stop(scores: Sequence[float], min_trials: int, target_ci_width: float,
+                confidence: float = DEFAULT_CONFIDENCE, seed: Optional[int] = None) -> bool:
+    """True once at least `min_trials` ran and the bootstrap interval is no wider than the target."""
+    if len(scores) < max(min_trials, 2):
+        return False
+    low, high = bootstrap_ci(scores, confidence, seed=seed)
+    return high - low <= target_ci_width
@@ -0,0 +1,176 @@
+import time
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import db_pool
+
+logger = logging.getLogger("WriteQueue")
+
+DEFAULT_FLUSH_INTERVAL_MS = 200
+DEFAULT_MAX_BATCH = 200
+
+
+class WriteBehindQueue:
+    """
+    Collects INSERT/UPDATE statements and commits them in groups, one
+    transaction per batch, on a background thread every `flush_interval`
+    seconds or as soon as `max_batch` statements are waiting.
+
+    With `durable` set, `submit` returns only once its statement is
+    committed; writers that arrive while a commit is in progress still share
+    the next one. Statements run in submission order. A `key` (the pipeline
+    uses the content hash) lets readers ask whether a row they are about to
+    look up is still waiting to be written.
+    """
+
+    def __init__(self, db_path, flush_interval: float = DEFAULT_FLUSH_INTERVAL_MS / 1000,
+                 max_batch: int = DEFAULT_MAX_BATCH, durable: bool = False):
+        self.db_path = str(db_path)
+        self.flush_interval = flush_interval
+        self.max_batch = max(1, max_batch)
+        self.durable = durable
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock() # One batch in flight at a time keeps statements in order
+        self._pending: List[Tuple[str, tuple, Optional[str]]] = []
+        self._pending_keys = Counter()
+        self._submitted = 0
+        self._committed = 0 # Sequence number of the last statement written (or given up on)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.batches = 0
+        self.writes = 0
+        self.failed = 0
+        self.commit_seconds_total = 0.0
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Writes everything still queued, then stops the background thread."""
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+            self._cond.notify_all()
+        if thread:
+            thread.join()
+        self.flush()
+
+    def submit(self, sql: str, params: tuple = (), key: Optional[str] = None):
+        with self._cond:
+            self._pending.append((sql, tuple(params), key))
+            if key:
+                self._pending_keys[key] += 1
+            self._submitted += 1
+            seq = self._submitted
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+            running = self._thread is not None
+        if self.durable or not running:
+            self._flush_through(seq)
+
+    def has_pending(self, key: str) -> bool:
+        with self._cond:
+            return self._pending_keys[key] > 0
+
+    def flush(self):
+        """Commits every statement submitted so far."""
+        with self._cond:
+            seq = self._submitted
+        self._flush_through(seq)
+
+    def _flush_through(self, seq: int):
+        with self._flush_lock:
+            if self._committed >= seq:
+                return # Another writer's group commit already covered it
+            self._drain()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopping or len(self._pending) >= self.max_batch,
+                                    timeout=self.flush_interval)
+                if self._stopping:
+                    return
+            with self._flush_lock:
+                try:
+                    self._drain()
+                except Exception as e:
+                    # Keep the thread alive; a dead flusher would let submits pile up forever
+                    logger.error(f"Write-behind flush failed: {e}")
+
+    def _drain(self):
+        """Writes the queued statements as one transaction. Caller holds `_flush_lock`."""
+        with self._cond:
+            batch, self._pending = self._pending, []
+            last_seq = self._submitted
+        if batch:
+            started = time.perf_counter()
+            failed = self._write(batch)
+            elapsed = time.perf_counter() - started
+        with self._cond:
+            for _, _, key in batch:
+                if key:
+                    self._pending_keys[key] -= 1
+                    if self._pending_keys[key] <= 0:
+                        del self._pending_keys[key]
+            self._committed = last_seq
+            if batch:
+                self.batches += 1
+                self.writes += len(batch) - failed
+                self.failed += failed
+                self.commit_seconds_total += elapsed
+
+    def _write(self, batch: List[Tuple[str, tuple, Optional[str]]]) -> int:
+        try:
+            conn = db_pool.get_connection(self.db_path)
+        except Exception as e:
+            logger.error(f"Could not open the database, dropping {len(batch)} queued writes: {e}")
+            return len(batch)
+        try:
+            with conn:
+                for sql, params, _ in batch:
+                    conn.execute(sql, params)
+            return 0
+        except Exception as e:
+            logger.warning(f"Group commit of {len(batch)} writes failed ({e}), retrying them one by one")
+
+        # Isolate the bad statement so the rest of the batch is not lost with it
+        failed = 0
+        for sql, params, _ in batch:
+            try:
+                with conn:
+                    conn.execute(sql, params)
+            except Exception as e:
+                failed += 1
+                logger.error(f"DB write failed: {e}")
+        return failed
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "batches": self.batches,
+                "writes": self.writes,
+                "failed": self.failed,
+                "avg_batch_size": round(self.writes / self.batches, 2) if self.batches else None,
+                "avg_commit_ms": round(self.commit_seconds_total / self.batches * 1000, 3) if self.batches else None,
+                "durable": self.durable,
+            }
+
+
+def get_write_queue(config: dict, db_path) -> WriteBehindQueue:
+    """Builds the pipeline's write queue from `database.write_behind`."""
+    queue_conf = config.get('database', {}).get('write_behind', {}) or {}
+    return WriteBehindQueue(
+        db_path,
+        flush_interval=queue_conf.get('flush_interval_ms', DEFAULT_FLUSH_INTERVAL_MS) / 1000,
+        max_batch=queue_conf.get('max_batch', DEFAULT_MAX_BATCH),
+        durable=queue_conf.get('durable', False),
+    )